@@ -20,9 +20,81 @@ class Settings:
     brave_api_key: Optional[str] = None
     serper_api_key: Optional[str] = None
     
+    # Search Result Cache
+    search_cache_enabled: bool = True
+    search_cache_path: str = "data/search_cache.db"
+    search_cache_max_entries: int = 1000
+    search_cache_ttl_seconds: int = 3600
+    search_cache_provider_ttls: str = ""
+    search_cache_stale_seconds: int = 86400
+    search_cache_max_disk_entries: int = 50000
+
+    # HTTP Session Configuration (shared connection pools)
+    http_pool_size: int = 10
+    http_max_retries: int = 2
+    http_backoff_factor: float = 0.3
+
+    # Search Provider Configuration (fan-out, rate limits, circuit breakers)
+    search_quorum: int = 2
+    search_deadline_seconds: float = 8.0
+    search_fanout: int = 1  # providers started at once; 0 starts them all (no hedging)
+    search_max_concurrency: int = 4
+    search_render_token_budget: int = 1200
+    search_rate_limit_per_second: float = 5.0
+    search_rate_limit_burst: int = 10
+    search_breaker_failures: int = 5
+    search_breaker_cooldown_seconds: float = 30.0
+    search_timeout_min_seconds: float = 1.0
+    search_timeout_max_seconds: float = 10.0
+
+    # Page Fetch Configuration (full-text excerpts of top results)
+    page_fetch_enabled: bool = True
+    page_fetch_top_n: int = 3
+    page_fetch_per_host: int = 2
+    page_fetch_max_bytes: int = 524288
+    page_fetch_timeout_seconds: float = 5.0
+    page_fetch_deadline_seconds: float = 8.0
+    page_excerpt_tokens: int = 300
+    page_cache_max_entries: int = 500
+    page_cache_ttl_seconds: int = 3600
+    # Only for a local fixture server; pages on private networks are never fetched
+    page_fetch_allow_loopback: bool = False
+    
+    # Finished research served again for the same (or a near-duplicate) topic
+    research_cache_enabled: bool = True
+    research_cache_ttl_seconds: int = 86400
+    research_cache_similarity: float = 0.7
+    research_cache_near_duplicates: bool = True
+    
+    # Record/replay of provider and LLM calls ("off", "record" or "replay")
+    replay_mode: str = "off"
+    replay_fixture_dir: str = "fixtures/replay"
+    replay_latency_scale: float = 1.0
+    replay_latency_seconds: float = 0.0
+    
     # Database Configuration
     database_url: str = "crewai_production.db"
+    database_shards: int = 1
     vector_store_path: str = "vector_store"
+    vector_store_dim: int = 256
+    db_reader_connections: int = 4
+    db_cache_size_mb: int = 64
+    db_mmap_size_mb: int = 256
+    db_write_queue_size: int = 10000
+    db_write_batch_size: int = 500
+    db_write_flush_interval: float = 0.5
+    # "zlib", or "zstd" when every reader has the zstandard package
+    db_compression_codec: str = "zlib"
+    
+    # Retention Configuration (0 keeps rows forever)
+    retention_execution_days: int = 0
+    retention_qa_days: int = 0
+    retention_memory_days: int = 0
+    retention_max_executions_per_session: int = 0
+    retention_max_qa_per_session: int = 0
+    retention_archive_dir: str = "data/archive"
+    retention_batch_size: int = 500
+    retention_interval_seconds: int = 3600
     
     # System Configuration
     max_iterations: int = 5
@@ -31,7 +103,15 @@ class Settings:
     
     # Performance Configuration
     max_concurrent_crews: int = 3
+    crew_queue_max_size: int = 20
     memory_limit_mb: int = 2048
+    memory_cache_max_entries: int = 1000
+    memory_cache_share: float = 0.25
+    memory_cache_idle_ttl_seconds: int = 1800
+    memory_reload_page_size: int = 50
+    # 0 keeps LangChain's ConversationBufferMemory; a positive budget opts into RollingSummaryMemory
+    memory_token_budget: int = 0
+    memory_summary_token_budget: int = 500
     
     # File Upload Configuration
     upload_dir: str = "uploads"
@@ -60,13 +140,76 @@ class Settings:
             tavily_api_key=os.getenv('TAVILY_API_KEY'),
             brave_api_key=os.getenv('BRAVE_API_KEY'),
             serper_api_key=os.getenv('SERPER_API_KEY'),
+            search_cache_enabled=os.getenv('SEARCH_CACHE_ENABLED', 'true').lower() == 'true',
+            search_cache_path=os.getenv('SEARCH_CACHE_PATH', 'data/search_cache.db'),
+            search_cache_max_entries=int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '1000')),
+            search_cache_ttl_seconds=int(os.getenv('SEARCH_CACHE_TTL_SECONDS', '3600')),
+            search_cache_provider_ttls=os.getenv('SEARCH_CACHE_PROVIDER_TTLS', ''),
+            search_cache_stale_seconds=int(os.getenv('SEARCH_CACHE_STALE_SECONDS', '86400')),
+            search_cache_max_disk_entries=int(os.getenv('SEARCH_CACHE_MAX_DISK_ENTRIES', '50000')),
+            http_pool_size=int(os.getenv('HTTP_POOL_SIZE', '10')),
+            http_max_retries=int(os.getenv('HTTP_MAX_RETRIES', '2')),
+            http_backoff_factor=float(os.getenv('HTTP_BACKOFF_FACTOR', '0.3')),
+            search_quorum=int(os.getenv('SEARCH_QUORUM', '2')),
+            search_deadline_seconds=float(os.getenv('SEARCH_DEADLINE_SECONDS', '8.0')),
+            search_fanout=int(os.getenv('SEARCH_FANOUT', '1')),
+            search_max_concurrency=int(os.getenv('SEARCH_MAX_CONCURRENCY', '4')),
+            search_render_token_budget=int(os.getenv('SEARCH_RENDER_TOKEN_BUDGET', '1200')),
+            search_rate_limit_per_second=float(os.getenv('SEARCH_RATE_LIMIT_PER_SECOND', '5.0')),
+            search_rate_limit_burst=int(os.getenv('SEARCH_RATE_LIMIT_BURST', '10')),
+            search_breaker_failures=int(os.getenv('SEARCH_BREAKER_FAILURES', '5')),
+            search_breaker_cooldown_seconds=float(os.getenv('SEARCH_BREAKER_COOLDOWN_SECONDS', '30.0')),
+            search_timeout_min_seconds=float(os.getenv('SEARCH_TIMEOUT_MIN_SECONDS', '1.0')),
+            search_timeout_max_seconds=float(os.getenv('SEARCH_TIMEOUT_MAX_SECONDS', '10.0')),
+            page_fetch_enabled=os.getenv('PAGE_FETCH_ENABLED', 'true').lower() == 'true',
+            page_fetch_top_n=int(os.getenv('PAGE_FETCH_TOP_N', '3')),
+            page_fetch_per_host=int(os.getenv('PAGE_FETCH_PER_HOST', '2')),
+            page_fetch_max_bytes=int(os.getenv('PAGE_FETCH_MAX_BYTES', '524288')),
+            page_fetch_timeout_seconds=float(os.getenv('PAGE_FETCH_TIMEOUT_SECONDS', '5.0')),
+            page_fetch_deadline_seconds=float(os.getenv('PAGE_FETCH_DEADLINE_SECONDS', '8.0')),
+            page_excerpt_tokens=int(os.getenv('PAGE_EXCERPT_TOKENS', '300')),
+            page_cache_max_entries=int(os.getenv('PAGE_CACHE_MAX_ENTRIES', '500')),
+            page_cache_ttl_seconds=int(os.getenv('PAGE_CACHE_TTL_SECONDS', '3600')),
+            page_fetch_allow_loopback=os.getenv('PAGE_FETCH_ALLOW_LOOPBACK', 'false').lower() == 'true',
+            research_cache_enabled=os.getenv('RESEARCH_CACHE_ENABLED', 'true').lower() == 'true',
+            research_cache_ttl_seconds=int(os.getenv('RESEARCH_CACHE_TTL_SECONDS', '86400')),
+            research_cache_similarity=float(os.getenv('RESEARCH_CACHE_SIMILARITY', '0.7')),
+            research_cache_near_duplicates=os.getenv('RESEARCH_CACHE_NEAR_DUPLICATES', 'true').lower() == 'true',
+            replay_mode=os.getenv('REPLAY_MODE', 'off').lower(),
+            replay_fixture_dir=os.getenv('REPLAY_FIXTURE_DIR', 'fixtures/replay'),
+            replay_latency_scale=float(os.getenv('REPLAY_LATENCY_SCALE', '1.0')),
+            replay_latency_seconds=float(os.getenv('REPLAY_LATENCY_SECONDS', '0.0')),
             database_url=os.getenv('DATABASE_URL', 'crewai_production.db'),
+            database_shards=int(os.getenv('DATABASE_SHARDS', '1')),
             vector_store_path=os.getenv('VECTOR_STORE_PATH', 'vector_store'),
+            vector_store_dim=int(os.getenv('VECTOR_STORE_DIM', '256')),
+            db_reader_connections=int(os.getenv('DB_READER_CONNECTIONS', '4')),
+            db_cache_size_mb=int(os.getenv('DB_CACHE_SIZE_MB', '64')),
+            db_mmap_size_mb=int(os.getenv('DB_MMAP_SIZE_MB', '256')),
+            db_write_queue_size=int(os.getenv('DB_WRITE_QUEUE_SIZE', '10000')),
+            db_write_batch_size=int(os.getenv('DB_WRITE_BATCH_SIZE', '500')),
+            db_write_flush_interval=float(os.getenv('DB_WRITE_FLUSH_INTERVAL', '0.5')),
+            db_compression_codec=os.getenv('DB_COMPRESSION_CODEC', 'zlib').lower(),
+            retention_execution_days=int(os.getenv('RETENTION_EXECUTION_DAYS', '0')),
+            retention_qa_days=int(os.getenv('RETENTION_QA_DAYS', '0')),
+            retention_memory_days=int(os.getenv('RETENTION_MEMORY_DAYS', '0')),
+            retention_max_executions_per_session=int(os.getenv('RETENTION_MAX_EXECUTIONS_PER_SESSION', '0')),
+            retention_max_qa_per_session=int(os.getenv('RETENTION_MAX_QA_PER_SESSION', '0')),
+            retention_archive_dir=os.getenv('RETENTION_ARCHIVE_DIR', 'data/archive'),
+            retention_batch_size=int(os.getenv('RETENTION_BATCH_SIZE', '500')),
+            retention_interval_seconds=int(os.getenv('RETENTION_INTERVAL_SECONDS', '3600')),
             max_iterations=int(os.getenv('MAX_ITERATIONS', '5')),
             verbose=os.getenv('VERBOSE', 'true').lower() == 'true',
             log_level=os.getenv('LOG_LEVEL', 'INFO'),
             max_concurrent_crews=int(os.getenv('MAX_CONCURRENT_CREWS', '3')),
+            crew_queue_max_size=int(os.getenv('CREW_QUEUE_MAX_SIZE', '20')),
             memory_limit_mb=int(os.getenv('MEMORY_LIMIT_MB', '2048')),
+            memory_cache_max_entries=int(os.getenv('MEMORY_CACHE_MAX_ENTRIES', '1000')),
+            memory_cache_share=float(os.getenv('MEMORY_CACHE_SHARE', '0.25')),
+            memory_cache_idle_ttl_seconds=int(os.getenv('MEMORY_CACHE_IDLE_TTL_SECONDS', '1800')),
+            memory_reload_page_size=int(os.getenv('MEMORY_RELOAD_PAGE_SIZE', '50')),
+            memory_token_budget=int(os.getenv('MEMORY_TOKEN_BUDGET', '0')),
+            memory_summary_token_budget=int(os.getenv('MEMORY_SUMMARY_TOKEN_BUDGET', '500')),
             upload_dir=os.getenv('UPLOAD_DIR', 'uploads'),
             max_file_size_mb=int(os.getenv('MAX_FILE_SIZE_MB', '50'))
         )
\ No newline at end of file
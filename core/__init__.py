@@ -4,16 +4,23 @@ Core components for the CrewAI system.
 
 from .agents_factory import AgentsFactory
 from .memory_manager import PersistentMemoryManager
+from .rolling_memory import RollingSummaryMemory
 from .tools_manager import ToolsManager
 from .document_processor import DocumentProcessor
-from .database import DatabaseManager
+from .database import DatabaseManager, create_database_manager
+from .storage import StorageBackend
+from .sharding import ShardedDatabaseManager
 from .performance_monitor import PerformanceMonitor
 
 __all__ = [
     'AgentsFactory',
     'PersistentMemoryManager', 
+    'RollingSummaryMemory',
     'ToolsManager',
     'DocumentProcessor',
     'DatabaseManager',
+    'ShardedDatabaseManager',
+    'StorageBackend',
+    'create_database_manager',
     'PerformanceMonitor'
 ]
\ No newline at end of file
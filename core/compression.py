@@ -0,0 +1,70 @@
+import sqlite3
+import zlib
+from typing import Optional, Tuple, Union
+
+# zstd is optional and only written when configured (DB_COMPRESSION_CODEC=zstd),
+# since every machine that reads the database then needs it too; zlib from the
+# standard library is always available and always readable
+try:
+    import zstandard
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
+CODEC_RAW = "raw"
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+PREVIEW_LENGTH = 200
+
+_write_codec = CODEC_ZLIB
+
+def default_codec() -> str:
+    """Return the codec new rows are written with."""
+    return _write_codec
+
+def set_default_codec(codec: str):
+    """Choose the codec for new rows: ``"zlib"`` (default) or ``"zstd"``."""
+    global _write_codec
+    if codec not in (CODEC_ZLIB, CODEC_ZSTD):
+        raise ValueError(f"Unknown compression codec: {codec}")
+    if codec == CODEC_ZSTD and zstandard is None:
+        raise ValueError("DB_COMPRESSION_CODEC=zstd needs the zstandard package: pip install zstandard")
+    _write_codec = codec
+
+def compress_text(text: str, min_size: int = 256, codec: Optional[str] = None) -> Tuple[str, Union[str, bytes]]:
+    """Compress text for storage and return ``(codec, payload)``.
+
+    Short texts are stored as-is since compression would not pay for itself.
+    """
+    data = text.encode("utf-8")
+    if len(data) < min_size:
+        return CODEC_RAW, text
+
+    if (codec or _write_codec) == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to write zstd rows: pip install zstandard")
+        return CODEC_ZSTD, _zstd_compressor.compress(data)
+    return CODEC_ZLIB, zlib.compress(data, 6)
+
+def decompress_text(codec: str, payload: Union[str, bytes, None]) -> str:
+    """Reverse ``compress_text``."""
+    if payload is None:
+        return ""
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this row: pip install zstandard")
+        return _zstd_decompressor.decompress(payload).decode("utf-8")
+    # raw
+    return payload.decode("utf-8") if isinstance(payload, bytes) else payload
+
+def make_preview(text: str, length: int = PREVIEW_LENGTH) -> str:
+    """Build the short preview shown in history listings."""
+    return text[:length] + "..." if len(text) > length else text
+
+def register_sql_functions(conn: sqlite3.Connection):
+    """Expose ``decompress_text(codec, payload)`` to SQL (used by the search triggers)."""
+    conn.create_function("decompress_text", 2, decompress_text, deterministic=True)
\ No newline at end of file
@@ -1,153 +1,942 @@
 import sqlite3
 import asyncio
-import aiosqlite
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+import atexit
+import base64
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from itertools import groupby
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
 import json
 import os
+import re
 
-class DatabaseManager:
-    """Manage SQLite database for persistent storage."""
-    
-    def __init__(self, db_path: str = "crewai_system.db"):
+from .compression import compress_text, decompress_text, make_preview, register_sql_functions, set_default_codec
+from .migrations import apply_migrations, get_schema_version, rebuild_history_index
+from .storage import StorageBackend
+
+def utc_timestamp(moment: Optional[datetime] = None) -> str:
+    """Text stored in every timestamp column: UTC, ``YYYY-MM-DD HH:MM:SS.ffffff``.
+
+    Aware datetimes are converted; naive ones are taken to be UTC already.
+    """
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat(sep=" ", timespec="microseconds")
+
+class ConnectionPool:
+    """Long-lived SQLite connections: one serialized writer and N readers.
+
+    Every connection is configured once (WAL journal, synchronous=NORMAL,
+    cache/mmap sizing) and keeps its own prepared-statement cache, so the
+    per-call cost is a queue hand-off instead of a full connect.
+    """
+
+    def __init__(self, db_path: str, reader_connections: int = 4,
+                 cache_size_mb: int = 64, mmap_size_mb: int = 256,
+                 busy_timeout_ms: int = 5000, cached_statements: int = 256):
         self.db_path = db_path
+        self.reader_connections = max(1, reader_connections)
+        self.cache_size_mb = cache_size_mb
+        self.mmap_size_mb = mmap_size_mb
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+
+        self._writer = self._connect()
+        # Only takes effect on a brand-new file, which must happen before WAL is enabled
+        self._writer.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._writer_lock = threading.Lock()
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._reader_lock = threading.Lock()
+        self._readers_created = 0
+        self._closed = False
+
+        self._stats = {
+            "writer_acquisitions": 0,
+            "writer_wait_seconds": 0.0,
+            "reader_acquisitions": 0,
+            "reader_wait_seconds": 0.0,
+            "reader_waits": 0,
+        }
+        self._stats_lock = threading.Lock()
+
+        # WAL is persistent in the file, so setting it once on the writer is enough
+        self.journal_mode = self._writer.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open and configure a single connection."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+            isolation_level=None  # transactions are managed explicitly
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_mb) * 1024}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size_mb) * 1024 * 1024}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        register_sql_functions(conn)
+        return conn
+
+    def _record(self, kind: str, waited: float):
+        with self._stats_lock:
+            self._stats[f"{kind}_acquisitions"] += 1
+            self._stats[f"{kind}_wait_seconds"] += waited
+
+    @contextmanager
+    def writer(self):
+        """Borrow the writer connection inside a single transaction."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        start = time.perf_counter()
+        with self._writer_lock:
+            self._record("writer", time.perf_counter() - start)
+            self._writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._writer
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+            else:
+                self._writer.execute("COMMIT")
+
+    @contextmanager
+    def maintenance(self):
+        """Borrow the writer outside a transaction (VACUUM, incremental_vacuum, PRAGMAs)."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        start = time.perf_counter()
+        with self._writer_lock:
+            self._record("writer", time.perf_counter() - start)
+            yield self._writer
+
+    @contextmanager
+    def reader(self):
+        """Borrow a read-only connection, opening one lazily up to the pool size."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        start = time.perf_counter()
+        conn = None
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            with self._reader_lock:
+                if self._readers_created < self.reader_connections:
+                    self._readers_created += 1
+                    conn = self._connect(read_only=True)
+            if conn is None:
+                with self._stats_lock:
+                    self._stats["reader_waits"] += 1
+                conn = self._readers.get()
+
+        self._record("reader", time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._readers.put(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool usage counters."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            "db_path": self.db_path,
+            "journal_mode": self.journal_mode,
+            "reader_pool_size": self.reader_connections,
+            "readers_open": self._readers_created,
+            "readers_idle": self._readers.qsize(),
+            "writer_busy": self._writer_lock.locked(),
+            "closed": self._closed,
+        })
+        return stats
+
+    def close(self):
+        """Close all connections; safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+
+        with self._writer_lock:
+            try:
+                # Fold the WAL back into the main file so it doesn't linger on disk
+                self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error:
+                pass
+            self._writer.close()
+
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+class WriteBehindQueue:
+    """Bounded background queue that groups INSERTs into batched transactions.
+
+    Producers only pay for a queue hand-off; a single worker thread drains the
+    queue and commits a batch when it reaches ``batch_size`` rows or when the
+    oldest pending row has waited ``flush_interval`` seconds.
+    """
+
+    _STOP = object()
+
+    def __init__(self, pool: ConnectionPool, max_queue_size: int = 10000,
+                 batch_size: int = 500, flush_interval: float = 0.5,
+                 put_timeout: float = 5.0):
+        self._pool = pool
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queue_size))
+        self._flush_now = threading.Event()
+        self._closed = False
+
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "failed": 0,
+            "batches": 0,
+            "backpressure_waits": 0,
+            "largest_batch": 0,
+            "last_batch_ms": 0.0,
+        }
+        self._stats_lock = threading.Lock()
+
+        self._worker = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._worker.start()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def submit(self, sql: str, params: tuple, timeout: Optional[float] = None):
+        """Queue a statement, blocking up to ``timeout`` when the queue is full.
+
+        Raises ``queue.Full`` when no room frees up in time.
+        """
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        try:
+            self._queue.put_nowait((sql, params))
+        except queue.Full:
+            self._count("backpressure_waits")
+            self._queue.put((sql, params), timeout=self.put_timeout if timeout is None else timeout)
+        self._count("enqueued")
+
+    async def submit_async(self, sql: str, params: tuple):
+        """Queue a statement without blocking the event loop.
+
+        The fast path is a non-blocking put; only a full queue waits, and that
+        wait happens on a worker thread.
+        """
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        try:
+            self._queue.put_nowait((sql, params))
+            self._count("enqueued")
+        except queue.Full:
+            await asyncio.to_thread(self.submit, sql, params)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far; returns False on timeout."""
+        self._flush_now.set()
+        if timeout is None:
+            self._queue.join()
+            return True
+
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            self._flush_now.set()
+            time.sleep(0.01)
+        return True
+
+    def _run(self):
+        """Worker loop: collect a batch, then commit it in one transaction."""
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not self._flush_now.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+
+            # Drain without waiting once a flush was requested or we are stopping
+            while (stop or self._flush_now.is_set()) and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    continue
+                batch.append(item)
+
+            if self._queue.empty():
+                self._flush_now.clear()
+
+            self._write_batch(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+            if stop:
+                self._queue.task_done()
+                # Anything still queued behind the stop marker is written directly
+                self._drain_remaining()
+                return
+
+    def _drain_remaining(self):
+        """Write whatever is left in the queue after the worker was stopped."""
+        batch = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._STOP:
+                batch.append(item)
+            self._queue.task_done()
+        if batch:
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[tuple]):
+        """Commit a batch, grouping consecutive identical statements into executemany."""
+        start = time.perf_counter()
+        try:
+            with self._pool.writer() as conn:
+                for sql, rows in groupby(batch, key=lambda entry: entry[0]):
+                    conn.executemany(sql, [params for _, params in rows])
+            self._count("written", len(batch))
+        except Exception as e:
+            print(f"Error writing batch of {len(batch)} rows, retrying individually: {e}")
+            # Isolate bad rows so one failure doesn't discard the whole batch
+            for sql, params in batch:
+                try:
+                    with self._pool.writer() as conn:
+                        conn.execute(sql, params)
+                    self._count("written")
+                except Exception as row_error:
+                    self._count("failed")
+                    print(f"Error writing queued row: {row_error}")
+
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+            self._stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue counters and current depth."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            "queue_depth": self._queue.qsize(),
+            "max_queue_size": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "closed": self._closed,
+        })
+        return stats
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop accepting writes and flush everything that is queued."""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_now.set()
+        self._queue.put(self._STOP)
+        self._worker.join(timeout)
+
+class DatabaseManager(StorageBackend):
+    """Manage SQLite database for persistent storage.
+
+    Saves go through a write-behind queue; call ``flush()`` when a reader must
+    see rows that were just saved.
+    """
+
+    def __init__(self, db_path: str = "crewai_system.db", reader_connections: int = 4,
+                 cache_size_mb: int = 64, mmap_size_mb: int = 256,
+                 write_queue_size: int = 10000, write_batch_size: int = 500,
+                 write_flush_interval: float = 0.5, id_offset: int = 0):
+        self.db_path = db_path
+        self._pool = ConnectionPool(
+            db_path,
+            reader_connections=reader_connections,
+            cache_size_mb=cache_size_mb,
+            mmap_size_mb=mmap_size_mb
+        )
         self._initialize_db_sync()  # Initialize synchronously first
-    
+        if id_offset:
+            self._seed_id_range(id_offset)
+        self._write_queue = WriteBehindQueue(
+            self._pool,
+            max_queue_size=write_queue_size,
+            batch_size=write_batch_size,
+            flush_interval=write_flush_interval
+        )
+        atexit.register(self.close)
+
     def _initialize_db_sync(self):
-        """Initialize database tables synchronously."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Crew executions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS crew_executions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    topic TEXT NOT NULL,
-                    result TEXT NOT NULL,
-                    execution_time REAL,
-                    timestamp DATETIME NOT NULL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # QA interactions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS qa_interactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    question TEXT NOT NULL,
-                    answer TEXT NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Agent memories table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS agent_memories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    agent_type TEXT NOT NULL,
-                    memory_data TEXT NOT NULL,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            conn.commit()
-            conn.close()
-            print("✅ Database initialized successfully")
-            
+        """Initialize database tables synchronously by applying pending migrations."""
+        try:
+            apply_migrations(self._pool)
+            print(f"✅ Database initialized successfully ({self._pool.journal_mode} mode, schema v{self.get_schema_version()})")
+
         except Exception as e:
             print(f"❌ Error initializing database: {e}")
-    
-    async def save_crew_execution(self, session_id: str, topic: str, result: str, 
+
+    def _seed_id_range(self, id_offset: int):
+        """Start AUTOINCREMENT ids at ``id_offset`` so ids stay unique across shard files."""
+        with self._pool.writer() as conn:
+            for table in ("crew_executions", "qa_interactions"):
+                seeded = conn.execute("SELECT 1 FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+                if not seeded:
+                    conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, id_offset))
+
+    @property
+    def shards(self) -> List['DatabaseManager']:
+        """A single file is its own only shard."""
+        return [self]
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """The underlying connection pool (used by maintenance tasks)."""
+        return self._pool
+
+    def get_schema_version(self) -> int:
+        """Get the applied schema migration version."""
+        with self._pool.reader() as conn:
+            return get_schema_version(conn)
+
+    def _write(self, sql: str, params: tuple):
+        """Run a single statement on the pooled writer connection."""
+        with self._pool.writer() as conn:
+            conn.execute(sql, params)
+
+    async def _enqueue(self, sql: str, params: tuple):
+        """Hand a write to the write-behind queue, writing directly if it stays full."""
+        try:
+            await self._write_queue.submit_async(sql, params)
+        except (queue.Full, RuntimeError):
+            await asyncio.to_thread(self._write, sql, params)
+
+    async def save_crew_execution(self, session_id: str, topic: str, result: str,
                                 execution_time: float = None, timestamp: datetime = None):
-        """Save crew execution results."""
-        try:
-            if timestamp is None:
-                timestamp = datetime.now()
-            
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(
-                    "INSERT INTO crew_executions (session_id, topic, result, execution_time, timestamp) VALUES (?, ?, ?, ?, ?)",
-                    (session_id, topic, result, execution_time, timestamp)
-                )
-                await db.commit()
+        """Save crew execution results (``timestamp`` defaults to now, stored as UTC)."""
+        try:
+            codec, payload = compress_text(result)
+            await self._enqueue(
+                "INSERT INTO crew_executions (session_id, topic, result, result_codec, preview, execution_time, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (session_id, topic, payload, codec, make_preview(result), execution_time, utc_timestamp(timestamp))
+            )
         except Exception as e:
             print(f"Error saving crew execution: {e}")
-    
+
     async def save_qa_interaction(self, session_id: str, question: str, answer: str):
         """Save Q&A interaction."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute(
-                    "INSERT INTO qa_interactions (session_id, question, answer) VALUES (?, ?, ?)",
-                    (session_id, question, answer)
-                )
-                await db.commit()
+            # Timestamp is taken now rather than defaulted, since the row is written later
+            codec, payload = compress_text(answer)
+            await self._enqueue(
+                "INSERT INTO qa_interactions (session_id, question, answer, answer_codec, answer_preview, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, question, payload, codec, make_preview(answer), utc_timestamp())
+            )
         except Exception as e:
             print(f"Error saving QA interaction: {e}")
-    
+
+    _UPSERT_AGENT_MEMORY = (
+        "INSERT INTO agent_memories (session_id, agent_type, memory_data, updated_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (session_id, agent_type) DO UPDATE SET "
+        "memory_data = excluded.memory_data, updated_at = excluded.updated_at"
+    )
+
     async def save_agent_memory(self, session_id: str, agent_type: str, memory_data: str):
         """Save agent memory state."""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Update existing or insert new
-                await db.execute(
-                    "INSERT OR REPLACE INTO agent_memories (session_id, agent_type, memory_data, updated_at) VALUES (?, ?, ?, ?)",
-                    (session_id, agent_type, memory_data, datetime.now())
-                )
-                await db.commit()
+            # Update existing or insert new
+            await self._enqueue(
+                self._UPSERT_AGENT_MEMORY,
+                (session_id, agent_type, memory_data, utc_timestamp())
+            )
+        except Exception as e:
+            print(f"Error saving agent memory: {e}")
+
+    def save_agent_memory_sync(self, session_id: str, agent_type: str, memory_data: str):
+        """Save agent memory immediately, so a following read sees it."""
+        try:
+            self._write(
+                self._UPSERT_AGENT_MEMORY,
+                (session_id, agent_type, memory_data, utc_timestamp())
+            )
         except Exception as e:
             print(f"Error saving agent memory: {e}")
-    
+
+    def append_agent_messages(self, session_id: str, agent_type: str,
+                              messages: List[Tuple[int, str, str]]) -> bool:
+        """Append ``(seq, role, content)`` messages in one transaction, immediately.
+
+        Rows are never rewritten, so each turn costs only its new messages.
+        Re-sending an already stored ``seq`` is ignored.
+        """
+        if not messages:
+            return True
+        try:
+            created_at = utc_timestamp()
+            with self._pool.writer() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO agent_memory_messages "
+                    "(session_id, agent_type, seq, role, content, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(session_id, agent_type, seq, role, content, created_at) for seq, role, content in messages]
+                )
+            return True
+        except Exception as e:
+            print(f"Error appending agent messages: {e}")
+            return False
+
+    def get_agent_messages(self, session_id: str, agent_type: str, before_seq: Optional[int] = None,
+                           limit: int = 50, after_seq: Optional[int] = None) -> List[Tuple[int, str, str]]:
+        """Get the newest ``(seq, role, content)`` messages before ``before_seq`` (and from
+        ``after_seq`` on, when given), oldest first."""
+        try:
+            sql = "SELECT seq, role, content FROM agent_memory_messages WHERE session_id = ? AND agent_type = ?"
+            params: list = [session_id, agent_type]
+            if before_seq is not None:
+                sql += " AND seq < ?"
+                params.append(before_seq)
+            if after_seq is not None:
+                sql += " AND seq >= ?"
+                params.append(after_seq)
+            sql += " ORDER BY seq DESC LIMIT ?"
+            params.append(limit)
+
+            with self._pool.reader() as conn:
+                rows = conn.execute(sql, params).fetchall()
+            return [tuple(row) for row in reversed(rows)]
+        except Exception as e:
+            print(f"Error getting agent messages: {e}")
+            return []
+
+    def delete_agent_memory(self, session_id: str, agent_type: Optional[str] = None) -> bool:
+        """Delete one agent's stored memory, or the whole session's, immediately."""
+        try:
+            where = "session_id = ?" if agent_type is None else "session_id = ? AND agent_type = ?"
+            params = (session_id,) if agent_type is None else (session_id, agent_type)
+            with self._pool.writer() as conn:
+                conn.execute(f"DELETE FROM agent_memories WHERE {where}", params)
+                conn.execute(f"DELETE FROM agent_memory_messages WHERE {where}", params)
+            return True
+        except Exception as e:
+            print(f"Error deleting agent memory: {e}")
+            return False
+
     def get_agent_memory(self, session_id: str, agent_type: str) -> Optional[str]:
         """Get agent memory data synchronously."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "SELECT memory_data FROM agent_memories WHERE session_id = ? AND agent_type = ? ORDER BY updated_at DESC LIMIT 1",
-                (session_id, agent_type)
-            )
-            result = cursor.fetchone()
-            conn.close()
-            
+            with self._pool.reader() as conn:
+                result = conn.execute(
+                    "SELECT memory_data FROM agent_memories WHERE session_id = ? AND agent_type = ?",
+                    (session_id, agent_type)
+                ).fetchone()
+
             return result[0] if result else None
         except Exception as e:
             print(f"Error getting agent memory: {e}")
             return None
-    
-    def get_session_history(self, session_id: str) -> Dict[str, Any]:
-        """Get complete session history."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get crew executions
-            cursor.execute(
-                "SELECT topic, result, timestamp FROM crew_executions WHERE session_id = ? ORDER BY timestamp DESC LIMIT 10",
-                (session_id,)
-            )
-            executions = cursor.fetchall()
-            
-            # Get QA interactions
-            cursor.execute(
-                "SELECT question, answer, timestamp FROM qa_interactions WHERE session_id = ? ORDER BY timestamp DESC LIMIT 10",
+
+    async def aget_agent_memory(self, session_id: str, agent_type: str) -> Optional[str]:
+        """Get agent memory data without blocking the event loop."""
+        return await asyncio.to_thread(self.get_agent_memory, session_id, agent_type)
+
+    @staticmethod
+    def _encode_cursor(timestamp: str, row_id: int) -> str:
+        """Build an opaque keyset cursor from the last row of a page."""
+        return base64.urlsafe_b64encode(f"{timestamp}|{row_id}".encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, int]:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").rsplit("|", 1)
+        return timestamp, int(row_id)
+
+    # Columns returned for each history list: (table, title column, preview column, output keys)
+    _HISTORY_SOURCES = {
+        "execution": ("crew_executions", "topic", "preview", ("topic", "result")),
+        "qa": ("qa_interactions", "question", "answer_preview", ("question", "answer")),
+    }
+
+    def _history_page(self, conn: sqlite3.Connection, kind: str, session_id: str,
+                      limit: int, cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Read one newest-first page using a (timestamp, id) keyset cursor."""
+        table, title_column, preview_column, keys = self._HISTORY_SOURCES[kind]
+        sql = f"SELECT id, {title_column}, {preview_column}, timestamp FROM {table} WHERE session_id = ?"
+        params: list = [session_id]
+        if cursor:
+            # Seeks straight into the (session_id, timestamp, id) index, so deep pages cost the same as the first
+            sql += " AND (timestamp, id) < (?, ?)"
+            params.extend(self._decode_cursor(cursor))
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = conn.execute(sql, params).fetchall()
+        items = [
+            {"id": r[0], keys[0]: r[1], keys[1]: r[2], "timestamp": r[3]}
+            for r in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit and items:
+            next_cursor = self._encode_cursor(items[-1]["timestamp"], items[-1]["id"])
+        return items, next_cursor
+
+    def get_session_totals(self, session_id: str) -> Dict[str, int]:
+        """Get maintained row counts for a session."""
+        with self._pool.reader() as conn:
+            rows = conn.execute(
+                "SELECT kind, count FROM session_counters WHERE session_id = ?",
                 (session_id,)
-            )
-            qa_interactions = cursor.fetchall()
-            
-            conn.close()
-            
+            ).fetchall()
+        counts = dict(rows)
+        return {"executions": counts.get("execution", 0), "qa": counts.get("qa", 0)}
+
+    def get_session_history(self, session_id: str, limit: int = 10,
+                            execution_cursor: Optional[str] = None,
+                            qa_cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get complete session history.
+
+        Each list is paged independently: pass back ``next_execution_cursor`` /
+        ``next_qa_cursor`` to continue. Only the stored previews are read; open a
+        full body with ``get_execution_result`` / ``get_qa_interaction``.
+        """
+        try:
+            with self._pool.reader() as conn:
+                # Get crew executions
+                executions, next_execution_cursor = self._history_page(
+                    conn, "execution", session_id, limit, execution_cursor
+                )
+
+                # Get QA interactions
+                qa_interactions, next_qa_cursor = self._history_page(
+                    conn, "qa", session_id, limit, qa_cursor
+                )
+
+            totals = self.get_session_totals(session_id)
             return {
-                "executions": [{"topic": e[0], "result": e[1][:200] + "...", "timestamp": e[2]} for e in executions],
-                "qa_interactions": [{"question": q[0], "answer": q[1][:200] + "...", "timestamp": q[2]} for q in qa_interactions],
-                "total_executions": len(executions),
-                "total_qa": len(qa_interactions)
+                "executions": executions,
+                "qa_interactions": qa_interactions,
+                "total_executions": totals["executions"],
+                "total_qa": totals["qa"],
+                "next_execution_cursor": next_execution_cursor,
+                "next_qa_cursor": next_qa_cursor
             }
         except Exception as e:
             print(f"Error getting session history: {e}")
             return {"error": str(e)}
+
+    async def aget_session_history(self, session_id: str, limit: int = 10,
+                                   execution_cursor: Optional[str] = None,
+                                   qa_cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get session history without blocking the event loop."""
+        return await asyncio.to_thread(
+            self.get_session_history, session_id, limit, execution_cursor, qa_cursor
+        )
+
+    def get_execution_result(self, execution_id: int) -> Optional[Dict[str, Any]]:
+        """Get one crew execution with its full, decompressed result."""
+        try:
+            with self._pool.reader() as conn:
+                row = conn.execute(
+                    "SELECT id, session_id, topic, result_codec, result, execution_time, timestamp "
+                    "FROM crew_executions WHERE id = ?",
+                    (execution_id,)
+                ).fetchone()
+
+            if row is None:
+                return None
+            return {
+                "id": row[0],
+                "session_id": row[1],
+                "topic": row[2],
+                "result": decompress_text(row[3], row[4]),
+                "execution_time": row[5],
+                "timestamp": row[6]
+            }
+        except Exception as e:
+            print(f"Error getting execution result: {e}")
+            return None
+
+    def get_qa_interaction(self, qa_id: int) -> Optional[Dict[str, Any]]:
+        """Get one Q&A interaction with its full, decompressed answer."""
+        try:
+            with self._pool.reader() as conn:
+                row = conn.execute(
+                    "SELECT id, session_id, question, answer_codec, answer, timestamp FROM qa_interactions WHERE id = ?",
+                    (qa_id,)
+                ).fetchone()
+
+            if row is None:
+                return None
+            return {
+                "id": row[0],
+                "session_id": row[1],
+                "question": row[2],
+                "answer": decompress_text(row[3], row[4]),
+                "timestamp": row[5]
+            }
+        except Exception as e:
+            print(f"Error getting QA interaction: {e}")
+            return None
+
+    def get_research_entry(self, topic_key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached research result by normalized topic, expired or not."""
+        try:
+            with self._pool.reader() as conn:
+                row = conn.execute(
+                    "SELECT topic_key, topic, result_codec, result, created_at, expires_at "
+                    "FROM research_cache WHERE topic_key = ?",
+                    (topic_key,)
+                ).fetchone()
+
+            if row is None:
+                return None
+            return {
+                "topic_key": row[0],
+                "topic": row[1],
+                "result": decompress_text(row[2], row[3]),
+                "created_at": row[4],
+                "expires_at": row[5]
+            }
+        except Exception as e:
+            print(f"Error getting cached research: {e}")
+            return None
+
+    def find_research_candidates(self, bands: List[str], now: float, limit: int = 50) -> List[str]:
+        """Keys of unexpired cached topics sharing at least one LSH band, most shared first."""
+        if not bands:
+            return []
+        try:
+            placeholders = ",".join("?" * len(bands))
+            with self._pool.reader() as conn:
+                rows = conn.execute(
+                    f"SELECT b.topic_key FROM research_cache_bands b "
+                    f"JOIN research_cache c ON c.topic_key = b.topic_key "
+                    f"WHERE b.band IN ({placeholders}) AND c.expires_at > ? "
+                    f"GROUP BY b.topic_key ORDER BY count(*) DESC LIMIT ?",
+                    (*bands, now, limit)
+                ).fetchall()
+            return [row[0] for row in rows]
+        except Exception as e:
+            print(f"Error finding cached research: {e}")
+            return []
+
+    def save_research_entry(self, topic_key: str, topic: str, result: str, bands: List[str],
+                            created_at: float, expires_at: float):
+        """Store (or replace) a cached research result and its LSH bands immediately."""
+        try:
+            codec, payload = compress_text(result)
+            with self._pool.writer() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO research_cache "
+                    "(topic_key, topic, result_codec, result, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (topic_key, topic, codec, payload, created_at, expires_at)
+                )
+                conn.execute("DELETE FROM research_cache_bands WHERE topic_key = ?", (topic_key,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO research_cache_bands (band, topic_key) VALUES (?, ?)",
+                    [(band, topic_key) for band in bands]
+                )
+        except Exception as e:
+            print(f"Error saving cached research: {e}")
+
+    def purge_research_cache(self, before: float, topic_key: Optional[str] = None) -> int:
+        """Delete cached research that expired before ``before`` (or one topic); returns rows removed."""
+        try:
+            where, params = ("topic_key = ?", (topic_key,)) if topic_key else ("expires_at < ?", (before,))
+            with self._pool.writer() as conn:
+                conn.execute(
+                    f"DELETE FROM research_cache_bands WHERE topic_key IN "
+                    f"(SELECT topic_key FROM research_cache WHERE {where})",
+                    params
+                )
+                return conn.execute(f"DELETE FROM research_cache WHERE {where}", params).rowcount
+        except Exception as e:
+            print(f"Error purging cached research: {e}")
+            return 0
+
+    @staticmethod
+    def _to_fts_query(query: str) -> str:
+        """Turn free text into a safe FTS5 query (all terms, last one as a prefix)."""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return ""
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    @staticmethod
+    def _make_snippet(text: str, query: str, highlight: tuple, words: int = 24) -> str:
+        """Window of ``words`` words around the first query term in ``text``, terms highlighted.
+
+        The index holds no text, so snippets are cut here from the decompressed
+        body; terms match by a rough stem, close to what the porter tokenizer found.
+        """
+        def stem(word: str) -> str:
+            for suffix in ("ing", "ed", "es", "s", "ly"):
+                if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                    return word[:-len(suffix)]
+            return word
+
+        stems = [stem(term) for term in re.findall(r"\w+", query.lower())
+                 if term not in ("and", "or", "not", "near")]
+        tokens = text.split()
+        hits = [i for i, token in enumerate(tokens)
+                if any(re.sub(r"\W", "", token.lower()).startswith(s) for s in stems if s)]
+        start = max(0, hits[0] - words // 3) if hits else 0
+        window = tokens[start:start + words]
+        marked = {i - start for i in hits if start <= i < start + words}
+        snippet = " ".join(
+            f"{highlight[0]}{token}{highlight[1]}" if i in marked else token for i, token in enumerate(window)
+        )
+        return ("…" if start else "") + snippet + ("…" if start + words < len(tokens) else "")
+
+    def search_history(self, query: str, session_id: Optional[str] = None, limit: int = 20,
+                       offset: int = 0, raw_query: bool = False,
+                       highlight: tuple = ("**", "**")) -> Dict[str, Any]:
+        """Full-text search over past research results and Q&A, ranked by BM25.
+
+        Free text is matched term by term; pass ``raw_query=True`` to use FTS5
+        syntax (phrases, OR, NEAR) directly. Topic/question matches weigh more
+        than matches in the body.
+        """
+        try:
+            match = query if raw_query else self._to_fts_query(query)
+            if not match:
+                return {"query": query, "results": [], "limit": limit, "offset": offset, "has_more": False}
+
+            # Rank inside the contentless index, then join metadata from the source rows
+            # (rowid = id * 2 for executions, id * 2 + 1 for Q&A)
+            session_filter = " AND {0}.session_id = ?" if session_id is not None else ""
+            sql = (
+                "WITH hits AS MATERIALIZED ("
+                "SELECT rowid, bm25(history_fts, 4.0, 1.0) AS score FROM history_fts WHERE history_fts MATCH ?) "
+                "SELECT 'execution', e.id, e.session_id, e.topic, e.timestamp, h.score "
+                "FROM hits h JOIN crew_executions e ON e.id = h.rowid / 2 "
+                "WHERE h.rowid % 2 = 0" + session_filter.format("e") + " "
+                "UNION ALL "
+                "SELECT 'qa', q.id, q.session_id, q.question, q.timestamp, h.score "
+                "FROM hits h JOIN qa_interactions q ON q.id = h.rowid / 2 "
+                "WHERE h.rowid % 2 = 1" + session_filter.format("q") + " "
+                "ORDER BY 6 LIMIT ? OFFSET ?"
+            )
+            params: list = [match] + [session_id] * (2 if session_id is not None else 0)
+            # Fetch one extra row to know whether another page exists
+            params.extend([limit + 1, offset])
+
+            with self._pool.reader() as conn:
+                rows = conn.execute(sql, params).fetchall()
+                page = rows[:limit]
+                # Only the bodies on this page are decompressed, for their snippets
+                bodies = {}
+                for kind, table, column in (("execution", "crew_executions", "result"),
+                                             ("qa", "qa_interactions", "answer")):
+                    ids = [r[1] for r in page if r[0] == kind]
+                    if ids:
+                        placeholders = ",".join("?" * len(ids))
+                        for row_id, codec, payload in conn.execute(
+                            f"SELECT id, {column}_codec, {column} FROM {table} WHERE id IN ({placeholders})", ids
+                        ):
+                            bodies[(kind, row_id)] = decompress_text(codec, payload)
+
+            return {
+                "query": query,
+                "results": [
+                    {
+                        "kind": r[0],
+                        "id": r[1],
+                        "session_id": r[2],
+                        "title": r[3],
+                        "timestamp": r[4],
+                        "snippet": self._make_snippet(bodies.get((r[0], r[1]), ""), query, highlight),
+                        "score": round(-r[5], 4)
+                    }
+                    for r in page
+                ],
+                "limit": limit,
+                "offset": offset,
+                "has_more": len(rows) > limit
+            }
+        except Exception as e:
+            print(f"Error searching history: {e}")
+            return {"error": str(e)}
+
+    def rebuild_search_index(self) -> int:
+        """Re-index all stored executions and Q&A (backfill for existing databases)."""
+        self.flush()
+        with self._pool.writer() as conn:
+            return rebuild_history_index(conn)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        return self._pool.get_stats()
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Get write-behind queue statistics."""
+        return self._write_queue.get_stats()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued writes are committed."""
+        return self._write_queue.flush(timeout)
+
+    def close(self):
+        """Flush queued writes and close pooled connections (registered as an exit hook)."""
+        self._write_queue.close()
+        self._pool.close()
+
+
+def create_database_manager(settings, check_placement: bool = True) -> StorageBackend:
+    """Build the storage backend selected by ``settings.database_shards``.
+
+    ``check_placement=False`` opens shards whose sessions still need moving
+    (used by ``manage_db.py reshard``).
+    """
+    options = dict(
+        reader_connections=getattr(settings, 'db_reader_connections', 4),
+        cache_size_mb=getattr(settings, 'db_cache_size_mb', 64),
+        mmap_size_mb=getattr(settings, 'db_mmap_size_mb', 256),
+        write_queue_size=getattr(settings, 'db_write_queue_size', 10000),
+        write_batch_size=getattr(settings, 'db_write_batch_size', 500),
+        write_flush_interval=getattr(settings, 'db_write_flush_interval', 0.5)
+    )
+    set_default_codec(getattr(settings, 'db_compression_codec', 'zlib'))
+    shard_count = getattr(settings, 'database_shards', 1)
+    from .sharding import ShardedDatabaseManager, stray_shard_files
+    # Leftover shard files after scaling back down make the sharded manager refuse to start
+    if shard_count > 1 or stray_shard_files(settings.database_url, shard_count):
+        return ShardedDatabaseManager(settings.database_url, shard_count, check_placement=check_placement, **options)
+    return DatabaseManager(settings.database_url, **options)
@@ -0,0 +1,47 @@
+import json
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def create_http_session(pool_size: int = 10, max_retries: int = 2,
+                        backoff_factor: float = 0.3) -> requests.Session:
+    """Build a keep-alive session shared by all search providers.
+
+    Each host gets a pool of up to ``pool_size`` reusable connections, so a
+    query after the first skips the TCP and TLS handshakes. Only failures to
+    connect are retried (the request never left, so this is safe for POSTs);
+    read timeouts, error statuses and ``Retry-After`` are left to the caller's
+    rate limiter and circuit breaker.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive"
+    })
+    return session
+
+def read_json(response: requests.Response) -> Any:
+    """Decode a ``stream=True`` response body straight from the socket.
+
+    The decompressed bytes are parsed directly, skipping the buffered
+    ``content`` copy and the decoded ``text`` copy ``response.json()`` makes.
+    """
+    response.raw.decode_content = True
+    return json.load(response.raw)
\ No newline at end of file
@@ -0,0 +1,270 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Set
+
+class QueueFull(Exception):
+    """Raised when a job is refused: the queue is at capacity or memory is over the limit."""
+
+class Job:
+    """One queued crew run; ``future`` resolves to the callable's result."""
+    __slots__ = ("id", "kind", "priority", "seq", "func", "args", "loop", "submitted_at",
+                 "started_at", "finished_at", "future")
+
+    def __init__(self, kind: str, priority: int, seq: int, func: Callable, args: tuple,
+                 loop: asyncio.AbstractEventLoop):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.priority = priority
+        self.seq = seq
+        self.func = func
+        self.args = args
+        # The submitting caller's loop (the app server's), where the job runs
+        self.loop = loop
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Future = Future()
+
+    def __lt__(self, other: 'Job') -> bool:
+        # Lower priority value first, FIFO within a priority
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+def _percentile(samples, q: float) -> Optional[float]:
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    return f"{seconds // 60}m {seconds % 60:02d}s" if seconds >= 60 else f"{seconds}s"
+
+class JobScheduler:
+    """Bounded worker pool for crew runs, so bursts queue instead of piling onto the LLM.
+
+    At most ``max_workers`` jobs run at once; up to ``max_queue`` more wait
+    in a priority queue (FIFO within a priority). Past that, or while the
+    process uses more than ``memory_limit_mb``, ``submit`` raises
+    ``QueueFull`` so callers can ask the user to retry later.
+
+    Jobs run as tasks on the event loop they were submitted from, i.e. the
+    app server's own loop; blocking work inside them (``crew.kickoff``) goes
+    through ``run_blocking`` onto a thread pool sized to ``max_workers``, so
+    the loop itself never blocks.
+    """
+
+    def __init__(self, max_workers: int = 3, max_queue: int = 20, memory_limit_mb: int = 0,
+                 default_duration: float = 120.0, window: int = 100):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self.memory_limit_mb = memory_limit_mb
+        self.default_duration = default_duration
+
+        self._heap: List[Job] = []
+        self._queued: Dict[str, Job] = {}
+        self._running: Dict[str, Job] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._wait_times: deque = deque(maxlen=window)
+        self._run_times: Dict[str, deque] = {}
+        self._window = window
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0,
+                       "cancelled": 0, "max_queue_depth": 0}
+
+        # Running tasks, referenced so they are not garbage collected mid-run
+        self._tasks: Set[asyncio.Task] = set()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crew-worker")
+
+    @classmethod
+    def from_settings(cls, settings) -> 'JobScheduler':
+        """Build a scheduler from ``max_concurrent_crews`` and the ``crew_*`` fields in ``Settings``."""
+        return cls(
+            max_workers=getattr(settings, 'max_concurrent_crews', 3),
+            max_queue=getattr(settings, 'crew_queue_max_size', 20),
+            memory_limit_mb=getattr(settings, 'memory_limit_mb', 0)
+        )
+
+    def _memory_exceeded(self) -> bool:
+        if not self.memory_limit_mb:
+            return False
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss > self.memory_limit_mb * 1024 * 1024
+        except ImportError:
+            return False
+
+    def submit(self, func: Callable, *args, kind: str = "research", priority: int = 0) -> Job:
+        """Queue ``func(*args)``; call from a coroutine on the app's loop.
+
+        Coroutine functions run as tasks on that loop, others on the executor.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._closed:
+                raise QueueFull("The scheduler is shutting down")
+            if len(self._queued) >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise QueueFull(f"The system is busy ({len(self._queued)} requests waiting). Please try again in a few minutes.")
+            if self._memory_exceeded():
+                self._stats["rejected"] += 1
+                raise QueueFull("The system is low on memory. Please try again in a few minutes.")
+
+            job = Job(kind, priority, next(self._seq), func, args, loop)
+            heapq.heappush(self._heap, job)
+            self._queued[job.id] = job
+            self._stats["submitted"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._queued))
+        self._dispatch()
+        return job
+
+    def cancel(self, job: Job) -> bool:
+        """Drop a job that has not started yet (e.g. the user left the page)."""
+        with self._lock:
+            if self._queued.pop(job.id, None) is None:
+                return False
+            # Left in the heap; workers skip jobs no longer in _queued
+            self._stats["cancelled"] += 1
+        job.future.cancel()
+        return True
+
+    def _dispatch(self):
+        """Start queued jobs while fewer than ``max_workers`` are running."""
+        started = []
+        with self._lock:
+            while len(self._running) < self.max_workers and not self._closed:
+                # Cancelled jobs stay in the heap until they reach the top
+                while self._heap and self._heap[0].id not in self._queued:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    break
+                job = heapq.heappop(self._heap)
+                del self._queued[job.id]
+                job.started_at = time.monotonic()
+                self._running[job.id] = job
+                self._wait_times.append(job.started_at - job.submitted_at)
+                started.append(job)
+        for job in started:
+            # A job starts on its submitter's loop, which need not be the current one
+            job.loop.call_soon_threadsafe(self._start, job)
+
+    def _start(self, job: Job):
+        task = job.loop.create_task(self._execute(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, job: Job):
+        outcome = None
+        try:
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    if asyncio.iscoroutinefunction(job.func):
+                        result = await job.func(*job.args)
+                    else:
+                        result = await self.run_blocking(job.func, *job.args)
+                    job.future.set_result(result)
+                    outcome = "completed"
+                except BaseException as e:
+                    # Also loop cancellation and interrupts: waiters must not hang
+                    job.future.set_exception(e)
+                    outcome = "cancelled" if isinstance(e, asyncio.CancelledError) else "failed"
+                    if not isinstance(e, Exception):
+                        raise
+        finally:
+            job.finished_at = time.monotonic()
+            with self._lock:
+                del self._running[job.id]
+                if outcome:
+                    self._stats[outcome] += 1
+                if outcome in ("completed", "failed"):
+                    self._run_times.setdefault(job.kind, deque(maxlen=self._window)).append(
+                        job.finished_at - job.started_at
+                    )
+            self._dispatch()
+
+    async def run_blocking(self, func: Callable, *args) -> Any:
+        """Await blocking work (e.g. ``crew.kickoff``) on the crew executor.
+
+        Context variables such as the current output stream carry over to the worker thread.
+        """
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(context.run, func, *args)
+        )
+
+    def _typical_duration(self, kind: str) -> float:
+        samples = self._run_times.get(kind)
+        return sum(samples) / len(samples) if samples else self.default_duration
+
+    def position(self, job: Job) -> Optional[int]:
+        """1-based place in the queue, 0 once running, None when finished or cancelled."""
+        with self._lock:
+            if job.id in self._running:
+                return 0
+            if job.id not in self._queued:
+                return None
+            return 1 + sum(1 for other in self._queued.values() if other < job)
+
+    def estimated_wait(self, job: Job) -> float:
+        """Seconds until ``job`` is likely to start, from recent run times."""
+        position = self.position(job)
+        if not position:
+            return 0.0
+        with self._lock:
+            duration = self._typical_duration(job.kind)
+            running = list(self._running.values())
+        now = time.monotonic()
+        # Time until the first worker frees up, then one typical run per wave of workers
+        if len(running) < self.max_workers:
+            first_free = 0.0
+        else:
+            first_free = min(max(0.0, duration - (now - other.started_at)) for other in running)
+        return first_free + ((position - 1) // self.max_workers) * duration
+
+    def describe(self, job: Job) -> str:
+        """One-line status for the user while the job waits or runs."""
+        position = self.position(job)
+        if position is None:
+            return "✅ Finishing up..."
+        if position == 0:
+            elapsed = time.monotonic() - job.started_at
+            with self._lock:
+                typical = self._typical_duration(job.kind)
+            return f"🔄 Running for {_format_duration(elapsed)} (usually about {_format_duration(typical)})"
+        with self._lock:
+            depth = len(self._queued)
+        return (f"⏳ Queued: position {position} of {depth}, "
+                f"estimated wait {_format_duration(self.estimated_wait(job))}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, wait and run time metrics."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "queue_depth": len(self._queued),
+                "running": len(self._running),
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "wait_seconds_p50": _percentile(self._wait_times, 0.5),
+                "wait_seconds_p95": _percentile(self._wait_times, 0.95),
+                "run_seconds_p50": {kind: _percentile(times, 0.5) for kind, times in self._run_times.items()},
+            })
+        return stats
+
+    def shutdown(self, wait: bool = False):
+        """Refuse new jobs, cancel queued ones and release the executor."""
+        with self._lock:
+            self._closed = True
+            queued = list(self._queued.values())
+            self._queued.clear()
+        for job in queued:
+            job.future.cancel()
+        self.executor.shutdown(wait=wait)
\ No newline at end of file
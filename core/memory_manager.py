@@ -1,57 +1,558 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Any, Tuple
 import json
+import threading
+import time
+
+from .rolling_memory import RollingSummaryMemory
 
 # Simple memory implementation that doesn't require langchain initially
 class SimpleMemory:
     """Simple memory implementation."""
-    
+
     def __init__(self):
         self.messages = []
         self.memory_key = "chat_history"
-    
+
     def add_message(self, message):
         """Add a message to memory."""
         self.messages.append(str(message))
-    
+
     def clear(self):
         """Clear memory."""
         self.messages = []
-    
+
     def get_messages(self):
         """Get all messages."""
         return self.messages
 
+def _langchain_messages(memory) -> Optional[list]:
+    """Return the message list of a LangChain buffer memory, if that is what this is."""
+    chat_memory = getattr(memory, "chat_memory", None)
+    return getattr(chat_memory, "messages", None) if chat_memory is not None else None
+
+def estimate_memory_bytes(memory) -> int:
+    """Approximate the footprint of a memory object from its message text."""
+    if isinstance(memory, RollingSummaryMemory):
+        return memory.approx_bytes()
+    messages = _langchain_messages(memory)
+    if messages is not None:
+        return 256 + sum(len(str(getattr(m, "content", m))) + 64 for m in messages)
+    return 256 + sum(len(m) + 64 for m in getattr(memory, "messages", []))
+
+def message_list(memory) -> list:
+    """The live message list of either memory type (mutating it mutates the memory)."""
+    messages = _langchain_messages(memory)
+    return messages if messages is not None else memory.messages
+
+def message_to_row(message) -> Tuple[str, str]:
+    """Split a message into the ``(role, content)`` pair stored in the log."""
+    if isinstance(message, str):
+        return "text", message
+    return getattr(message, "type", "human"), str(getattr(message, "content", message))
+
+def messages_from_rows(memory, rows: List[Tuple[int, str, str]]) -> list:
+    """Rebuild message objects of the right kind for ``memory`` from log rows."""
+    if _langchain_messages(memory) is None:
+        return [content for _, _, content in rows]
+
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+    classes = {"ai": AIMessage, "system": SystemMessage}
+    return [classes.get(role, HumanMessage)(content=content) for _, role, content in rows]
+
+class _CacheEntry:
+    """Cached memory plus the bookkeeping the eviction policy and the log need."""
+    __slots__ = ("session_id", "agent_type", "memory", "size_bytes", "last_used",
+                 "synced", "synced_list", "synced_tail", "next_seq", "oldest_seq")
+
+    def __init__(self, session_id: str, agent_type: str, memory, size_bytes: int,
+                 synced: int = 0, next_seq: int = 0, oldest_seq: int = 0):
+        self.session_id = session_id
+        self.agent_type = agent_type
+        self.memory = memory
+        # Measured when messages are persisted or paged in, not on every lookup
+        self.size_bytes = size_bytes
+        # Stamped by lookups without any shared lock; the eviction sweep orders by it
+        self.last_used = time.monotonic()
+        # Leading messages of the live list already in the log, the seq the next
+        # new message gets, and the seq of the oldest message loaded so far
+        self.synced = synced
+        # The list object and its last message at the last sync: if either
+        # changes, the agent cleared or rewrote its memory
+        self.synced_list = None
+        self.synced_tail = None
+        self.next_seq = next_seq
+        self.oldest_seq = oldest_seq
+
+class _SessionBucket:
+    """All cached agent memories of one session, guarded by the session's own lock."""
+    __slots__ = ("agents", "lock", "hits", "last_access", "closed")
+
+    def __init__(self):
+        self.agents: Dict[str, _CacheEntry] = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.last_access = time.monotonic()
+        # Set once the bucket leaves the registry; late arrivals must look up again
+        self.closed = False
+
 class PersistentMemoryManager:
-    """Enhanced memory manager with database persistence."""
-    
-    def __init__(self, db_manager):
+    """Enhanced memory manager with database persistence.
+
+    Memories are indexed session -> agent_type, so clearing or evicting a
+    session touches only its own bucket. A cache hit takes just that
+    session's lock and stamps the entry's ``last_used``. Running entry/byte
+    totals live under a separate usage lock, updated when entries are
+    loaded, persisted or dropped; only when a limit is exceeded does the
+    eviction sweep order entries by ``last_used`` and persist the victims
+    under their own session's lock.
+
+    The in-process cache is bounded by entry count and approximate bytes
+    (least recently used agents go first) and sessions idle for longer than
+    ``idle_ttl_seconds`` are evicted whole. Messages are persisted to an
+    append-only log: each ``persist_agent_memory`` call writes only what was
+    added since the last one. A reload restores just the newest page;
+    ``load_older_messages`` pulls earlier pages on demand. Rolling memories
+    also save their summary in ``agent_memories``, so a reload restores it
+    and replays only the turns it does not cover.
+    """
+
+    def __init__(self, db_manager, max_entries: int = 1000, max_bytes: int = 512 * 1024 * 1024,
+                 idle_ttl_seconds: float = 1800, reload_page_size: int = 50,
+                 token_budget: int = 0, summary_token_budget: int = 500, vector_store=None):
         self.db_manager = db_manager
-        self._memory_cache: Dict[str, SimpleMemory] = {}
-    
+        # Optional semantic index of past findings (see core.vector_store)
+        self.vector_store = vector_store
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.reload_page_size = reload_page_size
+        # A positive budget switches new memories to RollingSummaryMemory
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+
+        self._sessions: Dict[str, _SessionBucket] = {}
+        # Guards the idle-sweep schedule; never taken on the lookup path
+        self._lock = threading.Lock()
+        # Running totals and (session_id, agent_type) -> entry, for the eviction sweep
+        self._usage_lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], _CacheEntry] = {}
+        self._total_entries = 0
+        self._total_bytes = 0
+        self._stats_lock = threading.Lock()
+        self._next_idle_sweep = time.monotonic() + self._sweep_interval()
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "evictions_lru": 0,
+                       "evictions_bytes": 0, "evictions_ttl": 0, "evictions_manual": 0, "persisted": 0,
+                       "messages_appended": 0, "messages_loaded": 0, "sessions_expired": 0}
+
+    @classmethod
+    def from_settings(cls, db_manager, settings, vector_store=None) -> 'PersistentMemoryManager':
+        """Size the cache from ``Settings`` (a share of ``memory_limit_mb``)."""
+        return cls(
+            db_manager,
+            max_entries=settings.memory_cache_max_entries,
+            max_bytes=int(settings.memory_limit_mb * 1024 * 1024 * settings.memory_cache_share),
+            idle_ttl_seconds=settings.memory_cache_idle_ttl_seconds,
+            reload_page_size=settings.memory_reload_page_size,
+            token_budget=settings.memory_token_budget,
+            summary_token_budget=settings.memory_summary_token_budget,
+            vector_store=vector_store
+        )
+
+    def _create_memory(self):
+        if self.token_budget > 0:
+            return RollingSummaryMemory(self.token_budget, self.summary_token_budget)
+        # Try to use langchain memory if available, otherwise use simple memory
+        try:
+            from langchain.memory import ConversationBufferMemory
+            return ConversationBufferMemory(
+                memory_key="chat_history",
+                return_messages=True,
+                output_key="output"
+            )
+        except ImportError:
+            print("Using simple memory (langchain not available)")
+            return SimpleMemory()
+
+    def _has_log(self) -> bool:
+        return self.db_manager is not None and hasattr(self.db_manager, "append_agent_messages")
+
+    def _load_entry(self, session_id: str, agent_type: str) -> _CacheEntry:
+        """Create a memory object holding the newest page of its persisted log."""
+        memory = self._create_memory()
+        entry = _CacheEntry(session_id, agent_type, memory, 0)
+        if self._has_log():
+            try:
+                if isinstance(memory, RollingSummaryMemory):
+                    rows = self._restore_rolling(entry)
+                else:
+                    rows = self.db_manager.get_agent_messages(session_id, agent_type, limit=self.reload_page_size)
+                    message_list(memory).extend(messages_from_rows(memory, rows))
+                if rows:
+                    entry.oldest_seq = rows[0][0]
+                    entry.next_seq = max(entry.next_seq, rows[-1][0] + 1)
+                    self._count("reloads")
+                    self._count("messages_loaded", len(rows))
+            except Exception as e:
+                print(f"Error restoring agent memory: {e}")
+        if not isinstance(memory, RollingSummaryMemory):
+            self._mark_synced(entry, message_list(memory))
+        entry.size_bytes = estimate_memory_bytes(memory)
+        return entry
+
+    def _restore_rolling(self, entry: _CacheEntry) -> List[Tuple[int, str, str]]:
+        """Restore a rolling memory's saved summary and the turns it still held verbatim."""
+        raw = self.db_manager.get_agent_memory(entry.session_id, entry.agent_type)
+        try:
+            saved = json.loads(raw) if raw else None
+        except ValueError:
+            saved = None
+        if not isinstance(saved, dict) or "rolling" not in saved:
+            # No saved summary yet: rebuild one from the newest page of the log
+            rows = self.db_manager.get_agent_messages(entry.session_id, entry.agent_type, limit=self.reload_page_size)
+            entry.memory.load_history([(role, content) for _, role, content in rows])
+            return rows
+
+        state = saved["rolling"]
+        rows = self.db_manager.get_agent_messages(
+            entry.session_id, entry.agent_type, after_seq=saved["cursor"],
+            limit=max(self.reload_page_size, state.get("recent_messages", 0))
+        )
+        entry.memory.restore(state, [(role, content) for _, role, content in rows])
+        entry.next_seq = saved["next_seq"]
+        return rows
+
+    def _save_rolling_state(self, entry: _CacheEntry):
+        """Store the running summary with the seq of the first turn it does not cover."""
+        state = entry.memory.get_state()
+        self.db_manager.save_agent_memory_sync(entry.session_id, entry.agent_type, json.dumps({
+            "rolling": state,
+            "cursor": entry.next_seq - state["recent_messages"],
+            "next_seq": entry.next_seq,
+        }))
+
+    @staticmethod
+    def _mark_synced(entry: _CacheEntry, messages: list):
+        entry.synced = len(messages)
+        entry.synced_list = messages
+        entry.synced_tail = messages[-1] if messages else None
+
+    def _reset_log(self, entry: _CacheEntry) -> bool:
+        """Drop an agent's persisted log after its memory was cleared."""
+        if not self.db_manager.delete_agent_memory(entry.session_id, entry.agent_type):
+            return False
+        # seq keeps counting up, so rows of the old log can never be mistaken for new ones
+        entry.oldest_seq = 0
+        return True
+
+    def _persist(self, entry: _CacheEntry):
+        """Append the messages added since the last persist to the log."""
+        if not self._has_log():
+            return
+        if isinstance(entry.memory, RollingSummaryMemory):
+            self._persist_pending(entry)
+            return
+        messages = message_list(entry.memory)
+        rewritten = (messages is not entry.synced_list or len(messages) < entry.synced
+                     or (entry.synced and messages[entry.synced - 1] is not entry.synced_tail))
+        if rewritten:
+            # Cleared (or replaced) since the last persist: the log restarts from what it holds now
+            if not self._reset_log(entry):
+                return
+            self._mark_synced(entry, [])
+            entry.synced_list = messages
+        new_messages = messages[entry.synced:]
+        if not new_messages:
+            return
+
+        rows = [(entry.next_seq + offset,) + message_to_row(message)
+                for offset, message in enumerate(new_messages)]
+        if self.db_manager.append_agent_messages(entry.session_id, entry.agent_type, rows):
+            self._mark_synced(entry, messages)
+            entry.next_seq += len(rows)
+            self._count("persisted")
+            self._count("messages_appended", len(rows))
+
+    def _persist_pending(self, entry: _CacheEntry):
+        """Rolling memories journal their additions, since old turns leave the window."""
+        if entry.memory.cleared:
+            if not self._reset_log(entry):
+                return
+            entry.memory.cleared = False
+        pending = entry.memory.pending_messages()
+        if not pending:
+            return
+        rows = [(entry.next_seq + offset, role, content) for offset, (role, content) in enumerate(pending)]
+        if self.db_manager.append_agent_messages(entry.session_id, entry.agent_type, rows):
+            entry.memory.mark_persisted(len(rows))
+            entry.next_seq += len(rows)
+            self._save_rolling_state(entry)
+            self._count("persisted")
+            self._count("messages_appended", len(rows))
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _sweep_interval(self) -> float:
+        return min(60.0, self.idle_ttl_seconds / 4)
+
+    def _bucket(self, session_id: str) -> _SessionBucket:
+        bucket = self._sessions.get(session_id)
+        if bucket is None:
+            # setdefault is atomic, so racing first lookups share one bucket
+            bucket = self._sessions.setdefault(session_id, _SessionBucket())
+        return bucket
+
+    def _close_bucket(self, session_id: str, bucket: _SessionBucket):
+        """Detach a bucket from the registry; caller holds ``bucket.lock``."""
+        bucket.closed = True
+        if self._sessions.get(session_id) is bucket:
+            del self._sessions[session_id]
+        self._count("hits", bucket.hits)
+        bucket.hits = 0
+
+    def _account_add(self, entry: _CacheEntry):
+        with self._usage_lock:
+            self._entries[(entry.session_id, entry.agent_type)] = entry
+            self._total_entries += 1
+            self._total_bytes += entry.size_bytes
+
+    def _account_resize(self, entry: _CacheEntry):
+        """Re-measure an entry after its messages were persisted or paged in."""
+        size = estimate_memory_bytes(entry.memory)
+        with self._usage_lock:
+            if self._entries.get((entry.session_id, entry.agent_type)) is entry:
+                self._total_bytes += size - entry.size_bytes
+            entry.size_bytes = size
+
+    def _account_remove(self, entry: _CacheEntry):
+        with self._usage_lock:
+            key = (entry.session_id, entry.agent_type)
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+                self._total_entries -= 1
+                self._total_bytes -= entry.size_bytes
+
+    def _evict(self, entry: _CacheEntry, reason: str) -> bool:
+        bucket = self._sessions.get(entry.session_id)
+        if bucket is None:
+            return False
+        # Persisting under the session's lock keeps a concurrent miss from reloading stale rows
+        with bucket.lock:
+            if bucket.agents.get(entry.agent_type) is not entry:
+                return False
+            del bucket.agents[entry.agent_type]
+            self._account_remove(entry)
+            self._persist(entry)
+            if not bucket.agents:
+                self._close_bucket(entry.session_id, bucket)
+        self._count(f"evictions_{reason}")
+        return True
+
+    def _evict_session(self, session_id: str, bucket: _SessionBucket, reason: str):
+        with bucket.lock:
+            if bucket.closed:
+                return
+            entries = list(bucket.agents.values())
+            for entry in entries:
+                self._account_remove(entry)
+                self._persist(entry)
+            self._close_bucket(session_id, bucket)
+        if reason == "ttl":
+            self._count("sessions_expired")
+        self._count(f"evictions_{reason}", len(entries))
+
+    def _expire_idle_sessions(self, now: float, keep: Optional[str] = None):
+        idle = [(session_id, bucket) for session_id, bucket in list(self._sessions.items())
+                if session_id != keep and now - bucket.last_access >= self.idle_ttl_seconds]
+        for session_id, bucket in idle:
+            self._evict_session(session_id, bucket, "ttl")
+
+    def _enforce_limits(self, keep: Optional[_CacheEntry] = None):
+        """Expire idle sessions, then drop least recently used agents until within bounds."""
+        now = time.monotonic()
+        with self._lock:
+            sweep = now >= self._next_idle_sweep
+            if sweep:
+                self._next_idle_sweep = now + self._sweep_interval()
+        if sweep:
+            self._expire_idle_sessions(now, keep.session_id if keep else None)
+
+        victims = []
+        with self._usage_lock:
+            count, total_bytes = self._total_entries, self._total_bytes
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                return
+            # Least recently used first, going by the stamps lookups leave
+            for entry in sorted(self._entries.values(), key=lambda e: e.last_used):
+                if count <= self.max_entries and total_bytes <= self.max_bytes:
+                    break
+                if entry is keep:
+                    continue
+                victims.append((entry, "lru" if count > self.max_entries else "bytes"))
+                count -= 1
+                total_bytes -= entry.size_bytes
+        # Evicted (and persisted) outside the usage lock, one session lock at a time
+        for entry, reason in victims:
+            self._evict(entry, reason)
+
     def get_agent_memory(self, session_id: str, agent_type: str):
         """Get or create agent memory with persistence."""
-        cache_key = f"{session_id}_{agent_type}"
-        
-        if cache_key not in self._memory_cache:
-            # Try to use langchain memory if available, otherwise use simple memory
-            try:
-                from langchain.memory import ConversationBufferMemory
-                memory = ConversationBufferMemory(
-                    memory_key="chat_history",
-                    return_messages=True,
-                    output_key="output"
-                )
-            except ImportError:
-                print("Using simple memory (langchain not available)")
-                memory = SimpleMemory()
-            
-            self._memory_cache[cache_key] = memory
-        
-        return self._memory_cache[cache_key]
-    
+        while True:
+            bucket = self._bucket(session_id)
+            with bucket.lock:
+                if bucket.closed:
+                    continue
+                now = time.monotonic()
+                bucket.last_access = now
+                entry = bucket.agents.get(agent_type)
+                if entry is not None:
+                    bucket.hits += 1
+                    entry.last_used = now
+                    return entry.memory
+
+                # Loading under the session lock keeps concurrent misses from loading twice
+                self._count("misses")
+                entry = self._load_entry(session_id, agent_type)
+                bucket.agents[agent_type] = entry
+                self._account_add(entry)
+            break
+
+        self._enforce_limits(keep=entry)
+        return entry.memory
+
+    def persist_agent_memory(self, session_id: str, agent_type: str):
+        """Write one agent's new messages now (call at the end of each turn)."""
+        bucket = self._sessions.get(session_id)
+        if bucket is None:
+            return
+        with bucket.lock:
+            entry = bucket.agents.get(agent_type)
+            if entry is None:
+                return
+            self._persist(entry)
+        # The agent appends to the memory object directly; its size is taken here
+        self._account_resize(entry)
+        self._enforce_limits(keep=entry)
+
+    def persist_session_memory(self, session_id: str):
+        """Write the new messages of every cached agent in a session."""
+        bucket = self._sessions.get(session_id)
+        if bucket is None:
+            return
+        with bucket.lock:
+            entries = list(bucket.agents.values())
+            for entry in entries:
+                self._persist(entry)
+        for entry in entries:
+            self._account_resize(entry)
+        self._enforce_limits()
+
+    def load_older_messages(self, session_id: str, agent_type: str, limit: Optional[int] = None) -> int:
+        """Prepend the page of persisted messages preceding those in memory.
+
+        Returns the number of messages loaded; zero once the log is exhausted.
+        Rolling memories already carry older turns in their summary, so they
+        never page in more.
+        """
+        if not self._has_log() or self.token_budget > 0:
+            return 0
+        bucket = self._sessions.get(session_id)
+        if bucket is None:
+            return 0
+        with bucket.lock:
+            entry = bucket.agents.get(agent_type)
+            if entry is None:
+                return 0
+            # Flush first, so a memory cleared since the last persist drops its log
+            # instead of paging stale messages back in
+            self._persist(entry)
+            if entry.oldest_seq <= 0:
+                return 0
+            rows = self.db_manager.get_agent_messages(
+                session_id, agent_type, before_seq=entry.oldest_seq, limit=limit or self.reload_page_size
+            )
+            if not rows:
+                entry.oldest_seq = 0
+                return 0
+
+            messages = message_list(entry.memory)
+            messages[0:0] = messages_from_rows(entry.memory, rows)
+            self._mark_synced(entry, messages)
+            entry.oldest_seq = rows[0][0]
+            self._count("messages_loaded", len(rows))
+
+        self._account_resize(entry)
+
+        self._enforce_limits(keep=entry)
+        return len(rows)
+
+    def remember(self, session_id: str, text: str, agent_type: Optional[str] = None) -> int:
+        """Index a finding for later semantic recall; returns chunks stored."""
+        if self.vector_store is None:
+            return 0
+        from .vector_store import split_into_chunks
+        try:
+            metadata = {"agent_type": agent_type} if agent_type else None
+            return self.vector_store.add(split_into_chunks(text), session_id=session_id, metadata=metadata)
+        except Exception as e:
+            print(f"Error indexing memory: {e}")
+            return 0
+
+    def recall(self, session_id: str, query: str, k: int = 3) -> List[str]:
+        """Return the ``k`` stored findings of a session most relevant to ``query``."""
+        if self.vector_store is None:
+            return []
+        try:
+            return [hit["text"] for hit in self.vector_store.search(query, k=k, session_id=session_id)]
+        except Exception as e:
+            print(f"Error recalling memory: {e}")
+            return []
+
     def clear_session_memory(self, session_id: str):
         """Clear all memory for a session."""
-        keys_to_remove = [key for key in self._memory_cache.keys() if key.startswith(session_id)]
-        for key in keys_to_remove:
-            if hasattr(self._memory_cache[key], 'clear'):
-                self._memory_cache[key].clear()
\ No newline at end of file
+        bucket = self._sessions.get(session_id)
+        if bucket is not None:
+            with bucket.lock:
+                for entry in bucket.agents.values():
+                    if hasattr(entry.memory, 'clear'):
+                        entry.memory.clear()
+                    self._account_remove(entry)
+                bucket.agents.clear()
+                self._close_bucket(session_id, bucket)
+
+        # Drop the persisted copy too, or the next access would reload it
+        if self.db_manager is not None and hasattr(self.db_manager, "delete_agent_memory"):
+            self.db_manager.delete_agent_memory(session_id)
+
+    def evict_session(self, session_id: str):
+        """Persist and drop a session's cached memories; they reload on next access."""
+        bucket = self._sessions.get(session_id)
+        if bucket is not None:
+            self._evict_session(session_id, bucket, "manual")
+
+    def expire_idle(self):
+        """Evict idle sessions now instead of waiting for the next sweep."""
+        now = time.monotonic()
+        with self._lock:
+            self._next_idle_sweep = now + self._sweep_interval()
+        self._expire_idle_sessions(now)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss/eviction counters and current usage."""
+        buckets = list(self._sessions.values())
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._usage_lock:
+            entries, approx_bytes = self._total_entries, self._total_bytes
+        stats["hits"] += sum(bucket.hits for bucket in buckets)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update({
+            "sessions": len(buckets),
+            "entries": entries,
+            "approx_bytes": approx_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hit_rate": round(stats["hits"] / lookups, 3) if lookups else 0.0
+        })
+        return stats
\ No newline at end of file
@@ -0,0 +1,478 @@
+import json
+import sqlite3
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from .compression import compress_text, make_preview
+
+# Ordered list of (version, description, apply_fn). The applied version is
+# stored in PRAGMA user_version, so each step runs exactly once per database.
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = []
+
+def migration(version: int, description: str):
+    """Register a schema migration."""
+    def decorator(func: Callable[[sqlite3.Connection], None]):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return decorator
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the schema version recorded in the database file."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def latest_version() -> int:
+    """Return the newest known schema version."""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def apply_migrations(pool) -> List[int]:
+    """Apply pending migrations, each in its own write transaction.
+
+    The version is re-read inside the transaction, so concurrent processes
+    opening the same file never apply a step twice.
+    """
+    applied = []
+    for version, description, func in MIGRATIONS:
+        with pool.writer() as conn:
+            if get_schema_version(conn) >= version:
+                continue
+            func(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        applied.append(version)
+        print(f"✅ Applied migration {version}: {description}")
+    return applied
+
+@migration(1, "base tables")
+def _create_base_tables(conn: sqlite3.Connection):
+    # Crew executions table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS crew_executions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            result TEXT NOT NULL,
+            execution_time REAL,
+            timestamp DATETIME NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # QA interactions table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS qa_interactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Agent memories table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS agent_memories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            agent_type TEXT NOT NULL,
+            memory_data TEXT NOT NULL,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+@migration(2, "session indexes and unique agent memory key")
+def _add_session_indexes(conn: sqlite3.Connection):
+    # History lookups filter by session and order by time
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_crew_executions_session_ts "
+        "ON crew_executions (session_id, timestamp, id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_qa_interactions_session_ts "
+        "ON qa_interactions (session_id, timestamp, id)"
+    )
+
+    # Without a unique key, INSERT OR REPLACE only ever appended; keep the newest row per agent
+    conn.execute("""
+        DELETE FROM agent_memories
+        WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY session_id, agent_type
+                    ORDER BY updated_at DESC, id DESC
+                ) AS rn
+                FROM agent_memories
+            )
+            WHERE rn = 1
+        )
+    """)
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_agent_memories_session_agent "
+        "ON agent_memories (session_id, agent_type)"
+    )
+
+# Trigger bodies keep history_fts in step with the source tables
+_HISTORY_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS crew_executions_fts_insert AFTER INSERT ON crew_executions BEGIN
+        INSERT INTO history_fts (rowid, title, body, kind, session_id, source_id, timestamp)
+        VALUES (NEW.id * 2, NEW.topic, NEW.result, 'execution', NEW.session_id, NEW.id, NEW.timestamp);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS crew_executions_fts_delete AFTER DELETE ON crew_executions BEGIN
+        DELETE FROM history_fts WHERE rowid = OLD.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS crew_executions_fts_update AFTER UPDATE OF topic, result ON crew_executions BEGIN
+        UPDATE history_fts SET title = NEW.topic, body = NEW.result WHERE rowid = NEW.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS qa_interactions_fts_insert AFTER INSERT ON qa_interactions BEGIN
+        INSERT INTO history_fts (rowid, title, body, kind, session_id, source_id, timestamp)
+        VALUES (NEW.id * 2 + 1, NEW.question, NEW.answer, 'qa', NEW.session_id, NEW.id, NEW.timestamp);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS qa_interactions_fts_delete AFTER DELETE ON qa_interactions BEGIN
+        DELETE FROM history_fts WHERE rowid = OLD.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS qa_interactions_fts_update AFTER UPDATE OF question, answer ON qa_interactions BEGIN
+        UPDATE history_fts SET title = NEW.question, body = NEW.answer WHERE rowid = NEW.id * 2 + 1;
+    END
+    """,
+]
+
+def _fill_history_index(conn: sqlite3.Connection, execution_body: str, qa_body: str) -> int:
+    """Repopulate the schema-3 history_fts (with stored columns); returns rows indexed."""
+    conn.execute("DELETE FROM history_fts")
+    conn.execute(f"""
+        INSERT INTO history_fts (rowid, title, body, kind, session_id, source_id, timestamp)
+        SELECT id * 2, topic, {execution_body}, 'execution', session_id, id, timestamp FROM crew_executions
+    """)
+    conn.execute(f"""
+        INSERT INTO history_fts (rowid, title, body, kind, session_id, source_id, timestamp)
+        SELECT id * 2 + 1, question, {qa_body}, 'qa', session_id, id, timestamp FROM qa_interactions
+    """)
+    # Merge the freshly written segments so the first queries don't pay for it
+    conn.execute("INSERT INTO history_fts (history_fts) VALUES ('optimize')")
+    return conn.execute("SELECT count(*) FROM history_fts").fetchone()[0]
+
+def rebuild_history_index(conn: sqlite3.Connection) -> int:
+    """Repopulate the contentless history_fts from the source tables; returns rows indexed."""
+    conn.execute("INSERT INTO history_fts (history_fts) VALUES ('delete-all')")
+    conn.execute("""
+        INSERT INTO history_fts (rowid, title, body)
+        SELECT id * 2, topic, decompress_text(result_codec, result) FROM crew_executions
+    """)
+    conn.execute("""
+        INSERT INTO history_fts (rowid, title, body)
+        SELECT id * 2 + 1, question, decompress_text(answer_codec, answer) FROM qa_interactions
+    """)
+    conn.execute("INSERT INTO history_fts (history_fts) VALUES ('optimize')")
+    return (conn.execute("SELECT count(*) FROM crew_executions").fetchone()[0]
+            + conn.execute("SELECT count(*) FROM qa_interactions").fetchone()[0])
+
+@migration(3, "full-text search index over executions and Q&A")
+def _add_history_search(conn: sqlite3.Connection):
+    # One FTS table for both sources so results rank together. The rowid encodes
+    # the source (executions id * 2, Q&A id * 2 + 1), which keeps trigger deletes
+    # and updates on the rowid instead of scanning UNINDEXED columns.
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+            title,
+            body,
+            kind UNINDEXED,
+            session_id UNINDEXED,
+            source_id UNINDEXED,
+            timestamp UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+    """)
+    for trigger in _HISTORY_FTS_TRIGGERS:
+        conn.execute(trigger)
+
+    # Index everything written before this migration
+    _fill_history_index(conn, "result", "answer")
+
+_COMPRESSED_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER crew_executions_fts_insert AFTER INSERT ON crew_executions BEGIN
+        INSERT INTO history_fts (rowid, title, body, kind, session_id, source_id, timestamp)
+        VALUES (NEW.id * 2, NEW.topic, decompress_text(NEW.result_codec, NEW.result),
+                'execution', NEW.session_id, NEW.id, NEW.timestamp);
+    END
+    """,
+    """
+    CREATE TRIGGER crew_executions_fts_update AFTER UPDATE OF topic, result, result_codec ON crew_executions BEGIN
+        UPDATE history_fts SET title = NEW.topic, body = decompress_text(NEW.result_codec, NEW.result)
+        WHERE rowid = NEW.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER qa_interactions_fts_insert AFTER INSERT ON qa_interactions BEGIN
+        INSERT INTO history_fts (rowid, title, body, kind, session_id, source_id, timestamp)
+        VALUES (NEW.id * 2 + 1, NEW.question, decompress_text(NEW.answer_codec, NEW.answer),
+                'qa', NEW.session_id, NEW.id, NEW.timestamp);
+    END
+    """,
+    """
+    CREATE TRIGGER qa_interactions_fts_update AFTER UPDATE OF question, answer, answer_codec ON qa_interactions BEGIN
+        UPDATE history_fts SET title = NEW.question, body = decompress_text(NEW.answer_codec, NEW.answer)
+        WHERE rowid = NEW.id * 2 + 1;
+    END
+    """,
+]
+
+def _compress_column(conn: sqlite3.Connection, table: str, column: str,
+                     codec_column: str, preview_column: str, batch_size: int = 500):
+    """Compress existing plain-text rows in id order and fill their previews."""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            f"SELECT id, {column} FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for row_id, text in rows:
+            text = text.decode("utf-8") if isinstance(text, bytes) else (text or "")
+            codec, payload = compress_text(text)
+            updates.append((payload, codec, make_preview(text), row_id))
+        conn.executemany(
+            f"UPDATE {table} SET {column} = ?, {codec_column} = ?, {preview_column} = ? WHERE id = ?",
+            updates
+        )
+        last_id = rows[-1][0]
+
+@migration(4, "compressed result storage with precomputed previews")
+def _compress_results(conn: sqlite3.Connection):
+    conn.execute("ALTER TABLE crew_executions ADD COLUMN result_codec TEXT NOT NULL DEFAULT 'raw'")
+    conn.execute("ALTER TABLE crew_executions ADD COLUMN preview TEXT")
+    conn.execute("ALTER TABLE qa_interactions ADD COLUMN answer_codec TEXT NOT NULL DEFAULT 'raw'")
+    conn.execute("ALTER TABLE qa_interactions ADD COLUMN answer_preview TEXT")
+
+    # The search index already holds the text, so skip re-indexing while converting
+    for trigger in ("crew_executions_fts_insert", "crew_executions_fts_update",
+                    "qa_interactions_fts_insert", "qa_interactions_fts_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+    _compress_column(conn, "crew_executions", "result", "result_codec", "preview")
+    _compress_column(conn, "qa_interactions", "answer", "answer_codec", "answer_preview")
+
+    for trigger in _COMPRESSED_FTS_TRIGGERS:
+        conn.execute(trigger)
+
+@migration(5, "per-session row counters")
+def _add_session_counters(conn: sqlite3.Connection):
+    # Totals for history pages come from here instead of COUNT(*) over the session
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS session_counters (
+            session_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (session_id, kind)
+        ) WITHOUT ROWID
+    """)
+
+    for table, kind in (("crew_executions", "execution"), ("qa_interactions", "qa")):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_count_insert AFTER INSERT ON {table} BEGIN
+                INSERT INTO session_counters (session_id, kind, count) VALUES (NEW.session_id, '{kind}', 1)
+                ON CONFLICT (session_id, kind) DO UPDATE SET count = count + 1;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_count_delete AFTER DELETE ON {table} BEGIN
+                UPDATE session_counters SET count = count - 1
+                WHERE session_id = OLD.session_id AND kind = '{kind}';
+            END
+        """)
+        conn.execute(f"""
+            INSERT INTO session_counters (session_id, kind, count)
+            SELECT session_id, '{kind}', count(*) FROM {table} GROUP BY session_id
+        """)
+
+@migration(6, "time indexes for retention pruning")
+def _add_time_indexes(conn: sqlite3.Connection):
+    # Age-based pruning scans across sessions by time
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_crew_executions_ts ON crew_executions (timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_qa_interactions_ts ON qa_interactions (timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_agent_memories_updated ON agent_memories (updated_at)")
+
+@migration(7, "append-only agent memory message log")
+def _add_agent_memory_messages(conn: sqlite3.Connection):
+    # One row per message; (session_id, agent_type, seq) gives ordered, page-wise reads
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS agent_memory_messages (
+            id INTEGER PRIMARY KEY,
+            session_id TEXT NOT NULL,
+            agent_type TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at DATETIME NOT NULL,
+            UNIQUE (session_id, agent_type, seq)
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_agent_memory_messages_created "
+        "ON agent_memory_messages (created_at)"
+    )
+
+    # Split memory snapshots written by the eviction cache into individual messages
+    rows = conn.execute("SELECT session_id, agent_type, memory_data, updated_at FROM agent_memories").fetchall()
+    for session_id, agent_type, memory_data, updated_at in rows:
+        try:
+            data = json.loads(memory_data)
+        except (TypeError, ValueError):
+            continue
+        if not isinstance(data, dict) or data.get("type") not in ("simple", "langchain"):
+            continue
+
+        messages = []
+        for message in data.get("messages") or []:
+            if isinstance(message, dict):
+                messages.append((message.get("type", "human"), str(message.get("data", {}).get("content", ""))))
+            else:
+                messages.append(("text", str(message)))
+        conn.executemany(
+            "INSERT OR IGNORE INTO agent_memory_messages (session_id, agent_type, seq, role, content, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(session_id, agent_type, seq, role, content, updated_at)
+             for seq, (role, content) in enumerate(messages)]
+        )
+        conn.execute(
+            "DELETE FROM agent_memories WHERE session_id = ? AND agent_type = ?",
+            (session_id, agent_type)
+        )
+
+@migration(8, "topic-level research result cache")
+def _add_research_cache(conn: sqlite3.Connection):
+    # Keyed by the normalized topic; times are epoch seconds for TTL arithmetic
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS research_cache (
+            topic_key TEXT PRIMARY KEY,
+            topic TEXT NOT NULL,
+            result_codec TEXT NOT NULL,
+            result BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_research_cache_expires ON research_cache (expires_at)")
+    # MinHash LSH bands of each topic, for near-duplicate candidate lookup
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS research_cache_bands (
+            band TEXT NOT NULL,
+            topic_key TEXT NOT NULL,
+            PRIMARY KEY (band, topic_key)
+        ) WITHOUT ROWID
+    """)
+
+# A contentless index can only drop a row given the exact text it indexed,
+# so deletes and updates re-derive the old text from the source row
+_CONTENTLESS_FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER crew_executions_fts_insert AFTER INSERT ON crew_executions BEGIN
+        INSERT INTO history_fts (rowid, title, body)
+        VALUES (NEW.id * 2, NEW.topic, decompress_text(NEW.result_codec, NEW.result));
+    END
+    """,
+    """
+    CREATE TRIGGER crew_executions_fts_delete AFTER DELETE ON crew_executions BEGIN
+        INSERT INTO history_fts (history_fts, rowid, title, body)
+        VALUES ('delete', OLD.id * 2, OLD.topic, decompress_text(OLD.result_codec, OLD.result));
+    END
+    """,
+    """
+    CREATE TRIGGER crew_executions_fts_update AFTER UPDATE OF topic, result, result_codec ON crew_executions BEGIN
+        INSERT INTO history_fts (history_fts, rowid, title, body)
+        VALUES ('delete', OLD.id * 2, OLD.topic, decompress_text(OLD.result_codec, OLD.result));
+        INSERT INTO history_fts (rowid, title, body)
+        VALUES (NEW.id * 2, NEW.topic, decompress_text(NEW.result_codec, NEW.result));
+    END
+    """,
+    """
+    CREATE TRIGGER qa_interactions_fts_insert AFTER INSERT ON qa_interactions BEGIN
+        INSERT INTO history_fts (rowid, title, body)
+        VALUES (NEW.id * 2 + 1, NEW.question, decompress_text(NEW.answer_codec, NEW.answer));
+    END
+    """,
+    """
+    CREATE TRIGGER qa_interactions_fts_delete AFTER DELETE ON qa_interactions BEGIN
+        INSERT INTO history_fts (history_fts, rowid, title, body)
+        VALUES ('delete', OLD.id * 2 + 1, OLD.question, decompress_text(OLD.answer_codec, OLD.answer));
+    END
+    """,
+    """
+    CREATE TRIGGER qa_interactions_fts_update AFTER UPDATE OF question, answer, answer_codec ON qa_interactions BEGIN
+        INSERT INTO history_fts (history_fts, rowid, title, body)
+        VALUES ('delete', OLD.id * 2 + 1, OLD.question, decompress_text(OLD.answer_codec, OLD.answer));
+        INSERT INTO history_fts (rowid, title, body)
+        VALUES (NEW.id * 2 + 1, NEW.question, decompress_text(NEW.answer_codec, NEW.answer));
+    END
+    """,
+]
+
+@migration(9, "contentless full-text index")
+def _make_history_index_contentless(conn: sqlite3.Connection):
+    # The schema-3 index kept its own plaintext copy of every result and
+    # answer, undoing most of the compression. Rebuilt without content:
+    # bm25 ranking works from the index alone, metadata and snippets come
+    # from the (compressed) source rows.
+    for table in ("crew_executions", "qa_interactions"):
+        for action in ("insert", "delete", "update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{action}")
+    conn.execute("DROP TABLE IF EXISTS history_fts")
+    conn.execute("""
+        CREATE VIRTUAL TABLE history_fts USING fts5(
+            title,
+            body,
+            content = '',
+            tokenize = 'porter unicode61'
+        )
+    """)
+    for trigger in _CONTENTLESS_FTS_TRIGGERS:
+        conn.execute(trigger)
+    rebuild_history_index(conn)
+
+@migration(10, "drop emptied session counters")
+def _drop_empty_session_counters(conn: sqlite3.Connection):
+    # A session whose last row is deleted (retention, cleanup) no longer
+    # leaves a zero-count row behind
+    for table, kind in (("crew_executions", "execution"), ("qa_interactions", "qa")):
+        conn.execute(f"DROP TRIGGER IF EXISTS {table}_count_delete")
+        conn.execute(f"""
+            CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table} BEGIN
+                UPDATE session_counters SET count = count - 1
+                WHERE session_id = OLD.session_id AND kind = '{kind}';
+                DELETE FROM session_counters
+                WHERE session_id = OLD.session_id AND kind = '{kind}' AND count <= 0;
+            END
+        """)
+    conn.execute("DELETE FROM session_counters WHERE count <= 0")
+
+@migration(11, "store every timestamp in UTC")
+def _convert_local_timestamps_to_utc(conn: sqlite3.Connection):
+    # Executions and agent memory were stamped with local time, Q&A with UTC.
+    # The 'utc' modifier reads a value as local time of *this* machine, so the
+    # conversion is only right when the migration runs in the time zone that
+    # wrote the rows. A database copied from another zone ends up shifted by
+    # the difference between the two; run the upgrade with TZ set to the
+    # writer's zone in that case.
+    now = datetime.now().astimezone()
+    print(f"⚠️  Converting local timestamps to UTC as {now.tzname()} (UTC{now.strftime('%z')} now, "
+          f"DST rules applied per row); set TZ to the writing machine's zone if it differs")
+    for table, column in (("crew_executions", "timestamp"),
+                          ("agent_memories", "updated_at"),
+                          ("agent_memory_messages", "created_at")):
+        conn.execute(
+            f"UPDATE {table} SET {column} = strftime('%Y-%m-%d %H:%M:%f', {column}, 'utc') "
+            f"WHERE {column} IS NOT NULL AND strftime('%Y-%m-%d %H:%M:%f', {column}, 'utc') IS NOT NULL"
+        )
\ No newline at end of file
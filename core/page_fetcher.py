@@ -0,0 +1,368 @@
+import codecs
+import ipaddress
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from html.parser import HTMLParser
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .http_client import create_http_session
+from .search_results import SearchResult
+
+_WHITESPACE = re.compile(r"\s+")
+_CHARSET = re.compile(r"charset=([\w.:-]+)", re.I)
+
+# Page chrome that never holds the article text
+_SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form",
+              "svg", "iframe", "template", "button", "select", "head"}
+_BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "td",
+               "article", "section", "main", "div", "dd", "dt", "figcaption", "tr"}
+_TEXT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+class BlockedAddress(Exception):
+    """Raised for a page (or redirect target) that resolves to a non-public address."""
+
+def check_public_address(url: str, allow_loopback: bool = False) -> str:
+    """Resolve the host of ``url`` and return its first address, or raise
+    ``BlockedAddress`` unless every address is public.
+
+    Private, loopback, link-local (e.g. the 169.254.169.254 cloud metadata
+    service), multicast and reserved ranges are rejected; ``allow_loopback``
+    lets 127.0.0.1/::1 through for a local fixture server.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise BlockedAddress(f"unsupported URL {url!r}")
+    try:
+        infos = socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80),
+                                   proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        raise BlockedAddress(f"cannot resolve {parts.hostname}: {e}")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if address.is_loopback and allow_loopback:
+            continue
+        if not address.is_global or address.is_multicast:
+            raise BlockedAddress(f"{parts.hostname} resolves to non-public address {address}")
+    return infos[0][4][0]
+
+def _pinned_pool_classes(pins: Dict[str, str]) -> Dict[str, type]:
+    """Connection pools whose new connections go to the address in ``pins[host]``.
+
+    The host name is still used for the Host header, SNI and certificate
+    checks; only the DNS lookup is replaced, so a host cannot resolve to a
+    public address for the check and a private one for the connect.
+    """
+    def pinned(connection_class):
+        class PinnedConnection(connection_class):
+            def _new_conn(self):
+                address = pins.get(self.host.strip("[]").lower())
+                if address is None:
+                    raise BlockedAddress(f"{self.host} was not checked before connecting")
+                self._dns_host = address
+                return super()._new_conn()
+        return PinnedConnection
+
+    return {
+        "http": type("PinnedHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": pinned(HTTPConnection)}),
+        "https": type("PinnedHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": pinned(HTTPSConnection)}),
+    }
+
+class _PinnedAdapter(HTTPAdapter):
+    """Transport adapter that connects only to addresses vetted by ``check_public_address``."""
+
+    def __init__(self, pins: Dict[str, str], **kwargs):
+        self._pins = pins
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _pinned_pool_classes(self._pins)
+
+class _TextExtractor(HTMLParser):
+    """Incremental main-text extractor: keeps prose blocks, drops scripts and chrome.
+
+    Blocks shorter than ``min_block_chars`` (menus, buttons, captions) are
+    dropped unless they are headings.
+    """
+
+    def __init__(self, min_block_chars: int = 40):
+        super().__init__(convert_charrefs=True)
+        self.min_block_chars = min_block_chars
+        self.blocks: List[str] = []
+        self.chars = 0
+        self._buffer: List[str] = []
+        self._skip_depth = 0
+        self._heading = False
+
+    def _flush(self):
+        text = _WHITESPACE.sub(" ", "".join(self._buffer)).strip()
+        self._buffer = []
+        if text and (self._heading or len(text) >= self.min_block_chars):
+            self.blocks.append(text)
+            self.chars += len(text) + 1
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS and not self._skip_depth:
+            self._flush()
+            self._heading = tag[0] == "h" and tag[1:].isdigit()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in _BLOCK_TAGS and not self._skip_depth:
+            self._flush()
+            self._heading = False
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._buffer.append(data)
+
+    def text(self) -> str:
+        self._flush()
+        return "\n".join(self.blocks)
+
+def extract_main_text(html: str, min_block_chars: int = 40) -> str:
+    """Main readable text of an HTML page, one block per line."""
+    extractor = _TextExtractor(min_block_chars)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.text()
+
+def make_excerpt(text: str, max_tokens: int) -> str:
+    """Leading part of ``text`` within ``max_tokens`` (~4 characters each), cut at a word."""
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "..."
+
+class PageFetcher:
+    """Fetch the pages behind top search results and extract their main text.
+
+    Pages are fetched concurrently, at most ``per_host`` at a time per host,
+    and read as a stream: the download stops at ``max_bytes``, or as soon
+    as enough text for an excerpt has been extracted. Whatever has not
+    finished by ``deadline`` is left out. Redirects are followed by hand
+    (up to ``max_redirects``): every hop is checked to resolve to a public
+    address, connects to exactly that address and waits for a slot of its
+    own host; ``allow_loopback`` admits a local fixture server. Extracted text is cached by URL;
+    after ``fresh_seconds`` a cached page is revalidated with its ETag or
+    Last-Modified date, so unchanged pages cost a 304.
+    """
+
+    def __init__(self, top_n: int = 3, per_host: int = 2, max_bytes: int = 524288,
+                 timeout: float = 5.0, deadline: float = 8.0, excerpt_tokens: int = 300,
+                 max_entries: int = 500, fresh_seconds: float = 3600, workers: int = 8,
+                 max_redirects: int = 5, allow_loopback: bool = False):
+        self.top_n = top_n
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.deadline = deadline
+        self.excerpt_tokens = excerpt_tokens
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self.max_redirects = max_redirects
+        self.allow_loopback = allow_loopback
+        # Page hosts rarely overlap with the search APIs, so no retries and a small pool
+        self.session = create_http_session(pool_size=per_host, max_retries=0)
+        # host -> address it was last checked to resolve to; connections go there
+        self._pins: Dict[str, str] = {}
+        adapter = _PinnedAdapter(self._pins, pool_connections=4, pool_maxsize=per_host, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Record/replay store; ToolsManager sets it when REPLAY_MODE is not "off"
+        self.fixtures = None
+
+        # url -> (etag, last_modified, text, checked_at); least recently used first
+        self._cache: "OrderedDict[str, Tuple[Optional[str], Optional[str], str, float]]" = OrderedDict()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-fetch")
+        self._stats = {"fetched": 0, "cache_hits": 0, "not_modified": 0, "errors": 0, "blocked": 0,
+                       "skipped_type": 0, "cut_off": 0, "timed_out": 0, "bytes_read": 0}
+
+    @classmethod
+    def from_settings(cls, settings) -> 'PageFetcher':
+        """Build a fetcher from the ``page_fetch_*`` fields in ``Settings``."""
+        return cls(
+            top_n=settings.page_fetch_top_n,
+            per_host=settings.page_fetch_per_host,
+            max_bytes=settings.page_fetch_max_bytes,
+            timeout=settings.page_fetch_timeout_seconds,
+            deadline=settings.page_fetch_deadline_seconds,
+            excerpt_tokens=settings.page_excerpt_tokens,
+            max_entries=settings.page_cache_max_entries,
+            fresh_seconds=settings.page_cache_ttl_seconds,
+            allow_loopback=settings.page_fetch_allow_loopback
+        )
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _remember(self, url: str, etag: Optional[str], modified: Optional[str], text: str):
+        with self._lock:
+            self._cache[url] = (etag, modified, text, time.time())
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    @contextmanager
+    def _open(self, url: str, headers: Dict[str, str]):
+        """Streamed GET that follows redirects itself.
+
+        Each hop is checked and pinned to its resolved address, and holds a
+        slot of its own host while it is open.
+        """
+        for _ in range(self.max_redirects + 1):
+            address = check_public_address(url, self.allow_loopback)
+            with self._lock:
+                self._pins[urlsplit(url).hostname] = address
+            with self._host_slot(url):
+                response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True,
+                                            allow_redirects=False)
+                if not response.is_redirect:
+                    with response:
+                        yield response
+                    return
+                response.close()
+            url = urljoin(url, response.headers["Location"])
+        raise BlockedAddress(f"more than {self.max_redirects} redirects")
+
+    def _download(self, url: str, cached) -> Dict[str, Any]:
+        """One streamed GET; returns ``{"status", "etag", "modified", "text"}``."""
+        headers = {"Accept": "text/html,application/xhtml+xml;q=0.9,text/plain;q=0.8"}
+        if cached is not None:
+            if cached[0]:
+                headers["If-None-Match"] = cached[0]
+            if cached[1]:
+                headers["If-Modified-Since"] = cached[1]
+
+        with self._open(url, headers) as response:
+            page = {"status": response.status_code, "etag": response.headers.get("ETag"),
+                    "modified": response.headers.get("Last-Modified"), "text": ""}
+            if response.status_code == 304:
+                return page
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "text/html")
+            if not content_type.lower().startswith(_TEXT_TYPES):
+                self._count("skipped_type")
+                return page
+            # Servers often omit the charset; requests would then assume Latin-1
+            charset = _CHARSET.search(content_type)
+            try:
+                decoder = codecs.getincrementaldecoder(charset.group(1) if charset else "utf-8")("replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+            extractor = _TextExtractor()
+            wanted = self.excerpt_tokens * 4
+            read = 0
+            for chunk in response.iter_content(chunk_size=16384):
+                read += len(chunk)
+                extractor.feed(decoder.decode(chunk))
+                if extractor.chars >= wanted or read >= self.max_bytes:
+                    # Enough text (or bytes) already; drop the rest of the body
+                    self._count("cut_off")
+                    break
+            self._count("bytes_read", read)
+            page["text"] = extractor.text()
+            return page
+
+    def _fetch(self, url: str) -> Optional[str]:
+        """Text of one page, from the cache when fresh or unchanged."""
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached is not None:
+                self._cache.move_to_end(url)
+        if cached is not None and time.time() - cached[3] < self.fresh_seconds:
+            self._count("cache_hits")
+            return cached[2]
+
+        try:
+            if self.fixtures is not None:
+                # Conditional headers vary between runs, so the recording is keyed by URL alone
+                page = self.fixtures.call("page", {"url": url}, lambda: self._download(url, None))
+            else:
+                page = self._download(url, cached)
+        except BlockedAddress as e:
+            self._count("blocked")
+            print(f"⚠️  Not fetching {url}: {e}")
+            return None
+        except Exception as e:
+            self._count("errors")
+            print(f"⚠️  Could not fetch {url}: {e}")
+            return cached[2] if cached is not None else None
+
+        if page["status"] == 304 and cached is not None:
+            self._count("not_modified")
+            self._remember(url, cached[0], cached[1], cached[2])
+            return cached[2]
+        self._count("fetched")
+        if page["text"]:
+            self._remember(url, page["etag"], page["modified"], page["text"])
+        return page["text"] or None
+
+    def fetch_many(self, urls: List[str]) -> Dict[str, str]:
+        """Fetch pages concurrently; returns ``url -> text`` for those done by the deadline."""
+        unique = list(dict.fromkeys(url for url in urls if url.startswith(("http://", "https://"))))
+        futures = {self._executor.submit(self._fetch, url): url for url in unique}
+        done, pending = wait(futures, timeout=self.deadline)
+        for future in pending:
+            # Left to finish in the background (the result still lands in the cache)
+            future.cancel()
+        self._count("timed_out", len(pending))
+
+        pages = {}
+        for future in done:
+            text = future.result()
+            if text:
+                pages[futures[future]] = text
+        return pages
+
+    def enrich(self, results: List[SearchResult], pages: Optional[Dict[str, str]] = None) -> List[SearchResult]:
+        """Replace the snippets of the top results with excerpts of their pages.
+
+        Pass ``pages`` from an earlier ``fetch_many`` to skip fetching.
+        """
+        top = results[:self.top_n]
+        if pages is None:
+            pages = self.fetch_many([result.url for result in top])
+        enriched = [
+            result.replace(snippet=make_excerpt(pages[result.url], self.excerpt_tokens))
+            if result.url in pages else result
+            for result in top
+        ]
+        return enriched + results[self.top_n:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cached_pages"] = len(self._cache)
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.session.close()
\ No newline at end of file
@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional, Set
+
+from .compression import compress_text, decompress_text
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+# Request fields that carry credentials; never hashed or written to fixtures
+_SECRET_FIELDS = ("api_key", "apikey", "token")
+
+# A word with its trailing whitespace (or leading whitespace alone)
+_STREAM_PIECE = re.compile(r"\S+\s*|\s+")
+
+class FixtureMissing(Exception):
+    """Raised in replay mode for a request that was never recorded."""
+
+def strip_secrets(value: Any) -> Any:
+    """Copy of a JSON-like request with credential fields removed."""
+    if isinstance(value, dict):
+        return {k: strip_secrets(v) for k, v in value.items() if k.lower() not in _SECRET_FIELDS}
+    if isinstance(value, (list, tuple)):
+        return [strip_secrets(v) for v in value]
+    return value
+
+class FixtureStore:
+    """Record/replay store for external calls (search providers and the LLM).
+
+    Responses are content-addressed: each distinct body is compressed once
+    under ``objects/<sha256>``, and ``index.jsonl`` maps a hash of the
+    request to its response hash and the latency seen when recording.
+    In replay mode that latency is re-simulated as
+    ``recorded * latency_scale + latency_seconds``.
+    """
+
+    def __init__(self, root: str = "fixtures/replay", mode: str = MODE_REPLAY,
+                 latency_scale: float = 1.0, latency_seconds: float = 0.0):
+        if mode not in (MODE_OFF, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.root = Path(root)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.latency_seconds = latency_seconds
+        self._objects = self.root / "objects"
+        self._index_path = self.root / "index.jsonl"
+        self._objects.mkdir(parents=True, exist_ok=True)
+
+        # request hash -> {"kind", "object", "latency"}
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "recorded": 0, "simulated_seconds": 0.0}
+        self._load_index()
+
+    @classmethod
+    def from_settings(cls, settings) -> Optional['FixtureStore']:
+        """Build a store from the ``replay_*`` fields in ``Settings`` (None when off)."""
+        mode = getattr(settings, 'replay_mode', MODE_OFF)
+        if mode == MODE_OFF:
+            return None
+        return cls(
+            root=settings.replay_fixture_dir,
+            mode=mode,
+            latency_scale=settings.replay_latency_scale,
+            latency_seconds=settings.replay_latency_seconds
+        )
+
+    def _load_index(self):
+        if not self._index_path.exists():
+            return
+        with open(self._index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from an interrupted recording
+                    continue
+                # Later recordings of the same request win
+                self._index[entry.pop("key")] = entry
+
+    @staticmethod
+    def request_key(kind: str, request: Dict[str, Any]) -> str:
+        raw = json.dumps([kind, strip_secrets(request)], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _object_path(self, digest: str) -> Path:
+        return self._objects / digest[:2] / digest[2:]
+
+    def _write_object(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            codec, payload = compress_text(text)
+            data = payload.encode("utf-8") if isinstance(payload, str) else payload
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(codec.encode("ascii") + b"\n" + data)
+            tmp.replace(path)
+        return digest
+
+    def _read_object(self, digest: str) -> str:
+        codec, _, payload = self._object_path(digest).read_bytes().partition(b"\n")
+        return decompress_text(codec.decode("ascii"), payload)
+
+    def record(self, kind: str, request: Dict[str, Any], response: Any, latency: float = 0.0):
+        """Store one request/response pair; the response must be JSON-serializable."""
+        key = self.request_key(kind, request)
+        entry = {"kind": kind, "object": self._write_object(json.dumps(response, ensure_ascii=False)),
+                 "latency": round(latency, 4)}
+        with self._lock:
+            with open(self._index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, **entry}) + "\n")
+            self._index[key] = entry
+            self._stats["recorded"] += 1
+
+    def replay(self, kind: str, request: Dict[str, Any]) -> Any:
+        """Return the recorded response after the simulated latency."""
+        key = self.request_key(kind, request)
+        with self._lock:
+            entry = self._index.get(key)
+            self._stats["hits" if entry else "misses"] += 1
+        if entry is None:
+            raise FixtureMissing(f"No recorded {kind} response for request {key[:12]}")
+
+        delay = entry["latency"] * self.latency_scale + self.latency_seconds
+        if delay > 0:
+            time.sleep(delay)
+            with self._lock:
+                self._stats["simulated_seconds"] += delay
+        return json.loads(self._read_object(entry["object"]))
+
+    def call(self, kind: str, request: Dict[str, Any], live: Callable[[], Any]) -> Any:
+        """Route one external call: replay it, or make it live (recording it in record mode)."""
+        if self.mode == MODE_REPLAY:
+            return self.replay(kind, request)
+        started = time.perf_counter()
+        response = live()
+        if self.mode == MODE_RECORD:
+            try:
+                self.record(kind, request, response, time.perf_counter() - started)
+            except Exception as e:
+                print(f"⚠️  Could not record {kind} fixture: {e}")
+        return response
+
+    def kinds(self) -> Set[str]:
+        """Kinds of calls with at least one recording, e.g. ``{"search:serper", "llm"}``."""
+        with self._lock:
+            return {entry["kind"] for entry in self._index.values()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["requests"] = len(self._index)
+            stats["objects"] = len({entry["object"] for entry in self._index.values()})
+        stats["mode"] = self.mode
+        stats["simulated_seconds"] = round(stats["simulated_seconds"], 3)
+        return stats
+
+def replaying_chat_model(chat_class, fixtures: FixtureStore):
+    """Subclass a LangChain chat model class so generations go through ``fixtures``.
+
+    Requests are keyed by model, temperature, stop words and the message
+    transcript; only the reply text is stored.
+    """
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+    class ReplayingChatModel(chat_class):
+        def _fixture_request(self, messages, stop) -> Dict[str, Any]:
+            return {
+                "model": getattr(self, "model", None),
+                "temperature": getattr(self, "temperature", None),
+                "stop": stop,
+                "messages": [[message.type, message.content] for message in messages],
+            }
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            text = fixtures.call(
+                "llm", self._fixture_request(messages, stop),
+                lambda: chat_class._generate(self, messages, stop, run_manager, **kwargs).generations[0].text
+            )
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            return await asyncio.to_thread(self._generate, messages, stop, None, **kwargs)
+
+        # Streaming callers get the reply in word-sized chunks, each reported to
+        # the callbacks; the live call itself runs without them so tokens are
+        # not reported twice
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            result = self._generate(messages, stop, None, **kwargs)
+            for piece in _STREAM_PIECE.findall(result.generations[0].text) or [""]:
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+                if run_manager:
+                    run_manager.on_llm_new_token(piece, chunk=chunk)
+                yield chunk
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            result = await self._agenerate(messages, stop, None, **kwargs)
+            for piece in _STREAM_PIECE.findall(result.generations[0].text) or [""]:
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+                if run_manager:
+                    await run_manager.on_llm_new_token(piece, chunk=chunk)
+                yield chunk
+
+    ReplayingChatModel.__name__ = f"Replaying{chat_class.__name__}"
+    return ReplayingChatModel
\ No newline at end of file
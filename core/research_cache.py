@@ -0,0 +1,151 @@
+import hashlib
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.-]*[a-z0-9+#]|[a-z0-9]")
+_STOPWORDS = frozenset("""
+a an and are about as at be by can do does for from how in into is it its me of on or
+please research show tell that the their this to vs what whats when where which who why will with
+""".split())
+
+# 64 MinHash permutations in 16 bands of 4 rows: topics with a token Jaccard
+# similarity of ~0.5 or more are likely to share a band
+_NUM_PERM = 64
+_BANDS = 16
+_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha1(f"a{i}".encode()).digest()[:8], "big") % _PRIME or 1,
+     int.from_bytes(hashlib.sha1(f"b{i}".encode()).digest()[:8], "big") % _PRIME)
+    for i in range(_NUM_PERM)
+]
+
+def topic_tokens(topic: str) -> List[str]:
+    """Content words of a topic, lowercased, with stop words and plural ``s`` removed."""
+    tokens = []
+    for word in _WORD.findall(topic.lower()):
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+def normalize_topic(topic: str) -> str:
+    """Order-insensitive cache key: ``"LLM latest developments"`` and
+    ``"latest developments in LLMs"`` both give ``"development latest llm"``."""
+    return " ".join(sorted(set(topic_tokens(topic))))
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+
+def minhash_bands(tokens: List[str]) -> List[str]:
+    """LSH band keys of the MinHash signature of a token set."""
+    if not tokens:
+        return []
+    hashes = [_token_hash(token) for token in set(tokens)]
+    signature = [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+    rows = _NUM_PERM // _BANDS
+    return [
+        f"{band}:{hashlib.blake2b(repr(signature[band * rows:(band + 1) * rows]).encode(), digest_size=8).hexdigest()}"
+        for band in range(_BANDS)
+    ]
+
+def jaccard(a: str, b: str) -> float:
+    """Token-set similarity of two normalized topic keys."""
+    left, right = set(a.split()), set(b.split())
+    return len(left & right) / len(left | right) if left or right else 0.0
+
+class ResearchCache:
+    """Finished research results keyed by normalized topic, stored in the main database.
+
+    A lookup tries the exact normalized topic first, then (optionally)
+    near-duplicates: MinHash LSH bands find candidate topics in SQL and the
+    best one is accepted if its token Jaccard similarity reaches
+    ``similarity``. Entries expire after their own TTL.
+    """
+
+    def __init__(self, db_manager, ttl_seconds: float = 86400, similarity: float = 0.7,
+                 near_duplicates: bool = True):
+        self.db_manager = db_manager
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.near_duplicates = near_duplicates
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "near_hits": 0, "misses": 0, "stores": 0}
+
+    @classmethod
+    def from_settings(cls, db_manager, settings) -> Optional['ResearchCache']:
+        """Build a cache from the ``research_cache_*`` fields in ``Settings`` (None when disabled)."""
+        if not getattr(settings, 'research_cache_enabled', False):
+            return None
+        return cls(
+            db_manager,
+            ttl_seconds=settings.research_cache_ttl_seconds,
+            similarity=settings.research_cache_similarity,
+            near_duplicates=settings.research_cache_near_duplicates
+        )
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def get(self, topic: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return ``{"topic", "result", "created_at", "match", "similarity"}`` for a fresh entry, else None.
+
+        ``max_age`` (seconds) tightens freshness below the entry's own TTL.
+        """
+        key = normalize_topic(topic)
+        if not key:
+            return None
+        now = time.time()
+
+        def fresh(entry):
+            return (entry is not None and entry["expires_at"] > now
+                    and (max_age is None or now - entry["created_at"] <= max_age))
+
+        entry = self.db_manager.get_research_entry(key)
+        if fresh(entry):
+            self._count("exact_hits")
+            return {**entry, "match": "exact", "similarity": 1.0}
+
+        if self.near_duplicates:
+            candidates = self.db_manager.find_research_candidates(minhash_bands(key.split()), now)
+            scored = sorted(((jaccard(key, other), other) for other in candidates if other != key), reverse=True)
+            for score, other in scored:
+                if score < self.similarity:
+                    break
+                entry = self.db_manager.get_research_entry(other)
+                if fresh(entry):
+                    self._count("near_hits")
+                    return {**entry, "match": "near", "similarity": round(score, 3)}
+
+        self._count("misses")
+        return None
+
+    def put(self, topic: str, result: str, ttl_seconds: Optional[float] = None):
+        """Cache a finished result for ``ttl_seconds`` (default ``self.ttl_seconds``)."""
+        key = normalize_topic(topic)
+        if not key:
+            return
+        now = time.time()
+        self.db_manager.save_research_entry(
+            key, topic, result, minhash_bands(key.split()), now,
+            now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        )
+        self._count("stores")
+        # Writes follow multi-minute crew runs, so sweeping here costs nothing noticeable
+        self.db_manager.purge_research_cache(now)
+
+    def invalidate(self, topic: str) -> bool:
+        """Drop the entry for a topic (exact normalized match only)."""
+        key = normalize_topic(topic)
+        return bool(key) and self.db_manager.purge_research_cache(time.time(), key) > 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["exact_hits"] + stats["near_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["exact_hits"] + stats["near_hits"]) / lookups, 3) if lookups else 0.0
+        return stats
\ No newline at end of file
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+class ProviderUnavailable(Exception):
+    """Raised instead of calling a provider that is rate limited or circuit-broken."""
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, max_wait: float = 0.0) -> bool:
+        """Take a token, waiting at most ``max_wait`` seconds for one to accrue."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            wait = (1 - self._tokens) / self.rate if self.rate > 0 else float("inf")
+            if wait > max_wait:
+                return False
+            # Reserve the token now so concurrent callers queue behind us
+            self._tokens -= 1
+        time.sleep(wait)
+        return True
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return round(self._tokens, 2)
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` consecutive failures (or one 429),
+    half-open after ``cooldown`` seconds, closed again on a successful probe."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open_for = cooldown
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._stats = {"trips": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._open_for:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one probe is let through."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._open_for:
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        """Count a failure; ``retry_after`` (from a 429) opens the circuit at once for that long."""
+        with self._lock:
+            self._failures += 1
+            if retry_after is not None or self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["trips"] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._open_for = max(self.cooldown, retry_after or 0.0)
+                self._probe_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"state": state, "consecutive_failures": self._failures})
+            if state != self.CLOSED:
+                stats["retry_in"] = round(max(0.0, self._opened_at + self._open_for - time.monotonic()), 1)
+            return stats
+
+class AdaptiveTimeout:
+    """Request timeout derived from a provider's recent latencies.
+
+    Uses ``multiplier`` x the p95 of the last ``window`` successful calls,
+    clamped to ``[min_timeout, max_timeout]``; ``max_timeout`` until enough
+    samples exist.
+    """
+
+    def __init__(self, min_timeout: float = 1.0, max_timeout: float = 10.0,
+                 multiplier: float = 2.0, window: int = 100, min_samples: int = 10):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    @property
+    def timeout(self) -> float:
+        with self._lock:
+            count = len(self._samples)
+        if count < self.min_samples:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, self.percentile(0.95) * self.multiplier))
+
+    def get_stats(self) -> Dict[str, Any]:
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        return {
+            "timeout": round(self.timeout, 3),
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "samples": len(self._samples),
+        }
\ No newline at end of file
@@ -0,0 +1,275 @@
+import gzip
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator
+
+from .database import utc_timestamp
+
+@dataclass
+class RetentionPolicy:
+    """How long rows of one table are kept. Zero disables a limit."""
+    table: str
+    max_age_days: int = 0
+    max_rows_per_session: int = 0
+
+# Per-table details the pruner needs: time column (UTC, like every stored
+# timestamp), the session counter kind (for per-session caps) and the archived columns.
+_TABLES = {
+    "crew_executions": {
+        "time_column": "timestamp",
+        "counter_kind": "execution",
+        "columns": "id, session_id, topic, decompress_text(result_codec, result), execution_time, timestamp",
+        "keys": ("id", "session_id", "topic", "result", "execution_time", "timestamp"),
+    },
+    "qa_interactions": {
+        "time_column": "timestamp",
+        "counter_kind": "qa",
+        "columns": "id, session_id, question, decompress_text(answer_codec, answer), timestamp",
+        "keys": ("id", "session_id", "question", "answer", "timestamp"),
+    },
+    "agent_memories": {
+        "time_column": "updated_at",
+        "counter_kind": None,
+        "columns": "id, session_id, agent_type, memory_data, updated_at",
+        "keys": ("id", "session_id", "agent_type", "memory_data", "updated_at"),
+    },
+    "agent_memory_messages": {
+        "time_column": "created_at",
+        "counter_kind": None,
+        "columns": "id, session_id, agent_type, seq, role, content, created_at",
+        "keys": ("id", "session_id", "agent_type", "seq", "role", "content", "created_at"),
+    },
+}
+
+# Tables the pruner archives, and so the ones ``query_archive`` can read
+ARCHIVED_TABLES = tuple(_TABLES)
+
+class RetentionManager:
+    """Background compaction: prune expired rows, archive them, reclaim pages.
+
+    Deletes run in small batches, each in its own short write transaction, so
+    the write-behind queue and other writers are never locked out for long.
+    """
+
+    def __init__(self, db_manager, policies: List[RetentionPolicy],
+                 archive_dir: Optional[str] = "data/archive", batch_size: int = 500,
+                 interval_seconds: float = 3600, vacuum_pages: int = 1000):
+        self.db_manager = db_manager
+        self.policies = [p for p in policies if p.max_age_days > 0 or p.max_rows_per_session > 0]
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.batch_size = max(1, batch_size)
+        self.interval_seconds = interval_seconds
+        self.vacuum_pages = vacuum_pages
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.last_run: Dict[str, Any] = {}
+
+    @classmethod
+    def from_settings(cls, db_manager, settings) -> 'RetentionManager':
+        """Build a manager from the retention fields in ``Settings``."""
+        policies = [
+            RetentionPolicy("crew_executions", settings.retention_execution_days,
+                            settings.retention_max_executions_per_session),
+            RetentionPolicy("qa_interactions", settings.retention_qa_days,
+                            settings.retention_max_qa_per_session),
+            RetentionPolicy("agent_memories", settings.retention_memory_days),
+            RetentionPolicy("agent_memory_messages", settings.retention_memory_days),
+        ]
+        return cls(
+            db_manager,
+            policies,
+            archive_dir=settings.retention_archive_dir or None,
+            batch_size=settings.retention_batch_size,
+            interval_seconds=settings.retention_interval_seconds
+        )
+
+    def start(self):
+        """Start the periodic compaction thread (no-op without active policies)."""
+        if not self.policies or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="db-retention", daemon=True)
+        self._thread.start()
+        print(f"✅ Retention task started ({len(self.policies)} policies, every {self.interval_seconds}s)")
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the compaction thread after its current batch."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error during retention run: {e}")
+
+    def run_once(self) -> Dict[str, Any]:
+        """Apply every policy once, then reclaim free pages."""
+        with self._lock:
+            started = time.perf_counter()
+            deleted: Dict[str, int] = {}
+            reclaimed = 0
+            # Sharded backends are pruned one file at a time
+            for shard in self.db_manager.shards:
+                shard_deleted = 0
+                for policy in self.policies:
+                    count = 0
+                    if policy.max_age_days > 0:
+                        count += self._prune_by_age(shard.pool, policy)
+                    if policy.max_rows_per_session > 0 and _TABLES[policy.table]["counter_kind"]:
+                        count += self._prune_by_session_count(shard.pool, policy)
+                    deleted[policy.table] = deleted.get(policy.table, 0) + count
+                    shard_deleted += count
+
+                if shard_deleted:
+                    reclaimed += self._incremental_vacuum(shard.pool)
+            self.last_run = {
+                "deleted": deleted,
+                "pages_reclaimed": reclaimed,
+                "duration_seconds": round(time.perf_counter() - started, 3),
+                "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            return self.last_run
+
+    def _cutoff(self, days: int) -> str:
+        return utc_timestamp(datetime.now(timezone.utc) - timedelta(days=days))
+
+    def _prune_by_age(self, pool, policy: RetentionPolicy) -> int:
+        info = _TABLES[policy.table]
+        select_sql = (
+            f"SELECT {info['columns']} FROM {policy.table} "
+            f"WHERE {info['time_column']} < ? ORDER BY {info['time_column']} LIMIT ?"
+        )
+        return self._prune_batches(pool, policy.table, select_sql, (self._cutoff(policy.max_age_days),))
+
+    def _prune_by_session_count(self, pool, policy: RetentionPolicy) -> int:
+        info = _TABLES[policy.table]
+        with pool.reader() as conn:
+            sessions = conn.execute(
+                "SELECT session_id, count FROM session_counters WHERE kind = ? AND count > ?",
+                (info["counter_kind"], policy.max_rows_per_session)
+            ).fetchall()
+
+        select_sql = (
+            f"SELECT {info['columns']} FROM {policy.table} WHERE session_id = ? "
+            f"ORDER BY {info['time_column']}, id LIMIT ?"
+        )
+        total = 0
+        for session_id, count in sessions:
+            # Oldest rows beyond the cap go first
+            total += self._prune_batches(
+                pool, policy.table, select_sql, (session_id,),
+                max_rows=count - policy.max_rows_per_session
+            )
+        return total
+
+    def _prune_batches(self, pool, table: str, select_sql: str, params: tuple,
+                       max_rows: Optional[int] = None) -> int:
+        """Archive and delete matching rows one batch at a time.
+
+        Each batch is read and archived first, then deleted by id in its own
+        short write transaction.
+        """
+        keys = _TABLES[table]["keys"]
+        deleted = 0
+        while not self._stop.is_set():
+            limit = self.batch_size if max_rows is None else min(self.batch_size, max_rows - deleted)
+            if limit <= 0:
+                break
+            # Reading and decompressing happen outside the write lock
+            with pool.reader() as conn:
+                rows = conn.execute(select_sql, params + (limit,)).fetchall()
+            if not rows:
+                break
+            if self.archive_dir:
+                # Archived before the delete: a failed write keeps the rows, and a
+                # crash in between archives the batch twice rather than losing it
+                self._archive(table, [dict(zip(keys, row)) for row in rows])
+            with pool.writer() as conn:
+                conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(row[0],) for row in rows])
+            deleted += len(rows)
+            if len(rows) < limit:
+                break
+            time.sleep(0.01)  # let queued writers in between batches
+        return deleted
+
+    def _archive(self, table: str, records: List[Dict[str, Any]]):
+        """Append records to date-partitioned, gzip-compressed JSONL files."""
+        time_key = _TABLES[table]["keys"][-1]
+        partitions: Dict[str, List[str]] = {}
+        for record in records:
+            day = str(record[time_key])[:10]
+            partitions.setdefault(day, []).append(json.dumps(record, ensure_ascii=False))
+
+        table_dir = self.archive_dir / table
+        table_dir.mkdir(parents=True, exist_ok=True)
+        for day, lines in partitions.items():
+            # Appending writes a new gzip member; gzip readers see one continuous stream
+            with gzip.open(table_dir / f"{day}.jsonl.gz", "at", encoding="utf-8") as handle:
+                handle.write("\n".join(lines) + "\n")
+
+    def query_archive(self, table: str, start_date: Optional[str] = None,
+                      end_date: Optional[str] = None, session_id: Optional[str] = None,
+                      contains: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield archived records, reading only partitions within the date range.
+
+        Dates are inclusive ``YYYY-MM-DD`` strings.
+        """
+        if not self.archive_dir:
+            return
+        table_dir = self.archive_dir / table
+        if not table_dir.exists():
+            return
+
+        needle = contains.lower() if contains else None
+        for path in sorted(table_dir.glob("*.jsonl.gz")):
+            day = path.name[:10]
+            if (start_date and day < start_date) or (end_date and day > end_date):
+                continue
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    if needle and needle not in line.lower():
+                        continue
+                    record = json.loads(line)
+                    if session_id and record.get("session_id") != session_id:
+                        continue
+                    yield record
+
+    def incremental_vacuum(self) -> int:
+        """Return free pages to the OS in small steps; returns pages reclaimed."""
+        return sum(self._incremental_vacuum(shard.pool) for shard in self.db_manager.shards)
+
+    def _incremental_vacuum(self, pool) -> int:
+        reclaimed = 0
+        with pool.maintenance() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # Existing files need a one-time `python manage_db.py vacuum` to enable this
+                return 0
+            while not self._stop.is_set():
+                free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if free == 0:
+                    break
+                # executescript steps the pragma to completion; execute() frees a single page
+                conn.executescript(f"PRAGMA incremental_vacuum({int(min(free, self.vacuum_pages))})")
+                remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                reclaimed += free - remaining
+                if remaining >= free:
+                    break
+        return reclaimed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return policy configuration and the outcome of the last run."""
+        return {
+            "policies": [p.__dict__ for p in self.policies],
+            "archive_dir": str(self.archive_dir) if self.archive_dir else None,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "last_run": self.last_run,
+        }
\ No newline at end of file
@@ -0,0 +1,206 @@
+import re
+from collections import deque
+from typing import Callable, Deque, Dict, Any, List, Optional, Tuple
+
+# Roles as LangChain names them, so persisted rows round-trip with either memory type
+ROLE_PREFIXES = {"human": "Human", "ai": "AI", "system": "System", "text": "Human"}
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English prose)."""
+    return len(text) // 4 + 1
+
+class _Turn:
+    """One message with its token count computed once."""
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: str, content: str, tokens: int):
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+
+class RollingSummaryMemory:
+    """Token-budgeted conversation memory.
+
+    Recent turns are kept verbatim in a ring buffer; when the buffer plus the
+    summary exceed ``token_budget``, the oldest turns are folded into a running
+    summary. Only the folded turns are summarized, never the whole history, so
+    each turn costs the same no matter how long the session runs.
+
+    ``summarizer(previous_summary, folded_lines)`` may be supplied (e.g. an LLM
+    call); by default each folded turn is condensed to its first sentence.
+    """
+
+    def __init__(self, token_budget: int = 2000, summary_budget: int = 500,
+                 summarizer: Optional[Callable[[str, List[str]], str]] = None,
+                 token_counter: Callable[[str], int] = estimate_tokens,
+                 memory_key: str = "chat_history", line_tokens: int = 48):
+        self.token_budget = token_budget
+        self.summary_budget = min(summary_budget, token_budget // 2)
+        self.summarizer = summarizer
+        self.token_counter = token_counter
+        self.memory_key = memory_key
+        self.line_tokens = line_tokens
+
+        self._recent: Deque[_Turn] = deque()
+        self._recent_tokens = 0
+        # Default summary: one condensed line per folded turn, oldest dropped first
+        self._summary_lines: Deque[_Turn] = deque()
+        self._summary_text = ""
+        self._summary_tokens = 0
+        self._omitted = 0
+        # Messages added since the last persist, for the append-only log
+        self._pending: List[Tuple[str, str]] = []
+        # Set by clear() until the persisted log has been dropped as well
+        self.cleared = False
+        self.total_messages = 0
+
+    @property
+    def memory_variables(self) -> List[str]:
+        return [self.memory_key]
+
+    @property
+    def messages(self) -> List[str]:
+        """Verbatim recent messages (older ones live on only in the summary)."""
+        return [turn.content for turn in self._recent]
+
+    @property
+    def summary(self) -> str:
+        if self.summarizer is not None:
+            return self._summary_text
+        lines = [turn.content for turn in self._summary_lines]
+        if self._omitted:
+            lines.insert(0, f"({self._omitted} earlier turns omitted)")
+        return "\n".join(lines)
+
+    @property
+    def prompt_tokens(self) -> int:
+        """Tokens the memory contributes to a prompt (bounded by ``token_budget``)."""
+        return self._recent_tokens + self._summary_tokens
+
+    def _append(self, role: str, content: str):
+        turn = _Turn(role, content, self.token_counter(content))
+        self._recent.append(turn)
+        self._recent_tokens += turn.tokens
+        self.total_messages += 1
+
+        folded = []
+        # Always keep the newest turn verbatim, even if it alone exceeds the budget
+        while len(self._recent) > 1 and self.prompt_tokens > self.token_budget:
+            oldest = self._recent.popleft()
+            self._recent_tokens -= oldest.tokens
+            folded.append(oldest)
+        if folded:
+            self._fold(folded)
+
+    def _condense(self, turn: _Turn) -> str:
+        first = _SENTENCE_END.split(turn.content.strip(), maxsplit=1)[0]
+        max_chars = self.line_tokens * 4
+        if len(first) > max_chars:
+            first = first[:max_chars].rsplit(" ", 1)[0] + "…"
+        return f"{ROLE_PREFIXES.get(turn.role, turn.role)}: {first}"
+
+    def _fold(self, turns: List[_Turn]):
+        """Merge turns leaving the window into the running summary."""
+        if self.summarizer is not None:
+            lines = [f"{ROLE_PREFIXES.get(t.role, t.role)}: {t.content}" for t in turns]
+            try:
+                self._summary_text = self.summarizer(self._summary_text, lines)
+            except Exception as e:
+                print(f"Error updating memory summary: {e}")
+                self._summary_text = "\n".join(filter(None, [self._summary_text] + [self._condense(t) for t in turns]))
+            self._summary_tokens = self.token_counter(self._summary_text)
+            return
+
+        for turn in turns:
+            line = self._condense(turn)
+            self._summary_lines.append(_Turn("summary", line, self.token_counter(line)))
+            self._summary_tokens += self._summary_lines[-1].tokens
+        while len(self._summary_lines) > 1 and self._summary_tokens > self.summary_budget:
+            self._summary_tokens -= self._summary_lines.popleft().tokens
+            self._omitted += 1
+
+    def add_message(self, message, role: str = "human"):
+        """Add a message to memory."""
+        content = str(message)
+        self._append(role, content)
+        self._pending.append((role, content))
+
+    def add_user_message(self, message):
+        self.add_message(message, "human")
+
+    def add_ai_message(self, message):
+        self.add_message(message, "ai")
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, Any]):
+        """LangChain-style hook: record one exchange."""
+        if inputs:
+            self.add_user_message(next(iter(inputs.values())))
+        if outputs:
+            self.add_ai_message(outputs.get("output", next(iter(outputs.values()))))
+
+    def load_memory_variables(self, inputs: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """Render summary plus recent turns for a prompt."""
+        parts = []
+        summary = self.summary
+        if summary:
+            parts.append(f"Summary of earlier conversation:\n{summary}")
+        parts.extend(f"{ROLE_PREFIXES.get(t.role, t.role)}: {t.content}" for t in self._recent)
+        return {self.memory_key: "\n\n".join(parts)}
+
+    def load_history(self, rows: List[Tuple[str, str]]):
+        """Replay already persisted ``(role, content)`` messages, oldest first."""
+        for role, content in rows:
+            self._append(role, content)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Summary state to persist next to the log; the verbatim turns live in the log itself."""
+        return {
+            "summary_lines": [turn.content for turn in self._summary_lines],
+            "summary_text": self._summary_text,
+            "omitted": self._omitted,
+            "recent_messages": len(self._recent),
+            "total_messages": self.total_messages,
+        }
+
+    def restore(self, state: Dict[str, Any], rows: List[Tuple[str, str]]):
+        """Rebuild from a saved ``get_state()`` plus the logged turns that were still verbatim."""
+        self._summary_lines = deque(
+            _Turn("summary", line, self.token_counter(line)) for line in state.get("summary_lines", [])
+        )
+        self._summary_text = state.get("summary_text", "")
+        if self.summarizer is not None:
+            self._summary_tokens = self.token_counter(self._summary_text) if self._summary_text else 0
+        else:
+            self._summary_tokens = sum(turn.tokens for turn in self._summary_lines)
+        self._omitted = state.get("omitted", 0)
+        self.load_history(rows)
+        self.total_messages = max(self.total_messages, state.get("total_messages", 0))
+
+    def pending_messages(self) -> List[Tuple[str, str]]:
+        """Messages added since the last ``mark_persisted``, oldest first."""
+        return list(self._pending)
+
+    def mark_persisted(self, count: int):
+        del self._pending[:count]
+
+    def get_messages(self):
+        """Get recent verbatim messages."""
+        return self.messages
+
+    def approx_bytes(self) -> int:
+        text = sum(len(t.content) for t in self._recent) + len(self.summary)
+        return 256 + text + 64 * (len(self._recent) + len(self._summary_lines))
+
+    def clear(self):
+        """Clear memory."""
+        self._recent.clear()
+        self._recent_tokens = 0
+        self._summary_lines.clear()
+        self._summary_text = ""
+        self._summary_tokens = 0
+        self._omitted = 0
+        self._pending = []
+        self.cleared = True
+        self.total_messages = 0
\ No newline at end of file
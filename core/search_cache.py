@@ -0,0 +1,252 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from .compression import compress_text, decompress_text
+from .database import ConnectionPool
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query, for cache keys."""
+    return _WHITESPACE.sub(" ", query).strip().strip("?.!").strip().lower()
+
+def parse_provider_ttls(spec: str) -> Dict[str, float]:
+    """Parse ``"serper=3600,tavily=1800"`` into a provider -> seconds mapping."""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        provider, _, seconds = item.partition("=")
+        try:
+            ttls[provider.strip()] = float(seconds)
+        except ValueError:
+            print(f"⚠️  Ignoring invalid search cache TTL: {item}")
+    return ttls
+
+class SearchCache:
+    """Two-tier cache for search results: an in-process LRU over a SQLite file.
+
+    Entries are fresh for the provider's TTL, then stale for ``stale_seconds``
+    more. A stale hit is returned immediately while one background refresh
+    replaces it (stale-while-revalidate); if the provider fails, the stale
+    copy keeps being served.
+
+    The SQLite tier is pruned at startup and in the background every
+    ``purge_every`` stores: entries past their stale window are deleted,
+    then the soonest-expiring ones until at most ``max_disk_entries`` remain.
+    """
+
+    def __init__(self, db_path: str = "data/search_cache.db", max_entries: int = 1000,
+                 default_ttl: float = 3600, provider_ttls: Optional[Dict[str, float]] = None,
+                 stale_seconds: float = 86400, refresh_workers: int = 2,
+                 max_disk_entries: int = 50000, purge_every: int = 100):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.purge_every = purge_every
+        self.default_ttl = default_ttl
+        self.provider_ttls = provider_ttls or {}
+        self.stale_seconds = stale_seconds
+
+        self._pool = ConnectionPool(db_path, reader_connections=2, cache_size_mb=8, mmap_size_mb=0)
+        with self._pool.writer() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    results BLOB NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_expires ON search_cache (expires_at)")
+
+        # cache_key -> (expires_at, results); least recently used first
+        self._memory: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="search-refresh")
+        self._stores_since_purge = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0,
+                       "refreshes": 0, "refresh_errors": 0, "stale_on_error": 0, "purged": 0}
+        self._prune()
+
+    @classmethod
+    def from_settings(cls, settings) -> 'SearchCache':
+        """Build a cache from the ``search_cache_*`` fields in ``Settings``."""
+        return cls(
+            db_path=settings.search_cache_path,
+            max_entries=settings.search_cache_max_entries,
+            default_ttl=settings.search_cache_ttl_seconds,
+            provider_ttls=parse_provider_ttls(settings.search_cache_provider_ttls),
+            stale_seconds=settings.search_cache_stale_seconds,
+            max_disk_entries=settings.search_cache_max_disk_entries
+        )
+
+    @staticmethod
+    def make_key(provider: str, query: str, params: Optional[Dict[str, Any]] = None) -> str:
+        raw = json.dumps([provider, normalize_query(query), params or {}], sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _remember(self, cache_key: str, expires_at: float, results: List[Dict[str, Any]]):
+        with self._lock:
+            self._memory[cache_key] = (expires_at, results)
+            self._memory.move_to_end(cache_key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _lookup(self, cache_key: str) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+        """Find an entry in memory, then on disk; returns ``(expires_at, results)``."""
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is not None:
+                self._memory.move_to_end(cache_key)
+                self._stats["memory_hits"] += 1
+                return entry
+
+        try:
+            with self._pool.reader() as conn:
+                row = conn.execute(
+                    "SELECT expires_at, codec, results FROM search_cache WHERE cache_key = ?", (cache_key,)
+                ).fetchone()
+        except Exception as e:
+            print(f"Error reading search cache: {e}")
+            return None
+        if row is None:
+            return None
+
+        entry = (row[0], json.loads(decompress_text(row[1], row[2])))
+        self._remember(cache_key, *entry)
+        self._count("disk_hits")
+        return entry
+
+    def _store(self, cache_key: str, provider: str, query: str, results: List[Dict[str, Any]]):
+        now = time.time()
+        expires_at = now + self.provider_ttls.get(provider, self.default_ttl)
+        self._remember(cache_key, expires_at, results)
+        records = [r.to_dict() if hasattr(r, "to_dict") else r for r in results]
+        codec, payload = compress_text(json.dumps(records, ensure_ascii=False))
+        try:
+            with self._pool.writer() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache "
+                    "(cache_key, provider, query, codec, results, fetched_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (cache_key, provider, normalize_query(query), codec, payload, now, expires_at)
+                )
+        except Exception as e:
+            print(f"Error writing search cache: {e}")
+            return
+
+        with self._lock:
+            self._stores_since_purge += 1
+            due = self._stores_since_purge >= self.purge_every
+            if due:
+                self._stores_since_purge = 0
+        if due:
+            self._executor.submit(self._prune)
+
+    def _refresh(self, cache_key: str, provider: str, query: str, fetch: Callable[[], List[Dict[str, Any]]]):
+        try:
+            self._store(cache_key, provider, query, fetch())
+            self._count("refreshes")
+        except Exception as e:
+            self._count("refresh_errors")
+            print(f"⚠️  Background refresh failed for {provider}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(cache_key)
+
+    def get_or_fetch(self, provider: str, query: str, fetch: Callable[[], List[Any]],
+                     params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Return cached results for a query, calling ``fetch`` only when needed.
+
+        Results may be dicts or records with ``to_dict()``; the memory tier
+        returns them as given, the disk tier as dicts.
+
+        Errors from ``fetch`` propagate unless a stale entry can stand in.
+        """
+        cache_key = self.make_key(provider, query, params)
+        entry = self._lookup(cache_key)
+        now = time.time()
+
+        if entry is not None:
+            expires_at, results = entry
+            if now < expires_at:
+                return results
+            if now < expires_at + self.stale_seconds:
+                self._count("stale_hits")
+                with self._lock:
+                    start_refresh = cache_key not in self._refreshing
+                    self._refreshing.add(cache_key)
+                if start_refresh:
+                    self._executor.submit(self._refresh, cache_key, provider, query, fetch)
+                return results
+
+        self._count("misses")
+        try:
+            results = fetch()
+        except Exception:
+            if entry is not None:
+                # Too old to serve normally, but better than an error
+                self._count("stale_on_error")
+                return entry[1]
+            raise
+        self._store(cache_key, provider, query, results)
+        return results
+
+    def purge_expired(self) -> int:
+        """Delete disk entries past their stale window; returns rows removed."""
+        with self._pool.writer() as conn:
+            cursor = conn.execute(
+                "DELETE FROM search_cache WHERE expires_at < ?", (time.time() - self.stale_seconds,)
+            )
+            return cursor.rowcount
+
+    def trim_to_limit(self) -> int:
+        """Delete the soonest-expiring disk entries beyond ``max_disk_entries``; returns rows removed."""
+        with self._pool.writer() as conn:
+            excess = conn.execute("SELECT count(*) FROM search_cache").fetchone()[0] - self.max_disk_entries
+            if excess <= 0:
+                return 0
+            cursor = conn.execute(
+                "DELETE FROM search_cache WHERE cache_key IN "
+                "(SELECT cache_key FROM search_cache ORDER BY expires_at LIMIT ?)", (excess,)
+            )
+            return cursor.rowcount
+
+    def _prune(self):
+        try:
+            self._count("purged", self.purge_expired() + self.trim_to_limit())
+        except Exception as e:
+            print(f"Error pruning search cache: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / lookups, 3) if lookups else 0.0
+        try:
+            with self._pool.reader() as conn:
+                stats["disk_entries"] = conn.execute("SELECT count(*) FROM search_cache").fetchone()[0]
+        except Exception:
+            stats["disk_entries"] = None
+        return stats
+
+    def close(self):
+        """Wait for background refreshes and close the cache file."""
+        self._executor.shutdown(wait=True)
+        self._pool.close()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+from .rolling_memory import estimate_tokens
+
+class SearchResult:
+    """One search hit. Slotted to keep large cached result sets small."""
+    __slots__ = ("title", "url", "snippet", "provider", "rank", "fetched_at", "score")
+
+    def __init__(self, title: str, url: str, snippet: str = "", provider: str = "",
+                 rank: int = 0, fetched_at: Optional[float] = None, score: float = 0.0):
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+        self.provider = provider
+        self.rank = rank
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        # Relevance after fusion across providers; 0 for a single provider's list
+        self.score = score
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SearchResult':
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def replace(self, **changes) -> 'SearchResult':
+        """Copy with some fields changed (cached results are shared, so never mutate them)."""
+        data = self.to_dict()
+        data.update(changes)
+        return SearchResult(**data)
+
+    def __repr__(self) -> str:
+        return f"SearchResult({self.provider}#{self.rank}: {self.url})"
+
+def results_from_provider(provider: str, items: Iterable[Dict[str, str]]) -> List[SearchResult]:
+    """Wrap ``{"title", "url", "snippet"}`` dicts from one provider, ranked in order."""
+    fetched_at = time.time()
+    return [
+        SearchResult(item.get("title", ""), item.get("url", ""), item.get("snippet", ""),
+                     provider, rank, fetched_at)
+        for rank, item in enumerate(items, 1)
+    ]
+
+def _entry(index: int, result: SearchResult, snippet: str) -> str:
+    return f"**Source {index}: {result.title}**\nURL: {result.url}\nSummary: {snippet}\n---"
+
+def render_results(query: str, results: List[SearchResult], token_budget: Optional[int] = None,
+                   min_snippet_tokens: int = 20) -> str:
+    """Render results as prompt text, most relevant first, within ``token_budget``.
+
+    Results that do not fit whole get a truncated snippet while at least
+    ``min_snippet_tokens`` remain; the rest are dropped and counted.
+    """
+    if not results:
+        return f"No results found for '{query}'"
+
+    ordered = sorted(results, key=lambda r: (-r.score, r.rank)) if any(r.score for r in results) else results
+    header = f"Web Search Results for '{query}':\n\n"
+    if token_budget is None:
+        return header + "\n".join(_entry(i, r, r.snippet) for i, r in enumerate(ordered, 1))
+
+    remaining = token_budget - estimate_tokens(header)
+    entries = []
+    for result in ordered:
+        entry = _entry(len(entries) + 1, result, result.snippet)
+        cost = estimate_tokens(entry)
+        if cost <= remaining:
+            entries.append(entry)
+            remaining -= cost
+            continue
+
+        # Room for the title and URL plus part of the snippet?
+        fixed = estimate_tokens(_entry(len(entries) + 1, result, ""))
+        snippet_tokens = remaining - fixed - 1
+        if snippet_tokens < min_snippet_tokens:
+            break
+        snippet = result.snippet[:snippet_tokens * 4].rsplit(" ", 1)[0] + "..."
+        entries.append(_entry(len(entries) + 1, result, snippet))
+        remaining -= estimate_tokens(entries[-1])
+
+    text = header + "\n".join(entries)
+    omitted = len(ordered) - len(entries)
+    if omitted:
+        text += f"\n({omitted} lower-ranked results omitted to fit the context budget)"
+    return text
\ No newline at end of file
@@ -0,0 +1,313 @@
+import atexit
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .database import DatabaseManager
+from .storage import StorageBackend
+
+# Each shard starts its AUTOINCREMENT ids at shard_index << SHARD_ID_BITS, so a
+# row id alone identifies its shard and ids never collide across files.
+SHARD_ID_BITS = 40
+
+# Tables holding per-session rows; the research cache is global and stays on shard 0
+_SESSION_TABLES = ("crew_executions", "qa_interactions", "agent_memories", "agent_memory_messages")
+
+def shard_path(db_path: str, index: int) -> str:
+    """File of shard ``index``. Shard 0 keeps the original path, so turning
+    sharding on leaves the existing database where it is."""
+    if index == 0:
+        return db_path
+    base = Path(db_path)
+    return str(base.with_name(f"{base.stem}.shard{index}{base.suffix}"))
+
+def stray_shard_files(db_path: str, shard_count: int) -> List[Tuple[int, str]]:
+    """Shard files left over from a larger shard count, as ``(index, path)``."""
+    base = Path(db_path)
+    pattern = re.compile(rf"{re.escape(base.stem)}\.shard(\d+){re.escape(base.suffix)}")
+    stray = []
+    for path in base.parent.glob(f"{base.stem}.shard*"):
+        match = pattern.fullmatch(path.name)
+        if match and int(match.group(1)) >= shard_count:
+            stray.append((int(match.group(1)), str(path)))
+    return sorted(stray)
+
+def _session_ids(shard: DatabaseManager) -> List[str]:
+    with shard.pool.reader() as conn:
+        rows = conn.execute(
+            " UNION ".join(f"SELECT session_id FROM {table}" for table in _SESSION_TABLES)
+        ).fetchall()
+    return [row[0] for row in rows]
+
+def _move_session(source: DatabaseManager, target: DatabaseManager, session_id: str) -> int:
+    """Copy one session's rows to ``target``, then delete them from ``source``.
+
+    The copy first clears whatever the target holds for the session, so a
+    move interrupted between the two transactions is simply redone by the
+    next run. Rows get new ids on the target shard; counters and the search
+    index follow through the usual triggers.
+    """
+    batches = []
+    with source.pool.reader() as conn:
+        for table in _SESSION_TABLES:
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[1] != "id"]
+            rows = conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE session_id = ? ORDER BY id",
+                (session_id,)
+            ).fetchall()
+            batches.append((table, columns, rows))
+
+    with target.pool.writer() as conn:
+        for table, columns, rows in batches:
+            conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+    with source.pool.writer() as conn:
+        for table in _SESSION_TABLES:
+            conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+    return sum(len(rows) for _, _, rows in batches)
+
+class ShardedDatabaseManager(StorageBackend):
+    """Spread sessions across N SQLite files, each with its own writer.
+
+    A session always hashes to the same shard, so all of its reads and writes
+    stay on one file; only cross-session search fans out to every shard.
+    Shard 0 is the original database file. Changing the shard count re-routes
+    sessions, so the manager refuses to start while any session sits on the
+    wrong shard; ``python manage_db.py reshard`` moves them.
+    """
+
+    def __init__(self, db_path: str, shard_count: int, check_placement: bool = True, **options):
+        if shard_count < 1:
+            raise ValueError("shard_count must be at least 1")
+        self.db_path = db_path
+        self.shard_count = shard_count
+        self._options = options
+
+        self._shards = [
+            DatabaseManager(shard_path(db_path, index), id_offset=index << SHARD_ID_BITS, **options)
+            for index in range(shard_count)
+        ]
+        if check_placement:
+            problem = self._placement_problem()
+            if problem:
+                for shard in self._shards:
+                    shard.close()
+                raise RuntimeError(
+                    f"{problem} for DATABASE_SHARDS={shard_count}; "
+                    f"run `python manage_db.py reshard` first"
+                )
+
+        self._executor = ThreadPoolExecutor(max_workers=shard_count, thread_name_prefix="db-shard")
+        atexit.register(self.close)
+        print(f"✅ Sharded database ready ({shard_count} shards)")
+
+    @property
+    def shards(self) -> List[DatabaseManager]:
+        return list(self._shards)
+
+    def _index_for(self, session_id: str) -> int:
+        return zlib.crc32(session_id.encode("utf-8")) % self.shard_count
+
+    def shard_for(self, session_id: str) -> DatabaseManager:
+        """Return the shard that owns a session (stable across processes)."""
+        return self._shards[self._index_for(session_id)]
+
+    def _shard_for_id(self, row_id: int) -> Optional[DatabaseManager]:
+        index = row_id >> SHARD_ID_BITS
+        return self._shards[index] if 0 <= index < self.shard_count else None
+
+    def misplaced_sessions(self) -> Dict[int, List[str]]:
+        """Session ids stored on a shard other than the one they hash to, by shard index."""
+        misplaced = {}
+        for index, shard in enumerate(self._shards):
+            session_ids = [sid for sid in _session_ids(shard) if self._index_for(sid) != index]
+            if session_ids:
+                misplaced[index] = session_ids
+        return misplaced
+
+    def _placement_problem(self) -> Optional[str]:
+        stray = stray_shard_files(self.db_path, self.shard_count)
+        if stray:
+            return f"{len(stray)} shard file(s) beyond the configured count exist ({stray[0][1]}, ...)"
+        misplaced = sum(len(ids) for ids in self.misplaced_sessions().values())
+        if misplaced:
+            return f"{misplaced} session(s) are stored on the wrong shard"
+        return None
+
+    def reshard(self) -> Dict[str, int]:
+        """Move every session to the shard it hashes to under the current shard count.
+
+        Shard files beyond the current count are drained too and then renamed
+        to ``*.resharded``. Run with the service stopped; an interrupted run
+        can simply be repeated.
+        """
+        self.flush()
+        stray = [
+            (index, DatabaseManager(path, id_offset=index << SHARD_ID_BITS, **self._options))
+            for index, path in stray_shard_files(self.db_path, self.shard_count)
+        ]
+        sessions = rows = 0
+        for _, source in list(enumerate(self._shards)) + stray:
+            for session_id in _session_ids(source):
+                target = self.shard_for(session_id)
+                if target is source:
+                    continue
+                rows += _move_session(source, target, session_id)
+                sessions += 1
+
+        for _, source in stray:
+            source.close()
+            for suffix in ("", "-wal", "-shm"):
+                path = Path(source.db_path + suffix)
+                if path.exists():
+                    path.rename(f"{path}.resharded")
+        return {"sessions_moved": sessions, "rows_moved": rows, "files_retired": len(stray)}
+
+    def _fan_out(self, method: str, *args, **kwargs) -> List[Any]:
+        """Call a method on every shard concurrently and collect the results in shard order."""
+        futures = [
+            self._executor.submit(getattr(shard, method), *args, **kwargs)
+            for shard in self._shards
+        ]
+        return [future.result() for future in futures]
+
+    async def save_crew_execution(self, session_id: str, topic: str, result: str,
+                                  execution_time: float = None, timestamp: datetime = None):
+        await self.shard_for(session_id).save_crew_execution(
+            session_id, topic, result, execution_time, timestamp
+        )
+
+    async def save_qa_interaction(self, session_id: str, question: str, answer: str):
+        await self.shard_for(session_id).save_qa_interaction(session_id, question, answer)
+
+    async def save_agent_memory(self, session_id: str, agent_type: str, memory_data: str):
+        await self.shard_for(session_id).save_agent_memory(session_id, agent_type, memory_data)
+
+    def save_agent_memory_sync(self, session_id: str, agent_type: str, memory_data: str):
+        self.shard_for(session_id).save_agent_memory_sync(session_id, agent_type, memory_data)
+
+    def append_agent_messages(self, session_id: str, agent_type: str,
+                              messages: List[Tuple[int, str, str]]) -> bool:
+        return self.shard_for(session_id).append_agent_messages(session_id, agent_type, messages)
+
+    def get_agent_messages(self, session_id: str, agent_type: str, before_seq: Optional[int] = None,
+                           limit: int = 50, after_seq: Optional[int] = None) -> List[Tuple[int, str, str]]:
+        return self.shard_for(session_id).get_agent_messages(session_id, agent_type, before_seq, limit, after_seq)
+
+    def delete_agent_memory(self, session_id: str, agent_type: Optional[str] = None) -> bool:
+        return self.shard_for(session_id).delete_agent_memory(session_id, agent_type)
+
+    def get_agent_memory(self, session_id: str, agent_type: str) -> Optional[str]:
+        return self.shard_for(session_id).get_agent_memory(session_id, agent_type)
+
+    async def aget_agent_memory(self, session_id: str, agent_type: str) -> Optional[str]:
+        return await self.shard_for(session_id).aget_agent_memory(session_id, agent_type)
+
+    def get_session_totals(self, session_id: str) -> Dict[str, int]:
+        return self.shard_for(session_id).get_session_totals(session_id)
+
+    def get_session_history(self, session_id: str, limit: int = 10,
+                            execution_cursor: Optional[str] = None,
+                            qa_cursor: Optional[str] = None) -> Dict[str, Any]:
+        return self.shard_for(session_id).get_session_history(
+            session_id, limit, execution_cursor, qa_cursor
+        )
+
+    async def aget_session_history(self, session_id: str, limit: int = 10,
+                                   execution_cursor: Optional[str] = None,
+                                   qa_cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await self.shard_for(session_id).aget_session_history(
+            session_id, limit, execution_cursor, qa_cursor
+        )
+
+    def get_execution_result(self, execution_id: int) -> Optional[Dict[str, Any]]:
+        shard = self._shard_for_id(execution_id)
+        return shard.get_execution_result(execution_id) if shard else None
+
+    def get_qa_interaction(self, qa_id: int) -> Optional[Dict[str, Any]]:
+        shard = self._shard_for_id(qa_id)
+        return shard.get_qa_interaction(qa_id) if shard else None
+
+    # The research cache is shared by all sessions, so it lives on the first shard
+    def get_research_entry(self, topic_key: str) -> Optional[Dict[str, Any]]:
+        return self._shards[0].get_research_entry(topic_key)
+
+    def find_research_candidates(self, bands: List[str], now: float, limit: int = 50) -> List[str]:
+        return self._shards[0].find_research_candidates(bands, now, limit)
+
+    def save_research_entry(self, topic_key: str, topic: str, result: str, bands: List[str],
+                            created_at: float, expires_at: float):
+        self._shards[0].save_research_entry(topic_key, topic, result, bands, created_at, expires_at)
+
+    def purge_research_cache(self, before: float, topic_key: Optional[str] = None) -> int:
+        return self._shards[0].purge_research_cache(before, topic_key)
+
+    def search_history(self, query: str, session_id: Optional[str] = None, limit: int = 20,
+                       offset: int = 0, raw_query: bool = False,
+                       highlight: tuple = ("**", "**")) -> Dict[str, Any]:
+        """Search one shard for a session, otherwise merge ranked hits from all shards.
+
+        BM25 statistics are per shard, so cross-shard scores are comparable as
+        long as sessions are spread evenly, which the hash routing gives us.
+        """
+        if session_id is not None:
+            return self.shard_for(session_id).search_history(
+                query, session_id, limit, offset, raw_query, highlight
+            )
+
+        # Every shard must supply enough hits to cover the requested page
+        pages = self._fan_out(
+            "search_history", query, None, offset + limit, 0, raw_query, highlight
+        )
+        errors = [page["error"] for page in pages if "error" in page]
+        if len(errors) == len(pages):
+            return {"error": errors[0]}
+
+        merged = sorted(
+            (hit for page in pages if "results" in page for hit in page["results"]),
+            key=lambda hit: hit["score"],
+            reverse=True
+        )
+        response = {
+            "query": query,
+            "results": merged[offset:offset + limit],
+            "limit": limit,
+            "offset": offset,
+            "has_more": len(merged) > offset + limit or any(page.get("has_more") for page in pages)
+        }
+        if errors:
+            response["shard_errors"] = errors
+        return response
+
+    def rebuild_search_index(self) -> int:
+        return sum(self._fan_out("rebuild_search_index"))
+
+    def get_schema_version(self) -> int:
+        return min(shard.get_schema_version() for shard in self._shards)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        return {"shard_count": self.shard_count, "shards": [shard.get_pool_stats() for shard in self._shards]}
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        shard_stats = [shard.get_write_stats() for shard in self._shards]
+        return {
+            "shard_count": self.shard_count,
+            "queue_depth": sum(stats["queue_depth"] for stats in shard_stats),
+            "written": sum(stats["written"] for stats in shard_stats),
+            "shards": shard_stats
+        }
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        return all(self._fan_out("flush", timeout))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for shard in self._shards:
+            shard.close()
\ No newline at end of file
@@ -0,0 +1,147 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+class StorageBackend(ABC):
+    """Interface shared by the single-file and session-sharded databases."""
+
+    @abstractmethod
+    async def save_crew_execution(self, session_id: str, topic: str, result: str,
+                                  execution_time: float = None, timestamp: datetime = None):
+        """Save crew execution results."""
+        pass
+
+    @abstractmethod
+    async def save_qa_interaction(self, session_id: str, question: str, answer: str):
+        """Save Q&A interaction."""
+        pass
+
+    @abstractmethod
+    async def save_agent_memory(self, session_id: str, agent_type: str, memory_data: str):
+        """Save agent memory state."""
+        pass
+
+    @abstractmethod
+    def save_agent_memory_sync(self, session_id: str, agent_type: str, memory_data: str):
+        """Save agent memory immediately, so a following read sees it."""
+        pass
+
+    @abstractmethod
+    def append_agent_messages(self, session_id: str, agent_type: str,
+                              messages: List[Tuple[int, str, str]]) -> bool:
+        """Append ``(seq, role, content)`` messages to an agent's memory log."""
+        pass
+
+    @abstractmethod
+    def get_agent_messages(self, session_id: str, agent_type: str, before_seq: Optional[int] = None,
+                           limit: int = 50, after_seq: Optional[int] = None) -> List[Tuple[int, str, str]]:
+        """Get a page of an agent's memory log (seqs below ``before_seq``, from ``after_seq`` on), oldest first."""
+        pass
+
+    @abstractmethod
+    def delete_agent_memory(self, session_id: str, agent_type: Optional[str] = None) -> bool:
+        """Delete one agent's stored memory, or the whole session's, immediately; False on failure."""
+        pass
+
+    @abstractmethod
+    def get_agent_memory(self, session_id: str, agent_type: str) -> Optional[str]:
+        """Get agent memory data synchronously."""
+        pass
+
+    @abstractmethod
+    async def aget_agent_memory(self, session_id: str, agent_type: str) -> Optional[str]:
+        """Get agent memory data without blocking the event loop."""
+        pass
+
+    @abstractmethod
+    def get_session_totals(self, session_id: str) -> Dict[str, int]:
+        """Get maintained row counts for a session."""
+        pass
+
+    @abstractmethod
+    def get_session_history(self, session_id: str, limit: int = 10,
+                            execution_cursor: Optional[str] = None,
+                            qa_cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get a page of session history."""
+        pass
+
+    @abstractmethod
+    async def aget_session_history(self, session_id: str, limit: int = 10,
+                                   execution_cursor: Optional[str] = None,
+                                   qa_cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get a page of session history without blocking the event loop."""
+        pass
+
+    @abstractmethod
+    def get_execution_result(self, execution_id: int) -> Optional[Dict[str, Any]]:
+        """Get one crew execution with its full result."""
+        pass
+
+    @abstractmethod
+    def get_qa_interaction(self, qa_id: int) -> Optional[Dict[str, Any]]:
+        """Get one Q&A interaction with its full answer."""
+        pass
+
+    @abstractmethod
+    def get_research_entry(self, topic_key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached research result by normalized topic."""
+        pass
+
+    @abstractmethod
+    def find_research_candidates(self, bands: List[str], now: float, limit: int = 50) -> List[str]:
+        """Keys of unexpired cached topics sharing an LSH band."""
+        pass
+
+    @abstractmethod
+    def save_research_entry(self, topic_key: str, topic: str, result: str, bands: List[str],
+                            created_at: float, expires_at: float):
+        """Store a cached research result immediately."""
+        pass
+
+    @abstractmethod
+    def purge_research_cache(self, before: float, topic_key: Optional[str] = None) -> int:
+        """Delete expired cached research, or one topic's entry."""
+        pass
+
+    @abstractmethod
+    def search_history(self, query: str, session_id: Optional[str] = None, limit: int = 20,
+                       offset: int = 0, raw_query: bool = False,
+                       highlight: tuple = ("**", "**")) -> Dict[str, Any]:
+        """Ranked full-text search over stored history."""
+        pass
+
+    @abstractmethod
+    def rebuild_search_index(self) -> int:
+        """Re-index all stored history; returns rows indexed."""
+        pass
+
+    @property
+    @abstractmethod
+    def shards(self) -> List[Any]:
+        """The single-file databases that make up this backend."""
+        pass
+
+    @abstractmethod
+    def get_schema_version(self) -> int:
+        """Get the applied schema migration version."""
+        pass
+
+    @abstractmethod
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        pass
+
+    @abstractmethod
+    def get_write_stats(self) -> Dict[str, Any]:
+        """Get write-behind queue statistics."""
+        pass
+
+    @abstractmethod
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until all queued writes are committed."""
+        pass
+
+    @abstractmethod
+    def close(self):
+        """Flush pending writes and release connections."""
+        pass
\ No newline at end of file
@@ -0,0 +1,185 @@
+import asyncio
+import contextvars
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+Event = Tuple[str, Any]
+
+_current_stream: contextvars.ContextVar = contextvars.ContextVar("current_stream", default=None)
+
+class OutputStream:
+    """Append-only event log for one crew run, readable from any event loop.
+
+    The crew thread ``emit``s ``(kind, data)`` events; consumers (the UI,
+    an SSE response) each keep a cursor and ``wait`` for events past it.
+    Kinds: ``status``, ``task``, ``llm_start``, ``token``.
+    """
+
+    def __init__(self):
+        self._events: List[Event] = []
+        self._lock = threading.Lock()
+        self._waiters: set = set()
+        self.closed = False
+
+    def _notify(self, waiters):
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Consumer's loop already closed
+                pass
+
+    def emit(self, kind: str, data: Any = None):
+        with self._lock:
+            if self.closed:
+                return
+            self._events.append((kind, data))
+            waiters = list(self._waiters)
+        self._notify(waiters)
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            waiters = list(self._waiters)
+        self._notify(waiters)
+
+    async def wait(self, cursor: int, timeout: float) -> List[Event]:
+        """Events after ``cursor``, waiting up to ``timeout`` seconds if there are none yet."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if len(self._events) > cursor or self.closed:
+                return self._events[cursor:]
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+        with self._lock:
+            return self._events[cursor:]
+
+    def on_task_complete(self, name: str, next_status: Optional[str] = None) -> Callable:
+        """Callback for ``Task(callback=...)``: emits the task's output, then the next stage."""
+        def callback(output):
+            self.emit("task", {"name": name, "output": str(output)})
+            if next_status:
+                self.emit("status", next_status)
+        return callback
+
+@contextmanager
+def use_stream(stream: Optional[OutputStream]):
+    """Route LLM tokens produced in this context (and threads it is copied to) to ``stream``."""
+    token = _current_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _current_stream.reset(token)
+
+def token_callback_handler():
+    """LangChain callback handler forwarding generated tokens to the current ``OutputStream``.
+
+    Attach it to the LLM once; runs without a stream ignore it.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class StreamingTokenHandler(BaseCallbackHandler):
+        def on_chat_model_start(self, serialized, messages, **kwargs):
+            stream = _current_stream.get()
+            if stream is not None:
+                stream.emit("llm_start")
+
+        def on_llm_start(self, serialized, prompts, **kwargs):
+            self.on_chat_model_start(serialized, prompts, **kwargs)
+
+        def on_llm_new_token(self, token: str, **kwargs):
+            stream = _current_stream.get()
+            if stream is not None and token:
+                stream.emit("token", token)
+
+    return StreamingTokenHandler()
+
+def submit_streaming(scheduler, func: Callable, *args, kind: str = "research"):
+    """Queue ``func(*args, stream)``; returns ``(job, stream)``. Raises ``QueueFull`` like ``submit``."""
+    stream = OutputStream()
+    job = scheduler.submit(func, *args, stream, kind=kind)
+    job.future.add_done_callback(lambda _: stream.close())
+    return job, stream
+
+async def follow_job(scheduler, job, stream: OutputStream, min_interval: float = 0.25,
+                     status_interval: float = 2.0) -> AsyncIterator[List[Event]]:
+    """Yield batches of a job's events as they arrive, ending with ``("done", result)`` or ``("error", message)``.
+
+    Batches are at least ``min_interval`` apart so token bursts coalesce;
+    while the job is queued a ``status`` event with its position is added
+    every ``status_interval`` seconds. A job still queued when the
+    consumer goes away is cancelled.
+    """
+    result = asyncio.wrap_future(job.future)
+    cursor = 0
+    # Report the queue position right away, then every status_interval
+    timeout = 0.0
+    try:
+        while True:
+            batch = await stream.wait(cursor, timeout)
+            cursor += len(batch)
+            timeout = status_interval
+            if scheduler.position(job):
+                batch = batch + [("status", scheduler.describe(job))]
+            if batch:
+                yield batch
+            if stream.closed and not await stream.wait(cursor, 0):
+                break
+            await asyncio.sleep(min_interval)
+
+        await asyncio.wait({result})
+        if result.cancelled():
+            yield [("error", "Request cancelled.")]
+        elif result.exception() is not None:
+            yield [("error", f"Error: {result.exception()}")]
+        else:
+            yield [("done", result.result())]
+    finally:
+        scheduler.cancel(job)
+
+def to_sse(event: Event) -> str:
+    """Format one event as a server-sent event."""
+    kind, data = event
+    return f"event: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class StreamView:
+    """Folds stream events into the text shown in a Gradio textbox."""
+
+    def __init__(self):
+        self.completed: List[str] = []
+        self.status = ""
+        self.body = ""
+        self.live = ""
+        self.final: Optional[str] = None
+
+    def apply(self, event: Event):
+        kind, data = event
+        if kind == "status":
+            self.status = data
+        elif kind == "task":
+            self.completed.append(data["name"])
+            self.body = data["output"]
+            self.live = ""
+        elif kind == "llm_start":
+            self.live = ""
+        elif kind == "token":
+            self.live += data
+        elif kind in ("done", "error"):
+            self.final = str(data)
+
+    def render(self) -> str:
+        if self.final is not None:
+            return self.final
+        lines = [f"✅ {name} finished" for name in self.completed]
+        if self.status:
+            lines.append(self.status)
+        body = self.live or self.body
+        return "\n".join(lines) + ("\n\n" + body if body else "")
\ No newline at end of file
@@ -1,8 +1,23 @@
+import atexit
 import requests
 import json
-from typing import List, Dict, Any
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from abc import ABC, abstractmethod
 
+from urllib3.exceptions import ConnectTimeoutError
+
+from .http_client import create_http_session, read_json
+from .page_fetcher import PageFetcher
+from .replay import FixtureStore, MODE_REPLAY
+from .resilience import AdaptiveTimeout, CircuitBreaker, ProviderUnavailable, TokenBucket
+from .search_cache import normalize_query
+from .search_results import SearchResult, render_results, results_from_provider
+
 class BaseTool(ABC):
     """Simple base tool class compatible with CrewAI."""
     
@@ -15,157 +30,506 @@ class BaseTool(ABC):
         """Run the tool with a query."""
         pass
 
-class SerperSearchTool(BaseTool):
+class SearchTool(BaseTool):
+    """Base class for web search tools.
+
+    Subclasses implement ``_search`` returning ``SearchResult`` records;
+    ``search`` puts the shared cache in front of it and ``_run`` renders the
+    results for the agent, within ``render_token_budget`` when one is set.
+    """
+
+    provider = "search"
+    # Request parameters that change the results, so they are part of the cache key
+    search_params: Dict[str, Any] = {}
+    timeout = 10
+    # Longest we block waiting for a rate-limit token before skipping the provider
+    rate_limit_wait = 0.25
+    # Retries of failed connections only, within the same adaptive timeout
+    max_retries = 2
+    backoff_factor = 0.3
+    render_token_budget: Optional[int] = None
+    # Set by ToolsManager to read the top result pages instead of relying on snippets
+    page_fetcher: Optional[PageFetcher] = None
+
+    def __init__(self, cache=None, session: Optional[requests.Session] = None):
+        super().__init__()
+        self.cache = cache
+        # ToolsManager passes one pooled session to every provider
+        self.session = session
+        # ToolsManager shares one limiter per API key; standalone tools are unlimited
+        self.limiter: Optional[TokenBucket] = None
+        self.breaker = CircuitBreaker()
+        self.timeouts = AdaptiveTimeout(max_timeout=self.timeout)
+        # Record/replay store; ToolsManager sets it when REPLAY_MODE is not "off"
+        self.fixtures: Optional[FixtureStore] = None
+
+    def is_available(self) -> bool:
+        """False while the circuit breaker is open, so callers can skip this provider."""
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float:
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return 0.0
+
+    def _request_json(self, method: str, url: str, **kwargs) -> Any:
+        """Send a request over the shared keep-alive session and decode the JSON body.
+
+        Fails fast with ``ProviderUnavailable`` when rate limited or circuit-broken.
+        With a fixture store attached the call is recorded or replayed.
+        """
+        if self.fixtures is not None:
+            request = {"method": method, "url": url, "params": kwargs.get("params"), "json": kwargs.get("json")}
+            return self.fixtures.call(f"search:{self.provider}", request,
+                                      lambda: self._send_request(method, url, **kwargs))
+        return self._send_request(method, url, **kwargs)
+
+    @staticmethod
+    def _never_sent(error: requests.ConnectionError) -> bool:
+        """True when the connection failed before the request went out, so resending is safe."""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        # NewConnectionError (refused, DNS failure) subclasses ConnectTimeoutError
+        return isinstance(reason, ConnectTimeoutError)
+
+    def _send_request(self, method: str, url: str, **kwargs) -> Any:
+        """One provider call: at most ``max_retries`` reconnects, all within one adaptive timeout.
+
+        The session itself never retries, so every attempt is seen by the
+        circuit breaker and an open breaker stops further attempts at once.
+        """
+        if self.session is None:
+            self.session = create_http_session(max_retries=0)
+        if self.limiter is not None and not self.limiter.try_acquire(self.rate_limit_wait):
+            raise ProviderUnavailable(f"{self.provider} rate limit reached")
+
+        deadline = time.perf_counter() + self.timeouts.timeout
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise ProviderUnavailable(f"{self.provider} temporarily disabled after repeated failures")
+            started = time.perf_counter()
+            try:
+                with self.session.request(method, url, timeout=max(0.05, deadline - started),
+                                          stream=True, **kwargs) as response:
+                    if response.status_code == 429:
+                        self.breaker.record_failure(retry_after=self._retry_after(response))
+                        raise ProviderUnavailable(f"{self.provider} returned 429 Too Many Requests")
+                    response.raise_for_status()
+                    data = read_json(response)
+            except ProviderUnavailable:
+                raise
+            except requests.ConnectionError as e:
+                self.breaker.record_failure()
+                backoff = self.backoff_factor * (2 ** attempt)
+                if attempt >= self.max_retries or not self._never_sent(e) or time.perf_counter() + backoff >= deadline:
+                    raise
+                attempt += 1
+                time.sleep(backoff)
+                continue
+            except Exception:
+                self.breaker.record_failure()
+                raise
+
+            self.breaker.record_success()
+            self.timeouts.record(time.perf_counter() - started)
+            return data
+
+    def get_health(self) -> Dict[str, Any]:
+        """Breaker state, rate-limit tokens and adaptive timeout for metrics."""
+        return {
+            "available": self.is_available(),
+            "breaker": self.breaker.get_stats(),
+            "rate_limit_tokens": self.limiter.available if self.limiter else None,
+            "latency": self.timeouts.get_stats(),
+        }
+
+    @abstractmethod
+    def _search(self, query: str) -> List[SearchResult]:
+        """Call the provider and return its ranked results."""
+        pass
+
+    def search(self, query: str) -> List[SearchResult]:
+        """Return results for a query, from the cache when possible."""
+        if self.cache is None:
+            return self._search(query)
+        results = self.cache.get_or_fetch(self.provider, query, lambda: self._search(query), self.search_params)
+        # Entries read back from disk arrive as plain dicts
+        return [r if isinstance(r, SearchResult) else SearchResult.from_dict(r) for r in results]
+
+    def _format(self, query: str, results: List[SearchResult]) -> str:
+        return render_results(query, results, self.render_token_budget)
+
+    def _run(self, query: str) -> str:
+        """Execute a web search."""
+        try:
+            results = self.search(query)
+            if self.page_fetcher is not None:
+                results = self.page_fetcher.enrich(results)
+            return self._format(query, results)
+        except Exception as e:
+            return f"Search error: {str(e)}"
+
+    def search_many(self, queries: List[str], executor: Optional[Executor] = None,
+                    max_concurrency: int = 4) -> Dict[str, Any]:
+        """Run a batch of queries concurrently and deduplicate across it.
+
+        Queries that normalize to the same text run once. A URL is reported
+        only under the first query (in batch order) that found it. Returns
+        ``{"queries": [{"query", "results", "error"}], "unique_results",
+        "duplicate_results", "duplicate_queries"}``.
+        """
+        unique: Dict[str, str] = {}
+        duplicate_queries = []
+        for query in queries:
+            key = normalize_query(query)
+            if not key:
+                continue
+            if key in unique:
+                duplicate_queries.append(query)
+            else:
+                unique[key] = query
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(unique) or 1)),
+                                          thread_name_prefix="search-batch")
+        try:
+            futures = [(query, executor.submit(self.search, query)) for query in unique.values()]
+            outcomes = []
+            for query, future in futures:
+                try:
+                    outcomes.append((query, future.result(), None))
+                except Exception as e:
+                    outcomes.append((query, [], str(e)))
+        finally:
+            if own_executor:
+                executor.shutdown(wait=False)
+
+        seen = set()
+        batch, duplicates = [], 0
+        for query, results, error in outcomes:
+            kept = []
+            for result in results:
+                url = canonical_url(result.url)
+                if url in seen:
+                    duplicates += 1
+                    continue
+                seen.add(url)
+                kept.append(result)
+            batch.append({"query": query, "results": kept, "error": error})
+        return {
+            "queries": batch,
+            "unique_results": len(seen),
+            "duplicate_results": duplicates,
+            "duplicate_queries": duplicate_queries,
+        }
+
+    def format_many(self, batch: Dict[str, Any]) -> str:
+        """Render a ``search_many`` batch as one block of agent-readable text."""
+        pages = None
+        if self.page_fetcher is not None:
+            # One concurrent fetch for the top pages of every query in the batch
+            top = self.page_fetcher.top_n
+            pages = self.page_fetcher.fetch_many(
+                [result.url for item in batch["queries"] for result in item["results"][:top]]
+            )
+        sections = []
+        for item in batch["queries"]:
+            if item["error"]:
+                sections.append(f"Search error for '{item['query']}': {item['error']}")
+            elif not item["results"]:
+                sections.append(f"No additional results for '{item['query']}' beyond those listed above")
+            else:
+                results = item["results"]
+                if pages is not None:
+                    results = self.page_fetcher.enrich(results, pages)
+                sections.append(self._format(item["query"], results))
+        return "\n\n".join(sections)
+
+class SerperSearchTool(SearchTool):
     """Real web search using Serper API (Google Search)."""
     
-    def __init__(self, api_key: str):
-        super().__init__()
+    provider = "serper"
+    search_params = {"num": 5}
+    
+    def __init__(self, api_key: str, cache=None, session: Optional[requests.Session] = None):
+        super().__init__(cache, session)
         self.name = "serper_search"
         self.description = "Search the web using Serper API for real-time information"
         self.api_key = api_key
         self.base_url = "https://google.serper.dev/search"
     
-    def _run(self, query: str) -> str:
+    def _search(self, query: str) -> List[SearchResult]:
         """Execute real web search using Serper."""
-        try:
-            headers = {
-                "X-API-KEY": self.api_key,
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "q": query,
-                "num": 5
-            }
-            
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            results = []
-            if "organic" in data:
-                for i, result in enumerate(data["organic"][:5], 1):
-                    title = result.get("title", "")
-                    link = result.get("link", "")
-                    snippet = result.get("snippet", "")
-                    
-                    results.append(f"**Source {i}: {title}**\nURL: {link}\nSummary: {snippet}\n---")
-            
-            if results:
-                return f"Web Search Results for '{query}':\n\n" + "\n".join(results)
-            else:
-                return f"No results found for '{query}'"
-                
-        except Exception as e:
-            return f"Search error: {str(e)}"
+        headers = {
+            "X-API-KEY": self.api_key,
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "q": query,
+            "num": 5
+        }
+        
+        data = self._request_json("POST", self.base_url, headers=headers, json=payload)
+        
+        return results_from_provider(self.provider, (
+            {"title": result.get("title", ""), "url": result.get("link", ""), "snippet": result.get("snippet", "")}
+            for result in data.get("organic", [])[:5]
+        ))
 
-class TavilySearchTool(BaseTool):
+class TavilySearchTool(SearchTool):
     """Real web search using Tavily API."""
     
-    def __init__(self, api_key: str):
-        super().__init__()
+    provider = "tavily"
+    search_params = {"search_depth": "basic", "max_results": 5}
+    
+    def __init__(self, api_key: str, cache=None, session: Optional[requests.Session] = None):
+        super().__init__(cache, session)
         self.name = "tavily_search"
         self.description = "Search the web using Tavily API for AI-optimized results"
         self.api_key = api_key
         self.base_url = "https://api.tavily.com/search"
     
-    def _run(self, query: str) -> str:
+    def _search(self, query: str) -> List[SearchResult]:
         """Execute web search using Tavily."""
-        try:
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "api_key": self.api_key,
-                "query": query,
-                "search_depth": "basic",
-                "include_answer": True,
-                "include_sources": True,
-                "max_results": 5
-            }
-            
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            results = []
-            if "results" in data:
-                for i, result in enumerate(data["results"][:5], 1):
-                    title = result.get("title", "")
-                    url = result.get("url", "")
-                    content = result.get("content", "")
-                    
-                    results.append(f"**Source {i}: {title}**\nURL: {url}\nSummary: {content[:200]}...\n---")
-            
-            if results:
-                return f"Web Search Results for '{query}':\n\n" + "\n".join(results)
-            else:
-                return f"No results found for '{query}'"
-                
-        except Exception as e:
-            return f"Search error: {str(e)}"
+        headers = {
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "api_key": self.api_key,
+            "query": query,
+            "search_depth": "basic",
+            "include_answer": True,
+            "include_sources": True,
+            "max_results": 5
+        }
+        
+        data = self._request_json("POST", self.base_url, headers=headers, json=payload)
+        
+        # Full page extract; the renderer trims it to the prompt budget
+        return results_from_provider(self.provider, (
+            {"title": result.get("title", ""), "url": result.get("url", ""), "snippet": result.get("content", "")}
+            for result in data.get("results", [])[:5]
+        ))
 
-class BraveSearchTool(BaseTool):
+class BraveSearchTool(SearchTool):
     """Real web search using Brave Search API."""
     
-    def __init__(self, api_key: str):
-        super().__init__()
+    provider = "brave"
+    search_params = {"count": 5, "mkt": "en-US", "safesearch": "moderate"}
+    
+    def __init__(self, api_key: str, cache=None, session: Optional[requests.Session] = None):
+        super().__init__(cache, session)
         self.name = "brave_search"
         self.description = "Search the web using Brave Search API for unbiased results"
         self.api_key = api_key
         self.base_url = "https://api.search.brave.com/res/v1/web/search"
     
-    def _run(self, query: str) -> str:
+    def _search(self, query: str) -> List[SearchResult]:
         """Execute web search using Brave."""
-        try:
-            headers = {
-                "Accept": "application/json",
-                "Accept-Encoding": "gzip",
-                "X-Subscription-Token": self.api_key
-            }
-            
-            params = {
-                "q": query,
-                "count": 5,
-                "offset": 0,
-                "mkt": "en-US",
-                "safesearch": "moderate"
-            }
-            
-            response = requests.get(self.base_url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            results = []
-            if "web" in data and "results" in data["web"]:
-                for i, result in enumerate(data["web"]["results"][:5], 1):
-                    title = result.get("title", "")
-                    url = result.get("url", "")
-                    description = result.get("description", "")
-                    
-                    results.append(f"**Source {i}: {title}**\nURL: {url}\nSummary: {description}\n---")
-            
-            if results:
-                return f"Web Search Results for '{query}':\n\n" + "\n".join(results)
-            else:
-                return f"No results found for '{query}'"
-                
-        except Exception as e:
-            return f"Search error: {str(e)}"
+        headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+            "X-Subscription-Token": self.api_key
+        }
+        
+        params = {
+            "q": query,
+            "count": 5,
+            "offset": 0,
+            "mkt": "en-US",
+            "safesearch": "moderate"
+        }
+        
+        data = self._request_json("GET", self.base_url, headers=headers, params=params)
+        
+        return results_from_provider(self.provider, (
+            {"title": result.get("title", ""), "url": result.get("url", ""), "snippet": result.get("description", "")}
+            for result in data.get("web", {}).get("results", [])[:5]
+        ))
+
+_TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "msclkid", "ref", "ref_src")
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so the same page from different providers compares equal."""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith(_TRACKING_PARAMS)
+    ))
+    # http/https variants of one page are the same source
+    return urlunsplit(("", host, parts.path.rstrip("/") or "/", query, ""))
+
+def fuse_results(ranked_lists: List[List[SearchResult]], k: int = 60) -> List[SearchResult]:
+    """Merge per-provider rankings with reciprocal-rank fusion, deduplicating by URL.
+
+    Merged results list every contributing provider (``"serper,brave"``) and
+    keep the longest snippet; ``rank`` is the position in the fused list.
+    """
+    scores: Dict[str, float] = {}
+    best: Dict[str, SearchResult] = {}
+    providers: Dict[str, List[str]] = {}
+    for results in ranked_lists:
+        for rank, result in enumerate(results, 1):
+            key = canonical_url(result.url)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            if key not in best or len(result.snippet) > len(best[key].snippet):
+                best[key] = result
+            names = providers.setdefault(key, [])
+            if result.provider and result.provider not in names:
+                names.append(result.provider)
+
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    return [
+        best[key].replace(provider=",".join(providers[key]), rank=rank, score=round(scores[key], 6))
+        for rank, key in enumerate(ordered, 1)
+    ]
+
+class MultiProviderSearchTool(SearchTool):
+    """Query several providers at once and merge their results.
+
+    The ``fanout`` fastest-looking providers start immediately. If fewer than
+    ``quorum`` have answered by the p90 latency of those in flight, the next
+    provider is fired as a hedge. The search returns as soon as ``quorum``
+    providers have answered or ``deadline`` passes, so latency tracks the
+    fastest providers instead of the slowest.
+    """
+
+    provider = "multi"
+
+    def __init__(self, providers: List[SearchTool], quorum: int = 2, deadline: float = 8.0,
+                 fanout: int = 1, max_results: int = 8, default_hedge_delay: float = 1.5):
+        super().__init__()
+        self.name = "multi_search"
+        self.description = "Search the web across all configured providers and merge the results"
+        self.providers = list(providers)
+        self.quorum = max(1, min(quorum, len(self.providers)))
+        self.deadline = deadline
+        self.fanout = fanout if fanout > 0 else len(self.providers)
+        self.max_results = max_results
+        self.default_hedge_delay = default_hedge_delay
+
+        self._latencies = {p.provider: deque(maxlen=100) for p in self.providers}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(4, len(self.providers) * 4),
+                                            thread_name_prefix="multi-search")
+        self._stats = {"searches": 0, "hedges": 0, "deadline_hits": 0, "provider_errors": 0,
+                       "skipped_unhealthy": 0}
+
+    def _latency_percentile(self, provider: str, q: float = 0.9) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies[provider])
+        if len(samples) < 5:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def _hedge_delay(self, providers: List[SearchTool]) -> float:
+        p90s = [self._latency_percentile(p.provider) for p in providers]
+        known = [value for value in p90s if value is not None]
+        return max(known) if known else self.default_hedge_delay
+
+    def _timed_search(self, provider: SearchTool, query: str) -> List[SearchResult]:
+        started = time.perf_counter()
+        results = provider.search(query)
+        with self._lock:
+            self._latencies[provider.provider].append(time.perf_counter() - started)
+        return results
+
+    def _ordered_providers(self) -> List[SearchTool]:
+        """Healthy providers, lowest median latency first; unmeasured ones keep config order."""
+        def median(provider):
+            value = self._latency_percentile(provider.provider, 0.5)
+            return value if value is not None else float("inf")
+        healthy = [p for p in self.providers if p.is_available()]
+        with self._lock:
+            self._stats["skipped_unhealthy"] += len(self.providers) - len(healthy)
+        # With every breaker open, still go through the motions: cached results may stand in
+        return sorted(healthy or self.providers, key=median)
+
+    def _search(self, query: str) -> List[SearchResult]:
+        started = time.perf_counter()
+        pending_providers = self._ordered_providers()
+        launched = pending_providers[:self.fanout]
+        backups = pending_providers[self.fanout:]
+        futures = {self._executor.submit(self._timed_search, p, query): p for p in launched}
+
+        ranked_lists, errors = [], []
+        hedge_at = started + self._hedge_delay(launched)
+        deadline_at = started + self.deadline
+        while (futures or backups) and len(ranked_lists) < self.quorum:
+            now = time.perf_counter()
+            if now >= deadline_at:
+                with self._lock:
+                    self._stats["deadline_hits"] += 1
+                break
+            if backups and now >= hedge_at:
+                backup = backups.pop(0)
+                futures[self._executor.submit(self._timed_search, backup, query)] = backup
+                launched.append(backup)
+                hedge_at = now + self._hedge_delay([backup])
+                with self._lock:
+                    self._stats["hedges"] += 1
+
+            timeout = min(deadline_at, hedge_at if backups else deadline_at) - now
+            done, _ = wait(list(futures), timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = futures.pop(future)
+                try:
+                    ranked_lists.append(future.result())
+                except Exception as e:
+                    errors.append(f"{provider.provider}: {e}")
+                    with self._lock:
+                        self._stats["provider_errors"] += 1
+                    # A failed provider is replaced right away rather than after the hedge delay
+                    if backups:
+                        hedge_at = time.perf_counter()
+            if not futures:
+                # Everything in flight has finished short of quorum; bring in the next provider now
+                hedge_at = time.perf_counter()
 
-class EnhancedMockSearchTool(BaseTool):
+        with self._lock:
+            self._stats["searches"] += 1
+        if not ranked_lists and errors:
+            raise RuntimeError("; ".join(errors))
+        # Slower providers still running keep warming the cache for the next query
+        return fuse_results(ranked_lists)[:self.max_results]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hedging counters and per-provider latency percentiles."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["providers"] = {
+            p.provider: {"p50": self._latency_percentile(p.provider, 0.5), "p90": self._latency_percentile(p.provider)}
+            for p in self.providers
+        }
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+class EnhancedMockSearchTool(SearchTool):
     """Enhanced mock search with realistic links and sources."""
     
+    provider = "mock"
+    
     def __init__(self):
         super().__init__()
         self.name = "enhanced_mock_search"
         self.description = "Enhanced mock search with realistic sources and links"
     
-    def _run(self, query: str) -> str:
+    def _search(self, query: str) -> List[SearchResult]:
         """Execute enhanced mock search with real-looking sources."""
         
         ai_sources = [
@@ -191,41 +555,139 @@ class EnhancedMockSearchTool(BaseTool):
             }
         ]
         
-        results = []
-        for i, source in enumerate(ai_sources, 1):
-            results.append(f"**Source {i}: {source['title']}**\nURL: {source['url']}\nSummary: {source['summary']}\n---")
-        
-        return f"Web Search Results for '{query}':\n\n" + "\n".join(results) + "\n\nNote: Using enhanced mock search with real research URLs."
+        return results_from_provider(self.provider, (
+            {"title": source["title"], "url": source["url"], "snippet": source["summary"]}
+            for source in ai_sources
+        ))
+    
+    def _format(self, query: str, results: List[SearchResult]) -> str:
+        return super()._format(query, results) + "\n\nNote: Using enhanced mock search with real research URLs."
 
 class ToolsManager:
     """Enhanced tools manager with real web search capabilities."""
     
     def __init__(self, settings):
         self.settings = settings
+        self._rate_limiters: Dict[str, TokenBucket] = {}
+        self.fixtures = self._create_fixture_store()
+        self.search_cache = self._create_search_cache()
+        # No retries in the session: SearchTool._send_request owns the retry policy
+        self.http_session = create_http_session(
+            pool_size=getattr(settings, 'http_pool_size', 10),
+            max_retries=0
+        )
+        # Bounds concurrent queries across every search_many batch
+        self._batch_executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'search_max_concurrency', 4),
+            thread_name_prefix="search-batch"
+        )
         self._initialize_tools()
+        atexit.register(self.close)
+    
+    def _create_fixture_store(self) -> Optional[FixtureStore]:
+        """Record/replay store for provider calls (None unless REPLAY_MODE is set)."""
+        try:
+            fixtures = FixtureStore.from_settings(self.settings)
+        except Exception as e:
+            print(f"⚠️  Record/replay disabled: {e}")
+            return None
+        if fixtures is not None:
+            print(f"✅ Search providers in {fixtures.mode} mode ({fixtures.root})")
+        return fixtures
+    
+    def _create_search_cache(self):
+        """Shared result cache for all search providers (None when disabled)."""
+        if not getattr(self.settings, 'search_cache_enabled', False):
+            return None
+        if self.fixtures is not None:
+            # A cache hit would skip the recording, or hide replayed latency
+            print("⚠️  Search cache disabled while recording or replaying")
+            return None
+        try:
+            from .search_cache import SearchCache
+            cache = SearchCache.from_settings(self.settings)
+            print("✅ Search result cache initialized")
+            return cache
+        except Exception as e:
+            print(f"⚠️  Search cache disabled: {e}")
+            return None
+    
+    def _create_page_fetcher(self) -> Optional[PageFetcher]:
+        """Fetcher for the pages behind top results (None when disabled)."""
+        if not getattr(self.settings, 'page_fetch_enabled', False):
+            return None
+        try:
+            fetcher = PageFetcher.from_settings(self.settings)
+            fetcher.fixtures = self.fixtures
+            print(f"✅ Page fetching enabled (top {fetcher.top_n} results per query)")
+            return fetcher
+        except Exception as e:
+            print(f"⚠️  Page fetching disabled: {e}")
+            return None
+    
+    def _harden(self, tool: SearchTool, api_key: str) -> SearchTool:
+        """Attach the per-key rate limiter, circuit breaker, adaptive timeout and retry policy."""
+        rate = getattr(self.settings, 'search_rate_limit_per_second', 5.0)
+        if rate > 0:
+            # Keyed by API key: tools sharing a key share its quota
+            if api_key not in self._rate_limiters:
+                self._rate_limiters[api_key] = TokenBucket(rate, getattr(self.settings, 'search_rate_limit_burst', 10))
+            tool.limiter = self._rate_limiters[api_key]
+        tool.breaker = CircuitBreaker(
+            failure_threshold=getattr(self.settings, 'search_breaker_failures', 5),
+            cooldown=getattr(self.settings, 'search_breaker_cooldown_seconds', 30.0)
+        )
+        tool.timeouts = AdaptiveTimeout(
+            min_timeout=getattr(self.settings, 'search_timeout_min_seconds', 1.0),
+            max_timeout=getattr(self.settings, 'search_timeout_max_seconds', 10.0)
+        )
+        tool.max_retries = getattr(self.settings, 'http_max_retries', 2)
+        tool.backoff_factor = getattr(self.settings, 'http_backoff_factor', 0.3)
+        tool.fixtures = self.fixtures
+        return tool
+    
+    def _api_key(self, name: str) -> Optional[str]:
+        """API key for a provider; in replay mode any recorded provider works without one."""
+        key = getattr(self.settings, f'{name}_api_key', None)
+        if not key and self.fixtures is not None and self.fixtures.mode == MODE_REPLAY:
+            if f"search:{name}" in self.fixtures.kinds():
+                return f"replay-{name}"
+        return key
     
     def _initialize_tools(self):
         """Initialize all available tools."""
         self.search_tools = []
         
         # Add real search tools if API keys available
-        if hasattr(self.settings, 'serper_api_key') and self.settings.serper_api_key:
+        serper_key = self._api_key('serper')
+        if serper_key:
             try:
-                self.search_tools.append(SerperSearchTool(self.settings.serper_api_key))
+                self.search_tools.append(self._harden(
+                    SerperSearchTool(serper_key, self.search_cache, self.http_session),
+                    serper_key
+                ))
                 print("✅ Serper (Google) search tool initialized")
             except Exception as e:
                 print(f"⚠️  Serper tool failed: {e}")
         
-        if hasattr(self.settings, 'tavily_api_key') and self.settings.tavily_api_key:
+        tavily_key = self._api_key('tavily')
+        if tavily_key:
             try:
-                self.search_tools.append(TavilySearchTool(self.settings.tavily_api_key))
+                self.search_tools.append(self._harden(
+                    TavilySearchTool(tavily_key, self.search_cache, self.http_session),
+                    tavily_key
+                ))
                 print("✅ Tavily search tool initialized")
             except Exception as e:
                 print(f"⚠️  Tavily tool failed: {e}")
         
-        if hasattr(self.settings, 'brave_api_key') and self.settings.brave_api_key:
+        brave_key = self._api_key('brave')
+        if brave_key:
             try:
-                self.search_tools.append(BraveSearchTool(self.settings.brave_api_key))
+                self.search_tools.append(self._harden(
+                    BraveSearchTool(brave_key, self.search_cache, self.http_session),
+                    brave_key
+                ))
                 print("✅ Brave search tool initialized")
             except Exception as e:
                 print(f"⚠️  Brave tool failed: {e}")
@@ -234,10 +696,33 @@ class ToolsManager:
         if not self.search_tools:
             self.search_tools.append(EnhancedMockSearchTool())
             print("✅ Enhanced mock search tool initialized")
+        
+        # With several providers, agents get one tool that queries them all at once
+        self.multi_search = None
+        if len(self.search_tools) > 1:
+            self.multi_search = MultiProviderSearchTool(
+                self.search_tools,
+                quorum=getattr(self.settings, 'search_quorum', 2),
+                deadline=getattr(self.settings, 'search_deadline_seconds', 8.0),
+                fanout=getattr(self.settings, 'search_fanout', 1)
+            )
+            print(f"✅ Multi-provider search initialized ({len(self.search_tools)} providers)")
+        
+        # Mock results point at real sites, but their pages say nothing about the query
+        self.has_real_search = not isinstance(self.search_tools[0], EnhancedMockSearchTool)
+        self.page_fetcher = self._create_page_fetcher() if self.has_real_search else None
+        
+        budget = getattr(self.settings, 'search_render_token_budget', 0)
+        for tool in self.search_tools + ([self.multi_search] if self.multi_search else []):
+            tool.render_token_budget = budget or None
+            tool.page_fetcher = self.page_fetcher
+    
+    def _agent_search_tools(self) -> List[BaseTool]:
+        return [self.multi_search] if self.multi_search else self.search_tools
     
     def get_research_tools(self) -> List[BaseTool]:
         """Get tools for research agents."""
-        return self.search_tools
+        return self._agent_search_tools()
     
     def get_writing_tools(self) -> List[BaseTool]:
         """Get tools for writing agents."""
@@ -245,8 +730,59 @@ class ToolsManager:
     
     def get_verification_tools(self) -> List[BaseTool]:
         """Get tools for fact-checking agents."""
-        return self.search_tools
+        return self._agent_search_tools()
     
     def get_document_tools(self) -> List[BaseTool]:
         """Get tools for document processing agents."""
-        return []
\ No newline at end of file
+        return []
+    
+    def topic_queries(self, topic: str) -> List[str]:
+        """Decompose a research topic into the aspects the research task covers."""
+        return [
+            f"{topic} latest developments",
+            f"{topic} key companies and research institutions",
+            f"{topic} real-world applications",
+            f"{topic} market trends and adoption",
+            f"{topic} future outlook",
+        ]
+    
+    def search_many(self, queries: List[str]) -> Dict[str, Any]:
+        """Run a batch of queries through the agents' search tool under the shared concurrency limit."""
+        tool = self._agent_search_tools()[0]
+        return tool.search_many(queries, executor=self._batch_executor)
+    
+    def research_topic(self, topic: str) -> str:
+        """Gather evidence for every aspect of a topic in one concurrent round trip."""
+        tool = self._agent_search_tools()[0]
+        return tool.format_many(self.search_many(self.topic_queries(topic)))
+    
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get search cache hit/miss metrics."""
+        return self.search_cache.get_stats() if self.search_cache else None
+    
+    def get_search_metrics(self) -> Dict[str, Any]:
+        """Get provider health, fan-out and cache metrics in one place."""
+        return {
+            "providers": {tool.provider: tool.get_health() for tool in self.search_tools},
+            "multi_search": self.multi_search.get_stats() if self.multi_search else None,
+            "cache": self.get_cache_stats(),
+            "pages": self.page_fetcher.get_stats() if self.page_fetcher else None,
+            "fixtures": self.fixtures.get_stats() if self.fixtures else None,
+        }
+    
+    def close(self):
+        """Release shared resources; safe to call more than once."""
+        self._batch_executor.shutdown(wait=False)
+        if self.multi_search:
+            self.multi_search.close()
+            self.multi_search = None
+        if self.page_fetcher:
+            self.page_fetcher.close()
+            self.page_fetcher = None
+        if self.search_cache:
+            self.search_cache.close()
+            self.search_cache = None
+        if self.http_session:
+            # Closes every pooled keep-alive connection
+            self.http_session.close()
+            self.http_session = None
\ No newline at end of file
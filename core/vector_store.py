@@ -0,0 +1,211 @@
+import json
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+def hash_embedding(text: str, dim: int = 256) -> np.ndarray:
+    """Embed text with the hashing trick over words and word bigrams.
+
+    No model download and no state: the same text always maps to the same
+    unit vector, so vectors written by one process are valid in every other.
+    """
+    words = _WORD.findall(text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+
+    hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in features), dtype=np.uint32, count=len(features))
+    # The top hash bit picks the sign so collisions cancel out instead of piling up
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, hashes % dim, signs)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def split_into_chunks(text: str, max_chars: int = 800) -> List[str]:
+    """Split text on paragraph boundaries into chunks of at most ``max_chars``."""
+    chunks, current = [], ""
+    for paragraph in (p.strip() for p in re.split(r"\n\s*\n", text)):
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(paragraph[:cut])
+            paragraph = paragraph[cut:].strip()
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+class VectorStore:
+    """Append-only local vector index for semantic recall.
+
+    Vectors are unit-length float32 rows in ``vectors.f32``, memory-mapped
+    read-only for search, so opening the index copies nothing. Texts and
+    metadata sit in ``records.jsonl``; only each record's session and byte
+    offset are kept in memory and texts are read back for the hits alone.
+    """
+
+    def __init__(self, path: str = "vector_store", dim: int = 256,
+                 embed: Optional[Callable[[str, int], np.ndarray]] = None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.embed = embed or hash_embedding
+        self._vectors_file = self.path / "vectors.f32"
+        self._records_file = self.path / "records.jsonl"
+        self._lock = threading.Lock()
+
+        self._offsets: List[int] = []
+        self._row_sessions: List[Optional[str]] = []
+        self._session_rows: Dict[str, List[int]] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._load()
+
+    def _load(self):
+        info_file = self.path / "index.json"
+        if info_file.exists():
+            stored_dim = json.loads(info_file.read_text()).get("dim")
+            if stored_dim != self.dim:
+                raise ValueError(f"Vector store at {self.path} uses dim={stored_dim}, not {self.dim}")
+        else:
+            info_file.write_text(json.dumps({"dim": self.dim, "embedding": "hash-crc32-bigram"}))
+
+        offset = 0
+        if self._records_file.exists():
+            with open(self._records_file, "rb") as handle:
+                for line in handle:
+                    try:
+                        session_id = json.loads(line).get("session_id")
+                    except ValueError:
+                        break  # torn final line from an interrupted append
+                    self._add_row(session_id, offset)
+                    offset += len(line)
+
+        # A crash between the two appends can leave one file longer; cut both to the shorter
+        row_bytes = self.dim * 4
+        vector_rows = self._vectors_file.stat().st_size // row_bytes if self._vectors_file.exists() else 0
+        count = min(vector_rows, len(self._offsets))
+        if self._vectors_file.exists():
+            with open(self._vectors_file, "r+b") as handle:
+                handle.truncate(count * row_bytes)
+        if self._records_file.exists():
+            with open(self._records_file, "r+b") as handle:
+                handle.truncate(self._offsets[count] if count < len(self._offsets) else offset)
+        for row in range(count, len(self._offsets)):
+            if self._row_sessions[row] is not None:
+                self._session_rows[self._row_sessions[row]].remove(row)
+        del self._offsets[count:]
+        del self._row_sessions[count:]
+        self._remap()
+        print(f"✅ Vector store ready ({len(self._offsets)} vectors, dim {self.dim})")
+
+    def _add_row(self, session_id: Optional[str], offset: int):
+        row = len(self._offsets)
+        self._offsets.append(offset)
+        self._row_sessions.append(session_id)
+        if session_id is not None:
+            self._session_rows.setdefault(session_id, []).append(row)
+
+    def _remap(self):
+        count = len(self._offsets)
+        if count == 0:
+            self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+        else:
+            self._matrix = np.memmap(self._vectors_file, dtype=np.float32, mode="r", shape=(count, self.dim))
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def add(self, texts: List[str], session_id: Optional[str] = None,
+            metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Embed and append texts; returns how many were added."""
+        texts = [t for t in texts if t and t.strip()]
+        if not texts:
+            return 0
+        vectors = np.stack([self.embed(text, self.dim) for text in texts]).astype(np.float32)
+        created_at = time.time()
+
+        with self._lock:
+            offset = self._records_file.stat().st_size if self._records_file.exists() else 0
+            lines = []
+            for text in texts:
+                record = {"session_id": session_id, "text": text, "created_at": created_at}
+                if metadata:
+                    record["metadata"] = metadata
+                lines.append((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+
+            # Vectors first: records without a vector are dropped on load
+            with open(self._vectors_file, "ab") as handle:
+                handle.write(vectors.tobytes())
+            with open(self._records_file, "ab") as handle:
+                handle.write(b"".join(lines))
+
+            for line in lines:
+                self._add_row(session_id, offset)
+                offset += len(line)
+            self._remap()
+        return len(texts)
+
+    def _read_record(self, row: int) -> Dict[str, Any]:
+        with open(self._records_file, "rb") as handle:
+            handle.seek(self._offsets[row])
+            return json.loads(handle.readline())
+
+    def search(self, query: str, k: int = 5, session_id: Optional[str] = None,
+               min_score: float = 0.0) -> List[Dict[str, Any]]:
+        """Return the ``k`` most similar stored texts by cosine similarity."""
+        matrix = self._matrix
+        if matrix is None or len(matrix) == 0 or k <= 0:
+            return []
+        query_vector = self.embed(query, self.dim)
+
+        if session_id is not None:
+            rows = np.asarray(self._session_rows.get(session_id, []), dtype=np.int64)
+            rows = rows[rows < len(matrix)]
+            if len(rows) == 0:
+                return []
+            scores = matrix[rows] @ query_vector
+        else:
+            rows = None
+            scores = matrix @ query_vector
+
+        # Rows are unit vectors, so the dot product is the cosine similarity
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for index in top:
+            score = float(scores[index])
+            if score <= min_score:
+                break
+            row = int(rows[index]) if rows is not None else int(index)
+            record = self._read_record(row)
+            record["score"] = round(score, 4)
+            results.append(record)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return index size and on-disk footprint."""
+        return {
+            "vectors": len(self._offsets),
+            "sessions": len(self._session_rows),
+            "dim": self.dim,
+            "vector_bytes": self._vectors_file.stat().st_size if self._vectors_file.exists() else 0,
+            "path": str(self.path),
+        }
\ No newline at end of file
@@ -1,5 +1,4 @@
 import gradio as gr
-import asyncio
 import uuid
 import json
 import os
@@ -70,34 +69,23 @@ class GradioInterface:
         
         return interface
     
-    def _handle_research(self, topic: str, session_id: str) -> str:
+    async def _handle_research(self, topic: str, session_id: str) -> str:
         """Handle research request."""
         if not topic.strip():
             return "Please enter a research topic."
         
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self.system.create_research_crew(topic, session_id)
-            )
-            loop.close()
-            return result
+            # Runs on Gradio's event loop; the crew itself must not block it
+            return await self.system.create_research_crew(topic, session_id)
         except Exception as e:
             return f"Research failed: {str(e)}"
     
-    def _handle_document_qa(self, file, question: str, session_id: str) -> str:
+    async def _handle_document_qa(self, file, question: str, session_id: str) -> str:
         """Handle document Q&A request."""
         if not file or not question.strip():
             return "Please upload a document and enter a question."
         
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                self.system.process_document_qa(file.name, question, session_id)
-            )
-            loop.close()
-            return result
+            return await self.system.process_document_qa(file.name, question, session_id)
         except Exception as e:
             return f"Document Q&A failed: {str(e)}"
\ No newline at end of file
@@ -106,8 +106,8 @@ async def create_research_crew(self, topic: str, session_id: str) -> str:
         
         self.active_crews[session_id] = crew
         
-        # Execute crew
-        result = crew.kickoff()
+        # Execute crew off the event loop so other sessions keep being served
+        result = await asyncio.to_thread(crew.kickoff)
         
         # Save results
         await self._save_crew_results(session_id, topic, result, time.time() - start_time)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Database maintenance commands for the CrewAI system.
+
+Usage:
+    python manage_db.py migrate
+    python manage_db.py backfill-search
+    python manage_db.py search "vector databases" [--session SESSION_ID]
+    python manage_db.py compact
+    python manage_db.py vacuum
+    python manage_db.py reshard
+    python manage_db.py archive-query crew_executions [--from 2025-01-01] [--to 2025-01-31]
+"""
+
+import sys
+import argparse
+import json
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from config.settings import Settings
+from core.database import create_database_manager
+from core.retention import ARCHIVED_TABLES, RetentionManager
+from core.storage import StorageBackend
+
+def cmd_migrate(db: StorageBackend, args):
+    """Apply pending schema migrations (runs on open) and report the version."""
+    print(f"Schema version: {db.get_schema_version()}")
+
+def cmd_backfill_search(db: StorageBackend, args):
+    """Rebuild the full-text search index from stored history."""
+    count = db.rebuild_search_index()
+    print(f"✅ Indexed {count} history entries")
+
+def cmd_search(db: StorageBackend, args):
+    """Run a ranked history search and print the results as JSON."""
+    results = db.search_history(
+        args.query,
+        session_id=args.session,
+        limit=args.limit,
+        offset=args.offset,
+        raw_query=args.raw
+    )
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+def cmd_compact(db: StorageBackend, args):
+    """Apply the configured retention policies once."""
+    retention = RetentionManager.from_settings(db, args.settings)
+    if not retention.policies:
+        print("No retention limits configured (see RETENTION_* settings)")
+        return
+    print(json.dumps(retention.run_once(), indent=2))
+
+def cmd_vacuum(db: StorageBackend, args):
+    """Enable incremental auto-vacuum on an existing file and rebuild it."""
+    db.flush()
+    for shard in db.shards:
+        with shard.pool.maintenance() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        print(f"✅ {shard.db_path} vacuumed (auto_vacuum={mode})")
+
+def cmd_reshard(db: StorageBackend, args):
+    """Move sessions to their shard after DATABASE_SHARDS changed (service stopped)."""
+    if not hasattr(db, "reshard"):
+        print("Single database file with no leftover shards: nothing to move")
+        return
+    print(json.dumps(db.reshard(), indent=2))
+
+def cmd_archive_query(db: StorageBackend, args):
+    """Print archived rows as JSON lines."""
+    retention = RetentionManager.from_settings(db, args.settings)
+    for record in retention.query_archive(args.table, args.start, args.end, args.session, args.contains):
+        print(json.dumps(record, ensure_ascii=False))
+
+def main():
+    parser = argparse.ArgumentParser(description="CrewAI database maintenance")
+    parser.add_argument("--db", help="Database path (defaults to DATABASE_URL)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("migrate", help="apply schema migrations").set_defaults(func=cmd_migrate)
+    subparsers.add_parser("backfill-search", help="rebuild the search index").set_defaults(func=cmd_backfill_search)
+
+    search_parser = subparsers.add_parser("search", help="search stored history")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--session", default=None)
+    search_parser.add_argument("--limit", type=int, default=10)
+    search_parser.add_argument("--offset", type=int, default=0)
+    search_parser.add_argument("--raw", action="store_true", help="use FTS5 query syntax as-is")
+    search_parser.set_defaults(func=cmd_search)
+
+    subparsers.add_parser("compact", help="run retention policies once").set_defaults(func=cmd_compact)
+    subparsers.add_parser("vacuum", help="enable incremental vacuum and rebuild the file").set_defaults(func=cmd_vacuum)
+    subparsers.add_parser("reshard", help="move sessions after changing DATABASE_SHARDS").set_defaults(func=cmd_reshard)
+
+    archive_parser = subparsers.add_parser("archive-query", help="read archived rows")
+    archive_parser.add_argument("table", choices=ARCHIVED_TABLES)
+    archive_parser.add_argument("--from", dest="start", default=None, help="first day, YYYY-MM-DD")
+    archive_parser.add_argument("--to", dest="end", default=None, help="last day, YYYY-MM-DD")
+    archive_parser.add_argument("--session", default=None)
+    archive_parser.add_argument("--contains", default=None, help="case-insensitive text filter")
+    archive_parser.set_defaults(func=cmd_archive_query)
+
+    args = parser.parse_args()
+    settings = Settings.from_env()
+    if args.db:
+        settings.database_url = args.db
+    args.settings = settings
+    db = create_database_manager(settings, check_placement=args.command != "reshard")
+    try:
+        args.func(db, args)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
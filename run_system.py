@@ -10,7 +10,7 @@ import asyncio
 import time
 import uuid
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Add project root to path
 project_root = Path(__file__).parent
@@ -40,7 +40,7 @@ def initialize_system():
     
     try:
         from config.settings import Settings
-        from core.database import DatabaseManager
+        from core.database import create_database_manager
         from utils.logger import setup_logger
         print("✅ Core modules imported successfully")
     except ImportError as e:
@@ -65,6 +65,9 @@ def initialize_system():
             async def save_crew_execution(self, session_id, topic, result, execution_time):
                 pass  # Simple placeholder
         
+        def create_database_manager(settings):
+            return DatabaseManager(settings.database_url)
+        
         def setup_logger(name, level):
             import logging
             logging.basicConfig(level=logging.INFO)
@@ -73,14 +76,50 @@ def initialize_system():
     # Initialize settings and components
     settings = Settings.from_env()
     logger = setup_logger("CrewAI", settings.log_level)
-    db_manager = DatabaseManager(settings.database_url)
+    db_manager = create_database_manager(settings)
+    
+    # Background pruning/archival (only runs when a retention limit is configured)
+    try:
+        from core.retention import RetentionManager
+        retention = RetentionManager.from_settings(db_manager, settings)
+        retention.start()
+    except Exception as e:
+        print(f"⚠️  Retention task not started: {e}")
+    
+    # Semantic recall of past findings (needs numpy)
+    try:
+        from core.vector_store import VectorStore
+        vector_store = VectorStore(settings.vector_store_path, dim=settings.vector_store_dim)
+    except Exception as e:
+        print(f"⚠️  Vector store unavailable: {e}")
+        vector_store = None
+    
+    # Record/replay of LLM calls, for reproducible runs without Ollama
+    llm_class = ChatOllama
+    try:
+        from core.replay import FixtureStore, replaying_chat_model
+        fixtures = FixtureStore.from_settings(settings)
+        if fixtures is not None:
+            llm_class = replaying_chat_model(ChatOllama, fixtures)
+            print(f"✅ LLM in {fixtures.mode} mode ({fixtures.root})")
+    except Exception as e:
+        print(f"⚠️  Record/replay disabled: {e}")
+    
+    # Forwards generated tokens to whichever crew run is streaming its output
+    callbacks = []
+    try:
+        from core.streaming import token_callback_handler
+        callbacks.append(token_callback_handler())
+    except Exception as e:
+        print(f"⚠️  Token streaming unavailable: {e}")
     
     # Initialize LLM
     try:
-        llm = ChatOllama(
+        llm = llm_class(
             model=settings.ollama_model,
             base_url=settings.ollama_base_url,
-            temperature=settings.temperature
+            temperature=settings.temperature,
+            callbacks=callbacks
         )
         print("✅ LLM initialized successfully")
     except Exception as e:
@@ -93,6 +132,7 @@ def initialize_system():
         'settings': settings,
         'logger': logger,
         'db_manager': db_manager,
+        'vector_store': vector_store,
         'llm': llm,
         'Agent': Agent,
         'Task': Task,
@@ -107,6 +147,7 @@ class SimpleCrewAISystem:
         self.settings = components['settings']
         self.logger = components['logger']
         self.db_manager = components['db_manager']
+        self.vector_store = components.get('vector_store')
         self.llm = components['llm']
         self.Agent = components['Agent']
         self.Task = components['Task']
@@ -116,9 +157,83 @@ class SimpleCrewAISystem:
         # Create uploads directory
         self.upload_dir = Path("uploads")
         self.upload_dir.mkdir(exist_ok=True)
+        
+        # Crew runs share one Ollama backend; at most max_concurrent_crews run at once
+        from core.job_scheduler import JobScheduler
+        self.scheduler = JobScheduler.from_settings(self.settings)
+        
+        # Per-session agent memories, appended to the database log after every run
+        self.memory_manager = None
+        try:
+            from core.memory_manager import PersistentMemoryManager
+            if hasattr(self.db_manager, 'append_agent_messages'):
+                self.memory_manager = PersistentMemoryManager.from_settings(
+                    self.db_manager, self.settings, vector_store=self.vector_store
+                )
+        except Exception as e:
+            print(f"⚠️  Agent memory unavailable: {e}")
+        
+        # Live web search for the research task; mock results are not worth the prompt space
+        self.tools_manager = None
+        try:
+            from core.tools_manager import ToolsManager
+            self.tools_manager = ToolsManager(self.settings)
+        except Exception as e:
+            print(f"⚠️  Web search unavailable: {e}")
+        
+        # Finished research keyed by normalized topic (needs the SQLite database manager)
+        self.research_cache = None
+        try:
+            from core.research_cache import ResearchCache
+            if hasattr(self.db_manager, 'get_research_entry'):
+                self.research_cache = ResearchCache.from_settings(self.db_manager, self.settings)
+        except Exception as e:
+            print(f"⚠️  Research cache unavailable: {e}")
+    
+    def _record_turn(self, session_id: str, agent_type: str, question: str, answer: str):
+        """Add one exchange to an agent's memory and persist it right away."""
+        if self.memory_manager is None:
+            return
+        try:
+            memory = self.memory_manager.get_agent_memory(session_id, agent_type)
+            if hasattr(memory, 'save_context'):
+                memory.save_context({"input": question}, {"output": answer})
+            else:
+                memory.add_message(question)
+                memory.add_message(answer)
+            self.memory_manager.persist_agent_memory(session_id, agent_type)
+        except Exception as e:
+            print(f"⚠️  Could not save agent memory: {e}")
+    
+    async def cached_research(self, topic: str, session_id: Optional[str] = None) -> Optional[str]:
+        """A cached result for this topic (or a near-duplicate of it), ready to show, else None.
+
+        A hit is recorded in the session's history and researcher memory like a fresh run.
+        """
+        if self.research_cache is None:
+            return None
+        try:
+            entry = await asyncio.to_thread(self.research_cache.get, topic)
+        except Exception as e:
+            print(f"⚠️  Research cache lookup failed: {e}")
+            return None
+        if entry is None:
+            return None
+        
+        if session_id:
+            try:
+                await self.db_manager.save_crew_execution(session_id, topic, entry['result'], 0.0)
+            except Exception as e:
+                print(f"⚠️  Could not save cached research to history: {e}")
+            await asyncio.to_thread(self._record_turn, session_id, "researcher", topic, entry['result'])
+        
+        age = int(time.time() - entry['created_at'])
+        age_text = f"{age // 3600}h {age % 3600 // 60}m" if age >= 3600 else f"{age // 60}m {age % 60}s"
+        source = f" (matched '{entry['topic']}')" if entry['match'] == 'near' else ""
+        return f"⚡ Cached research from {age_text} ago{source}. Tick 'Force refresh' for a new run.\n\n{entry['result']}"
     
-    async def create_research_crew(self, topic: str, session_id: str) -> str:
-        """Create and execute a research crew."""
+    async def create_research_crew(self, topic: str, session_id: str, stream=None) -> str:
+        """Create and execute a research crew, reporting progress to ``stream`` when given."""
         try:
             # Create research agent
             researcher = self.Agent(
@@ -142,6 +257,10 @@ class SimpleCrewAISystem:
                 llm=self.llm
             )
             
+            if stream:
+                stream.emit("status", f"🌐 Searching the web for {topic}...")
+            evidence = await self._search_evidence(topic)
+            
             # Create research task
             research_task = self.Task(
                 description=f"""Research comprehensive information about: {topic}
@@ -153,9 +272,10 @@ class SimpleCrewAISystem:
                 4. Market trends and adoption
                 5. Future implications and predictions
 
-                Include realistic source citations with URLs from major research institutions.""",
+                Include realistic source citations with URLs from major research institutions.{evidence}{self._recall_findings(topic, session_id)}""",
                 agent=researcher,
-                expected_output="Comprehensive research with detailed findings and realistic source citations"
+                expected_output="Comprehensive research with detailed findings and realistic source citations",
+                callback=stream.on_task_complete("Research", "✍️  Writing the article...") if stream else None
             )
             
             # Create writing task
@@ -164,7 +284,8 @@ class SimpleCrewAISystem:
                 Create a professional, well-structured article with proper citations.""",
                 agent=reporter,
                 expected_output="Professional article with complete source citations",
-                context=[research_task]
+                context=[research_task],
+                callback=stream.on_task_complete("Article") if stream else None
             )
             
             # Execute crew
@@ -175,7 +296,13 @@ class SimpleCrewAISystem:
                 verbose=True
             )
             
-            result = crew.kickoff()
+            if stream:
+                stream.emit("status", f"🔍 Researching {topic}...")
+            
+            # kickoff() blocks; run it on the crew executor so the event loop stays free
+            from core.streaming import use_stream
+            with use_stream(stream):
+                result = await self.scheduler.run_blocking(crew.kickoff)
             
             # Save to database
             try:
@@ -183,13 +310,55 @@ class SimpleCrewAISystem:
             except:
                 pass  # Continue even if save fails
             
+            if self.vector_store is not None:
+                try:
+                    from core.vector_store import split_into_chunks
+                    await asyncio.to_thread(
+                        self.vector_store.add, split_into_chunks(str(result)), session_id, {"topic": topic}
+                    )
+                except Exception as e:
+                    print(f"⚠️  Could not index findings: {e}")
+            
+            await asyncio.to_thread(self._record_turn, session_id, "researcher", topic, str(result))
+            
+            if self.research_cache is not None:
+                try:
+                    await asyncio.to_thread(self.research_cache.put, topic, str(result))
+                except Exception as e:
+                    print(f"⚠️  Could not cache research: {e}")
+            
             return str(result)
             
         except Exception as e:
             return f"Research Error: {str(e)}"
     
-    async def analyze_image(self, file_name: str, question: str, session_id: str) -> str:
-        """Analyze image with smart AI analysis."""
+    async def _search_evidence(self, topic: str) -> str:
+        """Prompt section with live search results for every aspect of the topic."""
+        if self.tools_manager is None or not self.tools_manager.has_real_search:
+            return ""
+        try:
+            evidence = await asyncio.to_thread(self.tools_manager.research_topic, topic)
+        except Exception as e:
+            print(f"⚠️  Web search failed: {e}")
+            return ""
+        return f"\n\n                Current web search results (cite these URLs where you use them):\n{evidence}"
+    
+    def _recall_findings(self, topic: str, session_id: str, k: int = 3) -> str:
+        """Prompt section with this session's past findings most relevant to the topic."""
+        if self.vector_store is None:
+            return ""
+        try:
+            hits = self.vector_store.search(topic, k=k, session_id=session_id, min_score=0.2)
+        except Exception as e:
+            print(f"⚠️  Recall failed: {e}")
+            return ""
+        if not hits:
+            return ""
+        findings = "\n\n".join(f"- {hit['text']}" for hit in hits)
+        return f"\n\n                Relevant findings from earlier research in this session (build on these, do not repeat them):\n{findings}"
+    
+    async def analyze_image(self, file_name: str, question: str, session_id: str, stream=None) -> str:
+        """Analyze image with smart AI analysis, reporting progress to ``stream`` when given."""
         try:
             # Get file extension
             file_extension = Path(file_name).suffix.lower()
@@ -265,7 +434,8 @@ class SimpleCrewAISystem:
 
                 Always be helpful, educational, and technically accurate.""",
                 agent=image_analyst,
-                expected_output="Detailed technical analysis with programming insights and practical explanations"
+                expected_output="Detailed technical analysis with programming insights and practical explanations",
+                callback=stream.on_task_complete("Analysis") if stream else None
             )
             
             # Execute analysis
@@ -276,7 +446,14 @@ class SimpleCrewAISystem:
                 verbose=True
             )
             
-            result = crew.kickoff()
+            if stream:
+                stream.emit("status", "🔍 Analyzing the image...")
+            
+            from core.streaming import use_stream
+            with use_stream(stream):
+                result = await self.scheduler.run_blocking(crew.kickoff)
+            
+            await asyncio.to_thread(self._record_turn, session_id, "image_analyst", question, str(result))
             return str(result)
             
         except Exception as e:
@@ -285,42 +462,49 @@ class SimpleCrewAISystem:
 def create_interface(system):
     """Create Gradio interface."""
     import gradio as gr
+    from core.job_scheduler import QueueFull
+    from core.streaming import StreamView, follow_job, submit_streaming
+    
+    async def run_streaming(kind, func, *args):
+        """Queue a crew run and stream its queue position, progress and output into the textbox."""
+        try:
+            job, stream = submit_streaming(system.scheduler, func, *args, kind=kind)
+        except QueueFull as e:
+            yield f"⚠️  {e}"
+            return
+        
+        view = StreamView()
+        async for batch in follow_job(system.scheduler, job, stream):
+            for event in batch:
+                view.apply(event)
+            yield view.render()
     
-    def handle_research(topic, session_id):
+    async def handle_research(topic, session_id, force_refresh=False):
         if not topic.strip():
-            return "Please enter a research topic."
+            yield "Please enter a research topic."
+            return
         
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                system.create_research_crew(topic, session_id)
-            )
-            loop.close()
-            return result
-        except Exception as e:
-            return f"Error: {str(e)}"
+        cached = None if force_refresh else await system.cached_research(topic, session_id)
+        if cached is not None:
+            yield cached
+            return
+        
+        async for update in run_streaming("research", system.create_research_crew, topic, session_id):
+            yield update
     
-    def handle_image_analysis(file, question, session_id):
+    async def handle_image_analysis(file, question, session_id):
         if not file:
-            return "Please upload an image file first."
+            yield "Please upload an image file first."
+            return
         
         if not question.strip():
-            return "Please enter a question about the image."
+            yield "Please enter a question about the image."
+            return
         
-        try:
-            # Use file name directly without complex file handling
-            file_name = file.name
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(
-                system.analyze_image(file_name, question, session_id)
-            )
-            loop.close()
-            return result
-        except Exception as e:
-            return f"Error: {str(e)}"
+        # Use file name directly without complex file handling
+        file_name = file.name
+        async for update in run_streaming("image", system.analyze_image, file_name, question, session_id):
+            yield update
     
     with gr.Blocks(title="CrewAI System") as interface:
         session_id = gr.State(value=lambda: str(uuid.uuid4()))
@@ -337,6 +521,12 @@ def create_interface(system):
                     lines=2
                 )
                 
+                force_refresh = gr.Checkbox(
+                    label="Force refresh",
+                    info="Run a new research crew even if this topic was researched recently",
+                    value=False
+                )
+                
                 research_btn = gr.Button("🚀 Start Research", variant="primary")
                 
                 research_output = gr.Textbox(
@@ -347,7 +537,7 @@ def create_interface(system):
                 
                 research_btn.click(
                     fn=handle_research,
-                    inputs=[topic_input, session_id],
+                    inputs=[topic_input, session_id, force_refresh],
                     outputs=[research_output],
                     show_progress=True
                 )
@@ -402,6 +592,47 @@ def create_interface(system):
     
     return interface
 
+def create_app(system, interface):
+    """Mount the Gradio UI next to a server-sent-events API for streaming research."""
+    import gradio as gr
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse, StreamingResponse
+    from core.job_scheduler import QueueFull
+    from core.streaming import follow_job, submit_streaming, to_sse
+    
+    app = FastAPI(title="CrewAI System API")
+    
+    @app.get("/api/research/stream")
+    async def research_stream(topic: str, session_id: Optional[str] = None, refresh: bool = False):
+        """Stream ``status``, ``task``, ``token`` and finally ``done`` (or ``error``) events.
+
+        A recently researched topic is answered with a single ``done`` event unless ``refresh`` is set.
+        """
+        if not topic.strip():
+            return JSONResponse({"error": "topic is required"}, status_code=400)
+        session_id = session_id or str(uuid.uuid4())
+        cached = None if refresh else await system.cached_research(topic, session_id)
+        if cached is not None:
+            return StreamingResponse(iter([to_sse(("done", cached))]), media_type="text/event-stream",
+                                     headers={"Cache-Control": "no-cache"})
+        try:
+            job, stream = submit_streaming(
+                system.scheduler, system.create_research_crew, topic, session_id, kind="research"
+            )
+        except QueueFull as e:
+            return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "60"})
+        
+        async def events():
+            # Cancelled by Starlette when the client disconnects, which drops a still-queued job
+            async for batch in follow_job(system.scheduler, job, stream):
+                for event in batch:
+                    yield to_sse(event)
+        
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    
+    return gr.mount_gradio_app(app, interface, path="/")
+
 def main():
     """Main entry point."""
     print("🚀 Starting CrewAI System...")
@@ -419,14 +650,15 @@ def main():
         print("✅ System initialized successfully!")
         print("🌐 Starting web interface...")
         print("📱 Open your browser to: http://localhost:7864")
+        print("📡 Streaming API: http://localhost:7864/api/research/stream?topic=...")
         print("🛑 Press Ctrl+C to stop")
         
-        # Launch interface
-        interface.launch(
-            server_name="0.0.0.0",
-            server_port=7864,
-            share=False
-        )
+        # Handlers mostly wait on the scheduler, so let every queued request hold a slot
+        interface.queue(default_concurrency_limit=system.scheduler.max_workers + system.scheduler.max_queue)
+        
+        # Serve the interface and the SSE API from one server
+        import uvicorn
+        uvicorn.run(create_app(system, interface), host="0.0.0.0", port=7864)
         
     except KeyboardInterrupt:
         print("\n👋 Shutting down...")
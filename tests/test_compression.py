@@ -0,0 +1,92 @@
+"""Compressed result storage and its precomputed previews."""
+
+import asyncio
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core import compression
+from core.compression import (CODEC_RAW, CODEC_ZLIB, CODEC_ZSTD, compress_text, decompress_text,
+                              make_preview, register_sql_functions, set_default_codec)
+from core.database import DatabaseManager
+
+LONG_TEXT = "Vector databases index embeddings for approximate nearest neighbour search. " * 40
+
+class CodecTest(unittest.TestCase):
+
+    def tearDown(self):
+        set_default_codec(CODEC_ZLIB)
+
+    def test_short_text_is_stored_raw(self):
+        self.assertEqual(compress_text("short"), (CODEC_RAW, "short"))
+        self.assertEqual(decompress_text(CODEC_RAW, "short"), "short")
+
+    def test_zlib_round_trip(self):
+        codec, payload = compress_text(LONG_TEXT)
+        self.assertEqual(codec, CODEC_ZLIB)
+        self.assertLess(len(payload), len(LONG_TEXT) // 4)
+        self.assertEqual(decompress_text(codec, payload), LONG_TEXT)
+
+    def test_zlib_is_default_even_with_zstandard_installed(self):
+        with mock.patch.object(compression, "zstandard", object()):
+            self.assertEqual(compress_text(LONG_TEXT)[0], CODEC_ZLIB)
+
+    def test_zstd_needs_the_package(self):
+        if compression.zstandard is not None:
+            set_default_codec(CODEC_ZSTD)
+            codec, payload = compress_text(LONG_TEXT)
+            self.assertEqual((codec, decompress_text(codec, payload)), (CODEC_ZSTD, LONG_TEXT))
+        else:
+            with self.assertRaises(ValueError):
+                set_default_codec(CODEC_ZSTD)
+            with self.assertRaises(RuntimeError):
+                decompress_text(CODEC_ZSTD, b"\x28\xb5\x2f\xfd")
+
+    def test_unknown_codec_is_rejected(self):
+        with self.assertRaises(ValueError):
+            set_default_codec("lz4")
+
+    def test_preview(self):
+        self.assertEqual(make_preview("abc", length=5), "abc")
+        self.assertEqual(make_preview("abcdefgh", length=5), "abcde...")
+
+    def test_sql_function(self):
+        conn = sqlite3.connect(":memory:")
+        register_sql_functions(conn)
+        codec, payload = compress_text(LONG_TEXT)
+        self.assertEqual(conn.execute("SELECT decompress_text(?, ?)", (codec, payload)).fetchone()[0], LONG_TEXT)
+        conn.close()
+
+class CompressedStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = DatabaseManager(str(Path(self.tmp) / "test.db"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_history_lists_previews_and_opens_full_bodies(self):
+        asyncio.run(self.db.save_crew_execution("s1", "vector databases", LONG_TEXT, 2.5))
+        asyncio.run(self.db.save_qa_interaction("s1", "what is ann?", LONG_TEXT))
+        self.db.flush(5)
+
+        with self.db.pool.reader() as conn:
+            codec, stored = conn.execute("SELECT result_codec, result FROM crew_executions").fetchone()
+        self.assertEqual(codec, CODEC_ZLIB)
+        self.assertLess(len(stored), len(LONG_TEXT))
+
+        history = self.db.get_session_history("s1")
+        execution, qa = history["executions"][0], history["qa_interactions"][0]
+        # Listings carry only the stored preview under the body's key
+        self.assertEqual(execution["result"], make_preview(LONG_TEXT))
+        self.assertEqual(qa["answer"], make_preview(LONG_TEXT))
+        self.assertEqual(self.db.get_execution_result(execution["id"])["result"], LONG_TEXT)
+        self.assertEqual(self.db.get_qa_interaction(qa["id"])["answer"], LONG_TEXT)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
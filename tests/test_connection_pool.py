@@ -0,0 +1,109 @@
+"""Pooled SQLite connections: WAL, reader reuse and transaction handling."""
+
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from core.database import ConnectionPool
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.pool = ConnectionPool(str(self.tmp / "pool.db"), reader_connections=2)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE items (value INTEGER)")
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_wal_mode(self):
+        self.assertEqual(self.pool.journal_mode, "wal")
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_writer_commits_and_rolls_back(self):
+        with self.pool.writer() as conn:
+            conn.execute("INSERT INTO items VALUES (1)")
+        with self.assertRaises(ValueError):
+            with self.pool.writer() as conn:
+                conn.execute("INSERT INTO items VALUES (2)")
+                raise ValueError("abort")
+
+        with self.pool.reader() as conn:
+            self.assertEqual(conn.execute("SELECT value FROM items").fetchall(), [(1,)])
+
+    def test_readers_are_read_only(self):
+        with self.pool.reader() as conn:
+            with self.assertRaises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO items VALUES (1)")
+
+    def test_reader_is_reused(self):
+        with self.pool.reader() as first:
+            pass
+        with self.pool.reader() as second:
+            self.assertIs(first, second)
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["readers_open"], 1)
+        self.assertEqual(stats["reader_acquisitions"], 2)
+
+    def test_readers_capped_at_pool_size(self):
+        entered = threading.Barrier(3)
+        release = threading.Event()
+
+        def hold():
+            with self.pool.reader():
+                entered.wait(5)
+                release.wait(5)
+
+        holders = [threading.Thread(target=hold) for _ in range(2)]
+        for thread in holders:
+            thread.start()
+        entered.wait(5)
+
+        def borrow():
+            with self.pool.reader():
+                pass
+
+        waiter = threading.Thread(target=borrow)
+        waiter.start()
+        deadline = time.monotonic() + 5
+        while not self.pool.get_stats()["reader_waits"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for thread in holders + [waiter]:
+            thread.join(5)
+
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["readers_open"], 2)
+        self.assertEqual(stats["reader_waits"], 1)
+        self.assertFalse(waiter.is_alive())
+
+    def test_reader_sees_committed_rows_only(self):
+        with self.pool.reader() as reader:
+            reader.execute("BEGIN")
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+            with self.pool.writer() as conn:
+                conn.execute("INSERT INTO items VALUES (1)")
+            # A read transaction keeps its snapshot while the writer commits
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM items").fetchone()[0], 0)
+            reader.execute("COMMIT")
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM items").fetchone()[0], 1)
+
+    def test_closed_pool_refuses_connections(self):
+        self.pool.close()
+        self.pool.close()
+        with self.assertRaises(RuntimeError):
+            with self.pool.reader():
+                pass
+        with self.assertRaises(RuntimeError):
+            with self.pool.writer():
+                pass
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
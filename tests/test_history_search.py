@@ -0,0 +1,88 @@
+"""Full-text search over stored executions and Q&A."""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.database import DatabaseManager
+
+class HistorySearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.db = DatabaseManager(str(self.tmp / "test.db"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _save(self, executions=(), qa=()):
+        async def save():
+            for session_id, topic, result in executions:
+                await self.db.save_crew_execution(session_id, topic, result, 1.0)
+            for session_id, question, answer in qa:
+                await self.db.save_qa_interaction(session_id, question, answer)
+        asyncio.run(save())
+        self.db.flush(5)
+
+    def _hits(self, query, **kwargs):
+        return [(r["kind"], r["id"], r["title"]) for r in self.db.search_history(query, **kwargs)["results"]]
+
+    def test_execution_and_qa_with_the_same_id_are_told_apart(self):
+        self._save(executions=[("s1", "Quantum chips", "Superconducting qubits " * 100)],
+                   qa=[("s1", "What is a qubit?", "A qubit is a quantum bit.")])
+
+        hits = self._hits("qubit")
+        self.assertEqual(sorted(hits), [("execution", 1, "Quantum chips"), ("qa", 1, "What is a qubit?")])
+
+    def test_title_match_ranks_first_and_snippet_is_highlighted(self):
+        self._save(executions=[("s1", "Battery chemistry", "Solid state cells and lithium supply."),
+                               ("s1", "Lithium mining", "Brine extraction in South America.")])
+
+        results = self.db.search_history("lithium")["results"]
+        self.assertEqual(results[0]["title"], "Lithium mining")
+        self.assertIn("**lithium**", results[1]["snippet"])
+
+    def test_session_filter_and_paging(self):
+        self._save(executions=[(f"s{i % 2}", f"Robotics {i}", "Humanoid robots") for i in range(5)])
+
+        self.assertEqual(len(self._hits("robots", session_id="s0")), 3)
+        first = self.db.search_history("robots", limit=2)
+        second = self.db.search_history("robots", limit=2, offset=2)
+        self.assertTrue(first["has_more"])
+        self.assertEqual(len({r["id"] for r in first["results"] + second["results"]}), 4)
+
+    def test_prefix_and_stemmed_terms(self):
+        self._save(qa=[("s1", "Energy storage", "Utilities are storing power in pumped hydro.")])
+
+        self.assertEqual(len(self._hits("stor")), 1)
+        self.assertEqual(len(self._hits("stored")), 1)
+        self.assertEqual(self.db.search_history("!!!")["results"], [])
+
+    def test_deleted_and_updated_rows_leave_the_index(self):
+        self._save(executions=[("s1", "Fusion", "Tokamak plasma confinement")],
+                   qa=[("s1", "Fusion timeline?", "Stellarator designs are decades away.")])
+
+        with self.db.pool.writer() as conn:
+            conn.execute("DELETE FROM qa_interactions WHERE id = 1")
+            conn.execute("UPDATE crew_executions SET topic = 'Fission' WHERE id = 1")
+
+        self.assertEqual(self._hits("stellarator"), [])
+        self.assertEqual(self._hits("fusion"), [])
+        self.assertEqual(self._hits("fission"), [("execution", 1, "Fission")])
+        self.assertEqual(self._hits("tokamak"), [("execution", 1, "Fission")])
+
+    def test_rebuild_restores_a_cleared_index(self):
+        self._save(executions=[("s1", "Gene editing", "CRISPR base editors")],
+                   qa=[("s1", "Delivery?", "Lipid nanoparticles carry CRISPR payloads.")])
+        with self.db.pool.writer() as conn:
+            conn.execute("INSERT INTO history_fts (history_fts) VALUES ('delete-all')")
+        self.assertEqual(self._hits("crispr"), [])
+
+        self.assertEqual(self.db.rebuild_search_index(), 2)
+        self.assertEqual(len(self._hits("crispr")), 2)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""Job scheduling on the submitting event loop."""
+
+import asyncio
+import threading
+import time
+import unittest
+
+from core.job_scheduler import JobScheduler, QueueFull
+
+class JobSchedulerTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.scheduler = JobScheduler(max_workers=1, max_queue=2)
+
+    def tearDown(self):
+        self.scheduler.executor.shutdown(wait=True)
+
+    async def test_coroutine_runs_on_the_submitting_loop(self):
+        async def job():
+            return asyncio.get_running_loop()
+
+        loop = await asyncio.wrap_future(self.scheduler.submit(job).future)
+        self.assertIs(loop, asyncio.get_running_loop())
+
+    async def test_blocking_work_runs_on_the_crew_executor(self):
+        def job():
+            return threading.current_thread().name
+
+        async def wrapper():
+            return await self.scheduler.run_blocking(job)
+
+        name = await asyncio.wrap_future(self.scheduler.submit(wrapper).future)
+        self.assertTrue(name.startswith("crew-worker"))
+
+    async def test_one_worker_runs_jobs_in_turn(self):
+        running = []
+
+        async def job(index):
+            running.append(index)
+            self.assertEqual(self.scheduler.get_stats()["running"], 1)
+            await asyncio.sleep(0.01)
+            return index
+
+        jobs = [self.scheduler.submit(job, i) for i in range(3)]
+        results = [await asyncio.wrap_future(j.future) for j in jobs]
+        self.assertEqual(results, [0, 1, 2])
+        self.assertEqual(running, [0, 1, 2])
+
+    async def test_full_queue_is_refused(self):
+        async def job():
+            await asyncio.sleep(0.05)
+
+        jobs = [self.scheduler.submit(job) for _ in range(3)]
+        with self.assertRaises(QueueFull):
+            self.scheduler.submit(job)
+        for j in jobs:
+            await asyncio.wrap_future(j.future)
+
+    async def test_cancelled_job_resolves_and_frees_its_slot(self):
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        async def ok():
+            return "done"
+
+        first = self.scheduler.submit(cancelled)
+        second = self.scheduler.submit(ok)
+        with self.assertRaises(BaseException):
+            await asyncio.wrap_future(first.future)
+        self.assertEqual(await asyncio.wrap_future(second.future), "done")
+        started = time.monotonic()
+        while self.scheduler.get_stats()["running"] and time.monotonic() - started < 1:
+            await asyncio.sleep(0.01)
+        stats = self.scheduler.get_stats()
+        self.assertEqual((stats["running"], stats["cancelled"], stats["completed"]), (0, 1, 1))
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Lookup and eviction bookkeeping of the agent memory cache."""
+
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core import memory_manager
+from core.database import DatabaseManager
+from core.memory_manager import PersistentMemoryManager
+
+def _add_turn(memory, question, answer):
+    if hasattr(memory, "save_context"):
+        memory.save_context({"input": question}, {"output": answer})
+    else:
+        memory.add_message(question)
+        memory.add_message(answer)
+
+class MemoryCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = DatabaseManager(str(Path(self.tmp) / "test.db"))
+        self.manager = PersistentMemoryManager(self.db, max_entries=2)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_hit_does_not_measure_memory(self):
+        self.manager.get_agent_memory("s1", "researcher")
+        with mock.patch.object(memory_manager, "estimate_memory_bytes",
+                               wraps=memory_manager.estimate_memory_bytes) as measure:
+            for _ in range(5):
+                self.manager.get_agent_memory("s1", "researcher")
+            self.assertEqual(measure.call_count, 0)
+        self.assertEqual(self.manager.get_cache_stats()["hits"], 5)
+
+    def test_persist_updates_byte_total(self):
+        memory = self.manager.get_agent_memory("s1", "researcher")
+        before = self.manager.get_cache_stats()["approx_bytes"]
+        _add_turn(memory, "question " * 50, "answer " * 50)
+        self.assertEqual(self.manager.get_cache_stats()["approx_bytes"], before)
+
+        self.manager.persist_agent_memory("s1", "researcher")
+        self.assertGreater(self.manager.get_cache_stats()["approx_bytes"], before)
+        self.assertEqual(len(self.db.get_agent_messages("s1", "researcher")), 2)
+
+    def test_least_recently_used_is_evicted(self):
+        first = self.manager.get_agent_memory("s1", "researcher")
+        self.manager.get_agent_memory("s2", "researcher")
+        time.sleep(0.01)
+        # Touching s1 makes s2 the oldest
+        self.assertIs(self.manager.get_agent_memory("s1", "researcher"), first)
+        self.manager.get_agent_memory("s3", "researcher")
+
+        stats = self.manager.get_cache_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions_lru"], 1)
+        self.assertIs(self.manager.get_agent_memory("s1", "researcher"), first)
+        self.assertNotIn("s2", self.manager._sessions)
+
+    def test_evicted_memory_reloads_from_log(self):
+        memory = self.manager.get_agent_memory("s1", "researcher")
+        _add_turn(memory, "what is rag", "retrieval augmented generation")
+        self.manager.evict_session("s1")
+
+        reloaded = self.manager.get_agent_memory("s1", "researcher")
+        self.assertIsNot(reloaded, memory)
+        self.assertEqual(len(memory_manager.message_list(reloaded)), 2)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""Schema migrations from an old database and the agent memory upsert."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.database import ConnectionPool, DatabaseManager
+from core.migrations import MIGRATIONS, apply_migrations, get_schema_version, latest_version
+
+class MigrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _pool(self, name="test.db"):
+        pool = ConnectionPool(str(self.tmp / name), reader_connections=1)
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_new_database_is_at_latest_version(self):
+        pool = self._pool()
+        self.assertEqual(apply_migrations(pool), [version for version, _, _ in MIGRATIONS])
+        with pool.reader() as conn:
+            self.assertEqual(get_schema_version(conn), latest_version())
+        # Already up to date: nothing runs twice
+        self.assertEqual(apply_migrations(pool), [])
+
+    def test_version_one_database_is_upgraded_in_place(self):
+        pool = self._pool()
+        version, _, create_base_tables = MIGRATIONS[0]
+        with pool.writer() as conn:
+            create_base_tables(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.executemany(
+                "INSERT INTO agent_memories (session_id, agent_type, memory_data, updated_at) VALUES (?, ?, ?, ?)",
+                [("s1", "researcher", "old", "2024-01-01 10:00:00"),
+                 ("s1", "researcher", "new", "2024-01-02 10:00:00"),
+                 ("s1", "reporter", "only", "2024-01-01 10:00:00")]
+            )
+            conn.execute(
+                "INSERT INTO crew_executions (session_id, topic, result, timestamp) "
+                "VALUES ('s1', 'topic', 'kept result', '2024-01-01 10:00:00')"
+            )
+
+        self.assertEqual(apply_migrations(pool)[0], 2)
+        with pool.reader() as conn:
+            memories = conn.execute(
+                "SELECT agent_type, memory_data FROM agent_memories ORDER BY agent_type"
+            ).fetchall()
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list(crew_executions)")}
+        # Duplicate rows collapse to the newest one per agent
+        self.assertEqual([tuple(row) for row in memories], [("reporter", "only"), ("researcher", "new")])
+        self.assertIn("idx_crew_executions_session_ts", indexes)
+
+        db = DatabaseManager(str(self.tmp / "test.db"))
+        self.addCleanup(db.close)
+        self.assertEqual(db.get_schema_version(), latest_version())
+        history = db.get_session_history("s1")
+        self.assertEqual(history["total_executions"], 1)
+        self.assertEqual(db.get_execution_result(history["executions"][0]["id"])["result"], "kept result")
+
+    def test_agent_memory_upsert_keeps_one_row(self):
+        db = DatabaseManager(str(self.tmp / "test.db"))
+        self.addCleanup(db.close)
+        for data in ("first", "second", "third"):
+            db.save_agent_memory_sync("s1", "researcher", data)
+
+        self.assertEqual(db.get_agent_memory("s1", "researcher"), "third")
+        with db.pool.reader() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM agent_memories").fetchone()[0]
+        self.assertEqual(count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
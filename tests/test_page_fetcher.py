@@ -0,0 +1,193 @@
+"""Page fetching against a local fixture server.
+
+The fixture host is loopback, so the fetchers here allow loopback; every
+other private range stays blocked.
+"""
+
+import socket
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+from core.page_fetcher import PageFetcher
+
+_PARAGRAPH = "<p>" + "Retrieval augmented generation grounds answers in fetched documents. " * 4 + "</p>\n"
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        cls = type(self)
+        path, query = urlsplit(self.path).path, parse_qs(urlsplit(self.path).query)
+        cls.requests_seen.append((path, self.headers.get("If-None-Match")))
+
+        if path == "/page":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304, headers={"ETag": '"v1"'})
+            else:
+                body = ("<html><body><nav>Menu</nav>" + _PARAGRAPH + "</body></html>").encode()
+                self._send(200, body, {"Content-Type": "text/html; charset=utf-8", "ETag": '"v1"'})
+        elif path == "/big":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            chunk = _PARAGRAPH.encode() * 40
+            try:
+                for _ in range(200):
+                    self.wfile.write(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        elif path == "/slow":
+            with cls.lock:
+                cls.active += 1
+                cls.max_active = max(cls.max_active, cls.active)
+            time.sleep(0.2)
+            with cls.lock:
+                cls.active -= 1
+            self._send(200, _PARAGRAPH.encode(), {"Content-Type": "text/html"})
+        elif path == "/redirect":
+            self._send(302, headers={"Location": query["to"][0]})
+        elif path == "/loop":
+            self._send(302, headers={"Location": "/loop"})
+        else:
+            self._send(404)
+
+class _Resolver:
+    """Stand-in DNS for made-up host names; anything else resolves normally."""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.lookups = []
+        self._real = socket.getaddrinfo
+
+    def __call__(self, host, port, *args, **kwargs):
+        if host in self.answers:
+            self.lookups.append(host)
+            addresses = self.answers[host]
+            address = addresses[min(len(self.lookups), len(addresses)) - 1]
+            return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, "", (address, port))]
+        return self._real(host, port, *args, **kwargs)
+
+class PageFetcherTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.port = cls.server.server_port
+        cls.base = f"http://127.0.0.1:{cls.port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _FixtureHandler.requests_seen = []
+        _FixtureHandler.active = _FixtureHandler.max_active = 0
+        self.fetchers = []
+
+    def tearDown(self):
+        for fetcher in self.fetchers:
+            fetcher.close()
+
+    def _fetcher(self, **options):
+        options.setdefault("allow_loopback", True)
+        fetcher = PageFetcher(**options)
+        self.fetchers.append(fetcher)
+        return fetcher
+
+    def test_extracts_text_and_revalidates_with_etag(self):
+        fetcher = self._fetcher(fresh_seconds=0)
+        url = self.base + "/page"
+
+        first = fetcher.fetch_many([url])[url]
+        self.assertIn("Retrieval augmented generation", first)
+        self.assertNotIn("Menu", first)
+
+        self.assertEqual(fetcher.fetch_many([url])[url], first)
+        self.assertEqual(_FixtureHandler.requests_seen, [("/page", None), ("/page", '"v1"')])
+        stats = fetcher.get_stats()
+        self.assertEqual((stats["fetched"], stats["not_modified"]), (1, 1))
+
+    def test_loopback_blocked_unless_allowed(self):
+        fetcher = self._fetcher(allow_loopback=False)
+        self.assertEqual(fetcher.fetch_many([self.base + "/page"]), {})
+        self.assertEqual(fetcher.get_stats()["blocked"], 1)
+        self.assertEqual(_FixtureHandler.requests_seen, [])
+
+    def test_redirect_to_private_address_is_blocked(self):
+        fetcher = self._fetcher()
+        for target in ("http://10.0.0.1/admin", "http://169.254.169.254/latest/meta-data/"):
+            self.assertEqual(fetcher.fetch_many([f"{self.base}/redirect?to={target}"]), {})
+        self.assertEqual(fetcher.get_stats()["blocked"], 2)
+
+    def test_redirect_loop_is_cut_short(self):
+        fetcher = self._fetcher(max_redirects=3)
+        self.assertEqual(fetcher.fetch_many([self.base + "/loop"]), {})
+        self.assertEqual(len(_FixtureHandler.requests_seen), 4)
+        self.assertEqual(fetcher.get_stats()["blocked"], 1)
+
+    def test_download_stops_at_byte_cap(self):
+        fetcher = self._fetcher(max_bytes=65536, excerpt_tokens=100000)
+        url = self.base + "/big"
+        self.assertIn(url, fetcher.fetch_many([url]))
+        stats = fetcher.get_stats()
+        self.assertEqual(stats["cut_off"], 1)
+        self.assertLess(stats["bytes_read"], 65536 + 16384 + 1)
+
+    def test_download_stops_once_excerpt_is_full(self):
+        fetcher = self._fetcher(excerpt_tokens=50)
+        url = self.base + "/big"
+        fetcher.fetch_many([url])
+        stats = fetcher.get_stats()
+        self.assertEqual(stats["cut_off"], 1)
+        self.assertLessEqual(stats["bytes_read"], 16384)
+
+    def test_per_host_limit(self):
+        fetcher = self._fetcher(per_host=1, deadline=5)
+        urls = [f"{self.base}/slow?page={i}" for i in range(3)]
+        self.assertEqual(len(fetcher.fetch_many(urls)), 3)
+        self.assertEqual(_FixtureHandler.max_active, 1)
+
+    def test_redirect_target_takes_its_own_host_slot(self):
+        resolver = _Resolver({"other.test": ["127.0.0.1"]})
+        fetcher = self._fetcher(per_host=1, deadline=5)
+        urls = [
+            f"http://other.test:{self.port}/redirect?to={self.base}/slow?page=a",
+            f"{self.base}/slow?page=b",
+        ]
+        with mock.patch("socket.getaddrinfo", resolver):
+            self.assertEqual(len(fetcher.fetch_many(urls)), 2)
+        self.assertEqual(_FixtureHandler.max_active, 1)
+
+    def test_connection_is_pinned_to_the_checked_address(self):
+        # The name answers loopback for the check, then an unroutable address:
+        # a second lookup at connect time would fail the fetch
+        resolver = _Resolver({"rebind.test": ["127.0.0.1", "10.255.255.1"]})
+        fetcher = self._fetcher(timeout=1)
+        url = f"http://rebind.test:{self.port}/page"
+        with mock.patch("socket.getaddrinfo", resolver):
+            self.assertIn(url, fetcher.fetch_many([url]))
+        self.assertEqual(resolver.lookups, ["rebind.test"])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Topic-level research cache: exact, near-duplicate and expired lookups."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core.database import DatabaseManager
+from core.research_cache import ResearchCache, jaccard, normalize_topic
+
+class _Clock:
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+class ResearchCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.db = DatabaseManager(str(self.tmp / "test.db"))
+        self.clock = _Clock()
+        patcher = mock.patch("core.research_cache.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResearchCache(self.db, ttl_seconds=3600, similarity=0.7)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_normalized_topic_ignores_order_case_and_stop_words(self):
+        self.assertEqual(normalize_topic("LLM latest developments"), "development latest llm")
+        self.assertEqual(normalize_topic("What are the latest developments in LLMs?"), "development latest llm")
+        self.assertEqual(normalize_topic("the of and"), "")
+
+    def test_exact_hit(self):
+        self.cache.put("Latest developments in LLMs", "result " * 200)
+        entry = self.cache.get("llm latest developments")
+
+        self.assertEqual((entry["match"], entry["similarity"]), ("exact", 1.0))
+        self.assertEqual(entry["topic"], "Latest developments in LLMs")
+        self.assertEqual(entry["result"], "result " * 200)
+
+    def test_near_duplicate_hit(self):
+        stored = "quantum computing error correction breakthroughs"
+        query = "breakthroughs in quantum computing error correction 2024"
+        self.cache.put(stored, "findings")
+        self.assertGreaterEqual(jaccard(normalize_topic(stored), normalize_topic(query)), 0.7)
+
+        entry = self.cache.get(query)
+        self.assertEqual((entry["match"], entry["topic"], entry["result"]), ("near", stored, "findings"))
+        self.assertLess(entry["similarity"], 1.0)
+
+    def test_unrelated_or_disabled_near_match_misses(self):
+        self.cache.put("quantum computing error correction breakthroughs", "findings")
+
+        self.assertIsNone(self.cache.get("quantum computing market size"))
+        strict = ResearchCache(self.db, near_duplicates=False)
+        self.assertIsNone(strict.get("breakthroughs in quantum computing error correction 2024"))
+        self.assertEqual(self.cache.get_stats()["misses"], 1)
+
+    def test_expired_entry_misses_and_is_purged(self):
+        self.cache.put("solid state batteries", "old findings")
+        self.clock.now += 3601
+
+        self.assertIsNone(self.cache.get("solid state batteries"))
+        self.assertIsNone(self.cache.get("solid state battery roadmap"))
+        # The next store sweeps out everything already expired
+        self.cache.put("fusion energy", "new findings")
+        self.assertIsNone(self.db.get_research_entry(normalize_topic("solid state batteries")))
+
+    def test_max_age_and_per_entry_ttl(self):
+        self.cache.put("solid state batteries", "findings", ttl_seconds=60)
+        self.clock.now += 30
+
+        self.assertIsNone(self.cache.get("solid state batteries", max_age=10))
+        self.assertIsNotNone(self.cache.get("solid state batteries"))
+        self.clock.now += 31
+        self.assertIsNone(self.cache.get("solid state batteries"))
+
+    def test_put_replaces_and_invalidate_removes(self):
+        self.cache.put("fusion energy", "first")
+        self.cache.put("Fusion energy", "second")
+        self.assertEqual(self.cache.get("fusion energy")["result"], "second")
+
+        self.assertTrue(self.cache.invalidate("energy fusion"))
+        self.assertIsNone(self.cache.get("fusion energy"))
+        self.assertFalse(self.cache.invalidate("fusion energy"))
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
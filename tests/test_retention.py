@@ -0,0 +1,85 @@
+"""Retention pruning, cold archival and archive queries."""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from core.database import DatabaseManager
+from core.retention import ARCHIVED_TABLES, RetentionManager, RetentionPolicy
+
+class RetentionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.db = DatabaseManager(str(self.tmp / "test.db"))
+        self.archive = self.tmp / "archive"
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _save_executions(self, session_id, count, days_ago=0):
+        async def save():
+            for i in range(count):
+                moment = datetime.now(timezone.utc) - timedelta(days=days_ago, minutes=count - i)
+                await self.db.save_crew_execution(session_id, f"topic {i}", f"result {i} " * 50, 1.0, moment)
+        asyncio.run(save())
+        self.db.flush(5)
+
+    def _manager(self, *policies, batch_size=2):
+        return RetentionManager(self.db, list(policies), archive_dir=str(self.archive), batch_size=batch_size)
+
+    def test_age_limit_archives_then_deletes(self):
+        self._save_executions("old", 5, days_ago=40)
+        self._save_executions("new", 2)
+
+        result = self._manager(RetentionPolicy("crew_executions", max_age_days=30)).run_once()
+        self.assertEqual(result["deleted"]["crew_executions"], 5)
+        self.assertEqual(self.db.get_session_totals("new"), {"executions": 2, "qa": 0})
+
+        archived = list(self._manager().query_archive("crew_executions", session_id="old"))
+        self.assertEqual(len(archived), 5)
+        # Archived bodies are decompressed
+        self.assertEqual(archived[0]["result"], "result 0 " * 50)
+
+    def test_session_cap_keeps_newest_rows(self):
+        self._save_executions("s1", 7)
+        self._manager(RetentionPolicy("crew_executions", max_rows_per_session=3)).run_once()
+
+        history = self.db.get_session_history("s1", limit=10)
+        self.assertEqual([item["topic"] for item in history["executions"]], ["topic 6", "topic 5", "topic 4"])
+        self.assertEqual(history["total_executions"], 3)
+
+    def test_emptied_session_drops_its_counter(self):
+        self._save_executions("gone", 2, days_ago=40)
+        self._manager(RetentionPolicy("crew_executions", max_age_days=30)).run_once()
+        with self.db.pool.reader() as conn:
+            rows = conn.execute("SELECT * FROM session_counters WHERE session_id = 'gone'").fetchall()
+        self.assertEqual(rows, [])
+
+    def test_archive_query_filters(self):
+        self._save_executions("a", 2, days_ago=40)
+        self._save_executions("b", 1, days_ago=40)
+        self._manager(RetentionPolicy("crew_executions", max_age_days=30)).run_once()
+        manager = self._manager()
+
+        self.assertEqual(len(list(manager.query_archive("crew_executions"))), 3)
+        self.assertEqual(len(list(manager.query_archive("crew_executions", contains="TOPIC 1"))), 1)
+        future = (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y-%m-%d")
+        self.assertEqual(list(manager.query_archive("crew_executions", start_date=future)), [])
+
+    def test_memory_log_is_pruned_and_queryable(self):
+        self.assertIn("agent_memory_messages", ARCHIVED_TABLES)
+        self.db.append_agent_messages("s1", "researcher", [(0, "human", "hello"), (1, "ai", "hi")])
+        with self.db.pool.writer() as conn:
+            conn.execute("UPDATE agent_memory_messages SET created_at = '2000-01-01 00:00:00.000000'")
+
+        self._manager(RetentionPolicy("agent_memory_messages", max_age_days=30)).run_once()
+        self.assertEqual(self.db.get_agent_messages("s1", "researcher"), [])
+        self.assertEqual(len(list(self._manager().query_archive("agent_memory_messages", session_id="s1"))), 2)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
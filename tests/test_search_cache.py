@@ -0,0 +1,157 @@
+"""Two-tier search cache: TTLs, stale-while-revalidate and disk pruning."""
+
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from core.search_cache import SearchCache, normalize_query, parse_provider_ttls
+
+class _Clock:
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+class _Fetch:
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+class SearchCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.clock = _Clock()
+        patcher = mock.patch("core.search_cache.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _cache(self, **kwargs):
+        options = {"default_ttl": 100, "stale_seconds": 1000}
+        options.update(kwargs)
+        cache = SearchCache(str(self.tmp / "cache.db"), **options)
+        self.addCleanup(cache.close)
+        return cache
+
+    def _wait_for(self, cache, key, value):
+        deadline = time.monotonic() + 5
+        while cache.get_stats()[key] < value and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_query_normalization_and_ttl_parsing(self):
+        self.assertEqual(normalize_query("  Solar   Power? "), "solar power")
+        self.assertEqual(parse_provider_ttls("serper=60, tavily=x,brave=30"), {"serper": 60.0, "brave": 30.0})
+
+    def test_fresh_entry_is_served_from_memory(self):
+        cache = self._cache()
+        fetch = _Fetch([{"title": "a"}])
+        cache.get_or_fetch("serper", "Solar power", fetch)
+        self.clock.now += 99
+        self.assertEqual(cache.get_or_fetch("serper", "solar  POWER?", fetch), [{"title": "a"}])
+
+        self.assertEqual(fetch.calls, 1)
+        stats = cache.get_stats()
+        self.assertEqual((stats["memory_hits"], stats["misses"]), (1, 1))
+
+    def test_disk_tier_survives_a_restart(self):
+        self._cache().get_or_fetch("serper", "q", _Fetch([{"title": "a"}]))
+        reopened = self._cache()
+        fetch = _Fetch([])
+
+        self.assertEqual(reopened.get_or_fetch("serper", "q", fetch), [{"title": "a"}])
+        self.assertEqual(fetch.calls, 0)
+        self.assertEqual(reopened.get_stats()["disk_hits"], 1)
+
+    def test_provider_ttl_overrides_default(self):
+        cache = self._cache(provider_ttls={"tavily": 10}, stale_seconds=0)
+        fetch = _Fetch([{"title": "a"}])
+        cache.get_or_fetch("tavily", "q", fetch)
+        cache.get_or_fetch("serper", "q", fetch)
+        self.clock.now += 50
+
+        cache.get_or_fetch("tavily", "q", fetch)
+        cache.get_or_fetch("serper", "q", fetch)
+        self.assertEqual(fetch.calls, 3)
+
+    def test_stale_hit_is_served_while_one_refresh_runs(self):
+        cache = self._cache()
+        cache.get_or_fetch("serper", "q", _Fetch([{"title": "old"}]))
+        self.clock.now += 500
+
+        release = threading.Event()
+        refreshed = []
+
+        def slow_fetch():
+            release.wait(5)
+            refreshed.append(1)
+            return [{"title": "new"}]
+
+        self.assertEqual(cache.get_or_fetch("serper", "q", slow_fetch), [{"title": "old"}])
+        self.assertEqual(cache.get_or_fetch("serper", "q", slow_fetch), [{"title": "old"}])
+        release.set()
+        self._wait_for(cache, "refreshes", 1)
+
+        self.assertEqual(len(refreshed), 1)
+        self.assertEqual(cache.get_or_fetch("serper", "q", slow_fetch), [{"title": "new"}])
+        self.assertEqual(cache.get_stats()["stale_hits"], 2)
+
+    def test_failed_refresh_keeps_the_stale_copy(self):
+        cache = self._cache()
+        cache.get_or_fetch("serper", "q", _Fetch([{"title": "old"}]))
+        self.clock.now += 500
+        fetch = _Fetch(RuntimeError("provider down"))
+
+        cache.get_or_fetch("serper", "q", fetch)
+        self._wait_for(cache, "refresh_errors", 1)
+        self.assertEqual(cache.get_or_fetch("serper", "q", fetch), [{"title": "old"}])
+
+    def test_expired_entry_is_refetched_or_stands_in_for_an_error(self):
+        cache = self._cache()
+        cache.get_or_fetch("serper", "q", _Fetch([{"title": "old"}]))
+        self.clock.now += 5000
+
+        self.assertEqual(cache.get_or_fetch("serper", "q", _Fetch(RuntimeError("down"))), [{"title": "old"}])
+        self.assertEqual(cache.get_stats()["stale_on_error"], 1)
+        self.assertEqual(cache.get_or_fetch("serper", "q", _Fetch([{"title": "new"}])), [{"title": "new"}])
+        with self.assertRaises(RuntimeError):
+            cache.get_or_fetch("serper", "other", _Fetch(RuntimeError("down")))
+
+    def test_memory_tier_is_bounded(self):
+        cache = self._cache(max_entries=2)
+        for query in ("a", "b", "c"):
+            cache.get_or_fetch("serper", query, _Fetch([{"title": query}]))
+
+        stats = cache.get_stats()
+        self.assertEqual((stats["memory_entries"], stats["disk_entries"]), (2, 3))
+
+    def test_disk_tier_is_pruned(self):
+        cache = self._cache(max_disk_entries=3)
+        for i in range(5):
+            cache.get_or_fetch("serper", f"q{i}", _Fetch([{"title": i}]))
+            self.clock.now += 10
+
+        self.assertEqual(cache.trim_to_limit(), 2)
+        self.clock.now += 1075
+        # q2 expired more than stale_seconds ago; q3 and q4 are still within the window
+        self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(cache.get_stats()["disk_entries"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
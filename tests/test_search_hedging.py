@@ -0,0 +1,59 @@
+"""Hedged fan-out of MultiProviderSearchTool against providers with fixed delays."""
+
+import time
+import unittest
+
+from core.tools_manager import MultiProviderSearchTool, SearchTool, results_from_provider
+
+class _DelayedTool(SearchTool):
+
+    def __init__(self, provider, delay):
+        super().__init__()
+        self.provider = provider
+        self.delay = delay
+        self.calls = 0
+
+    def _search(self, query):
+        self.calls += 1
+        time.sleep(self.delay)
+        return results_from_provider(self.provider, [
+            {"title": f"{self.provider} result", "url": f"https://{self.provider}.example/{query}", "snippet": query}
+        ])
+
+class SearchHedgingTest(unittest.TestCase):
+
+    def _multi(self, providers, **kwargs):
+        multi = MultiProviderSearchTool(providers, default_hedge_delay=0.1, **kwargs)
+        self.addCleanup(multi.close)
+        return multi
+
+    def test_default_fanout_starts_one_provider(self):
+        multi = self._multi([_DelayedTool("a", 0), _DelayedTool("b", 0)])
+        self.assertEqual(multi.fanout, 1)
+
+    def test_slow_provider_is_hedged(self):
+        slow, fast = _DelayedTool("slow", 1.0), _DelayedTool("fast", 0)
+        multi = self._multi([slow, fast], quorum=1)
+        started = time.perf_counter()
+        results = multi._search("q")
+        elapsed = time.perf_counter() - started
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual([r.provider for r in results], ["fast"])
+        self.assertEqual(multi.get_stats()["hedges"], 1)
+
+    def test_fast_provider_needs_no_hedge(self):
+        fast, backup = _DelayedTool("fast", 0), _DelayedTool("backup", 0)
+        multi = self._multi([fast, backup], quorum=1)
+        multi._search("q")
+        self.assertEqual(backup.calls, 0)
+        self.assertEqual(multi.get_stats()["hedges"], 0)
+
+    def test_zero_fanout_starts_every_provider(self):
+        a, b = _DelayedTool("a", 0), _DelayedTool("b", 0)
+        multi = self._multi([a, b], quorum=2, fanout=0)
+        multi._search("q")
+        self.assertEqual((a.calls, b.calls), (1, 1))
+        self.assertEqual(multi.get_stats()["hedges"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""Failure behaviour of a search provider against a local stub server.
+
+Each test checks how long a failing call takes and how often the server
+was actually hit, so hidden retries or sleeps show up.
+"""
+
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from core.resilience import AdaptiveTimeout, CircuitBreaker, ProviderUnavailable
+from core.tools_manager import SearchTool
+
+class _StubHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self):
+        type(self).hits += 1
+        if self.path.startswith("/429"):
+            self.send_response(429)
+            self.send_header("Retry-After", "2")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path.startswith("/503"):
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path.startswith("/slow"):
+            time.sleep(1.0)
+        else:
+            body = b'{"results": []}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+class _StubTool(SearchTool):
+    provider = "stub"
+
+    def _search(self, query):
+        return []
+
+class SearchResilienceTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _StubHandler.hits = 0
+        self.tool = _StubTool()
+        self.tool.breaker = CircuitBreaker(failure_threshold=3, cooldown=30.0)
+        self.tool.timeouts = AdaptiveTimeout(min_timeout=0.3, max_timeout=0.3)
+        self.tool.backoff_factor = 0.01
+
+    def _timed(self, method, path):
+        started = time.perf_counter()
+        try:
+            self.tool._request_json(method, self.base + path)
+            error = None
+        except Exception as e:
+            error = e
+        return error, time.perf_counter() - started
+
+    def test_429_fails_fast_and_opens_breaker(self):
+        error, elapsed = self._timed("GET", "/429")
+        self.assertIsInstance(error, ProviderUnavailable)
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(_StubHandler.hits, 1)
+
+        error, elapsed = self._timed("GET", "/429")
+        self.assertIsInstance(error, ProviderUnavailable)
+        self.assertLess(elapsed, 0.05)
+        self.assertEqual(_StubHandler.hits, 1)
+
+    def test_timed_out_post_is_not_resent(self):
+        error, elapsed = self._timed("POST", "/slow")
+        self.assertIsInstance(error, requests.Timeout)
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(_StubHandler.hits, 1)
+
+    def test_server_errors_count_once_each(self):
+        for _ in range(3):
+            error, _ = self._timed("GET", "/503")
+            self.assertIsInstance(error, requests.HTTPError)
+        self.assertEqual(_StubHandler.hits, 3)
+        self.assertEqual(self.tool.breaker.state, CircuitBreaker.OPEN)
+
+        error, elapsed = self._timed("GET", "/503")
+        self.assertIsInstance(error, ProviderUnavailable)
+        self.assertLess(elapsed, 0.05)
+        self.assertEqual(_StubHandler.hits, 3)
+
+    def test_connection_refused_retries_within_one_timeout(self):
+        self.tool.breaker = CircuitBreaker(failure_threshold=10)
+        started = time.perf_counter()
+        with self.assertRaises(requests.ConnectionError):
+            self.tool._request_json("GET", "http://127.0.0.1:1/")
+        self.assertLess(time.perf_counter() - started, 0.5)
+        # Every attempt is visible to the breaker
+        self.assertEqual(self.tool.breaker.get_stats()["consecutive_failures"], 1 + self.tool.max_retries)
+
+    def test_success_closes_normally(self):
+        error, _ = self._timed("GET", "/ok")
+        self.assertIsNone(error)
+        self.assertEqual(_StubHandler.hits, 1)
+        self.assertEqual(self.tool.breaker.state, CircuitBreaker.CLOSED)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Keyset pagination of session history and the maintained session counters."""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from core.database import DatabaseManager
+
+class SessionHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.db = DatabaseManager(str(self.tmp / "test.db"))
+        self.start = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _save_executions(self, session_id, minutes):
+        async def save():
+            for minute in minutes:
+                moment = self.start + timedelta(minutes=minute)
+                await self.db.save_crew_execution(session_id, f"topic {minute}", "result", 1.0, moment)
+        asyncio.run(save())
+        self.db.flush(5)
+
+    def _all_pages(self, session_id, limit):
+        pages, cursor = [], None
+        while True:
+            history = self.db.get_session_history(session_id, limit=limit, execution_cursor=cursor)
+            pages.append([item["id"] for item in history["executions"]])
+            cursor = history["next_execution_cursor"]
+            if cursor is None:
+                return pages
+
+    def test_pages_are_newest_first_without_gaps(self):
+        # Two rows share each timestamp, so the id breaks ties
+        self._save_executions("s1", [0, 0, 1, 1, 2, 2, 3])
+
+        pages = self._all_pages("s1", limit=3)
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([row_id for page in pages for row_id in page], [7, 6, 5, 4, 3, 2, 1])
+
+    def test_cursor_is_stable_while_rows_are_added(self):
+        self._save_executions("s1", range(4))
+        first = self.db.get_session_history("s1", limit=2)
+        self._save_executions("s1", [10, 11])
+
+        second = self.db.get_session_history("s1", limit=2, execution_cursor=first["next_execution_cursor"])
+        self.assertEqual([item["topic"] for item in second["executions"]], ["topic 1", "topic 0"])
+        self.assertIsNone(second["next_execution_cursor"])
+        self.assertEqual(second["total_executions"], 6)
+
+    def test_lists_are_paged_independently(self):
+        self._save_executions("s1", range(3))
+
+        async def save_qa():
+            for i in range(5):
+                await self.db.save_qa_interaction("s1", f"question {i}", "answer")
+        asyncio.run(save_qa())
+        self.db.flush(5)
+
+        first = self.db.get_session_history("s1", limit=2)
+        second = self.db.get_session_history("s1", limit=2, qa_cursor=first["next_qa_cursor"])
+        # No execution cursor given: executions start over from the newest
+        self.assertEqual(first["executions"], second["executions"])
+        self.assertEqual([item["question"] for item in second["qa_interactions"]], ["question 2", "question 1"])
+        self.assertEqual((second["total_executions"], second["total_qa"]), (3, 5))
+
+    def test_async_reader_matches_sync(self):
+        self._save_executions("s1", range(3))
+
+        async def read():
+            return await self.db.aget_session_history("s1", limit=2)
+        self.assertEqual(asyncio.run(read()), self.db.get_session_history("s1", limit=2))
+
+    def test_counters_follow_deletes(self):
+        self._save_executions("s1", range(3))
+        self._save_executions("s2", range(2))
+        with self.db.pool.writer() as conn:
+            conn.execute("DELETE FROM crew_executions WHERE session_id = 's1' AND id = 1")
+            conn.execute("DELETE FROM crew_executions WHERE session_id = 's2'")
+
+        self.assertEqual(self.db.get_session_totals("s1"), {"executions": 2, "qa": 0})
+        self.assertEqual(self.db.get_session_totals("s2"), {"executions": 0, "qa": 0})
+        with self.db.pool.reader() as conn:
+            sessions = [row[0] for row in conn.execute("SELECT DISTINCT session_id FROM session_counters")]
+        self.assertEqual(sessions, ["s1"])
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""Session routing and resharding of the sharded storage backend."""
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from core import sharding
+from core.database import DatabaseManager, create_database_manager
+from core.sharding import SHARD_ID_BITS, ShardedDatabaseManager
+
+SESSIONS = [f"session-{i}" for i in range(12)]
+
+class ShardingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.settings = SimpleNamespace(database_url=str(Path(self.tmp) / "app.db"), database_shards=1)
+        self.open = []
+
+    def tearDown(self):
+        for db in self.open:
+            db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _open(self, shards: int, check_placement: bool = True):
+        self.settings.database_shards = shards
+        db = create_database_manager(self.settings, check_placement=check_placement)
+        self.open.append(db)
+        return db
+
+    def _close(self, db):
+        db.close()
+        self.open.remove(db)
+
+    def _fill(self, db):
+        async def save():
+            for session_id in SESSIONS:
+                await db.save_crew_execution(session_id, f"vector search {session_id}", "result " * 20, 1.0)
+                await db.save_qa_interaction(session_id, "what changed?", "answer")
+        asyncio.run(save())
+        db.flush(5)
+        db.append_agent_messages(SESSIONS[0], "researcher", [(0, "human", "hello")])
+
+    def _assert_complete(self, db):
+        for session_id in SESSIONS:
+            self.assertEqual(db.get_session_totals(session_id), {"executions": 1, "qa": 1})
+        self.assertEqual(len(db.search_history("vector", limit=50)["results"]), len(SESSIONS))
+        self.assertEqual(db.get_agent_messages(SESSIONS[0], "researcher"), [(0, "human", "hello")])
+
+    def test_shard_zero_keeps_the_original_file(self):
+        self.assertEqual(sharding.shard_path("data/app.db", 0), "data/app.db")
+        self.assertEqual(sharding.shard_path("data/app.db", 2), str(Path("data/app.shard2.db")))
+
+    def test_sessions_stay_on_their_shard_and_ids_encode_it(self):
+        db = self._open(3)
+        self._fill(db)
+        self._assert_complete(db)
+        for session_id in SESSIONS:
+            shard = db.shard_for(session_id)
+            index = db.shards.index(shard)
+            item = db.get_session_history(session_id)["executions"][0]
+            self.assertEqual(item["id"] >> SHARD_ID_BITS, index)
+            self.assertEqual(db.get_execution_result(item["id"])["topic"], f"vector search {session_id}")
+
+    def test_growing_refuses_to_start_until_resharded(self):
+        single = self._open(1)
+        self._fill(single)
+        self._close(single)
+
+        with self.assertRaises(RuntimeError):
+            self._open(3)
+        db = self._open(3, check_placement=False)
+        moved = db.reshard()
+        self.assertGreater(moved["sessions_moved"], 0)
+        self.assertEqual(db.misplaced_sessions(), {})
+        self._close(db)
+
+        self._assert_complete(self._open(3))
+
+    def test_shrinking_drains_and_retires_extra_files(self):
+        db = self._open(3)
+        self._fill(db)
+        self._close(db)
+
+        with self.assertRaises(RuntimeError):
+            self._open(1)
+        db = self._open(1, check_placement=False)
+        self.assertEqual(db.reshard()["files_retired"], 2)
+        self._close(db)
+
+        single = self._open(1)
+        self.assertIsInstance(single, DatabaseManager)
+        self._assert_complete(single)
+        self.assertEqual(sharding.stray_shard_files(self.settings.database_url, 1), [])
+
+    def test_interrupted_move_is_redone_without_duplicates(self):
+        single = self._open(1)
+        self._fill(single)
+        self._close(single)
+
+        db = self._open(3, check_placement=False)
+        session_id = next(iter(db.misplaced_sessions()[0]))
+        source, target = db.shards[0], db.shard_for(session_id)
+        # Crash after the copy, before the source rows are deleted
+        with mock.patch.object(source.pool, "writer", side_effect=RuntimeError("crash")):
+            with self.assertRaises(RuntimeError):
+                sharding._move_session(source, target, session_id)
+        self.assertEqual(target.get_session_totals(session_id), {"executions": 1, "qa": 1})
+
+        db.reshard()
+        self.assertEqual(target.get_session_totals(session_id), {"executions": 1, "qa": 1})
+        self.assertEqual(source.get_session_totals(session_id), {"executions": 0, "qa": 0})
+        self._assert_complete(db)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
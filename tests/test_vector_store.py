@@ -0,0 +1,99 @@
+"""Local vector store: search, persistence and recovery from torn appends."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.vector_store import VectorStore, hash_embedding, split_into_chunks
+
+class VectorStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.path = str(self.tmp / "vectors")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _store(self, dim=64):
+        return VectorStore(self.path, dim=dim)
+
+    def _fill(self, store):
+        store.add(["solar panel efficiency records", "wind turbine blade design"], "s1")
+        store.add(["solar farms in the desert", "battery storage for solar power"], "s2")
+
+    def test_embedding_is_deterministic_unit_vector(self):
+        vector = hash_embedding("solar power", 64)
+        self.assertAlmostEqual(float((vector ** 2).sum()), 1.0, places=5)
+        self.assertTrue((vector == hash_embedding("Solar  power", 64)).all())
+        self.assertFalse(hash_embedding("", 64).any())
+
+    def test_top_k_is_ranked_and_filtered_by_session(self):
+        store = self._store()
+        self._fill(store)
+
+        hits = store.search("solar panel efficiency", k=2)
+        self.assertEqual(hits[0]["text"], "solar panel efficiency records")
+        self.assertGreaterEqual(hits[0]["score"], hits[1]["score"])
+
+        session_hits = store.search("solar", k=5, session_id="s2", min_score=0.1)
+        self.assertEqual({hit["session_id"] for hit in session_hits}, {"s2"})
+        self.assertEqual(len(session_hits), 2)
+        self.assertEqual(store.search("solar", session_id="missing"), [])
+
+    def test_min_score_drops_unrelated_texts(self):
+        store = self._store()
+        self._fill(store)
+        self.assertEqual(store.search("quantum chromodynamics", min_score=0.5), [])
+
+    def test_reopen_keeps_vectors_and_metadata(self):
+        store = self._store()
+        store.add(["graphene transistors"], "s1", {"topic": "materials"})
+        reopened = self._store()
+
+        self.assertEqual(len(reopened), 1)
+        hit = reopened.search("graphene", k=1)[0]
+        self.assertEqual((hit["session_id"], hit["metadata"]), ("s1", {"topic": "materials"}))
+
+    def test_dim_mismatch_is_refused(self):
+        self._store(dim=64)
+        with self.assertRaises(ValueError):
+            self._store(dim=128)
+
+    def test_torn_record_line_is_dropped(self):
+        store = self._store()
+        self._fill(store)
+        # An append interrupted mid-record: vector written, record cut short
+        store.add(["fusion reactor"], "s3")
+        records = Path(self.path) / "records.jsonl"
+        records.write_bytes(records.read_bytes()[:-10])
+
+        reopened = self._store()
+        self.assertEqual(len(reopened), 4)
+        self.assertEqual(reopened.search("fusion reactor", session_id="s3"), [])
+        self.assertEqual((Path(self.path) / "vectors.f32").stat().st_size, 4 * 64 * 4)
+        # Appends after recovery line up again
+        reopened.add(["fusion reactor"], "s3")
+        self.assertEqual(self._store().search("fusion reactor", k=1)[0]["session_id"], "s3")
+
+    def test_records_without_vectors_are_dropped(self):
+        store = self._store()
+        self._fill(store)
+        vectors = Path(self.path) / "vectors.f32"
+        vectors.write_bytes(vectors.read_bytes()[:3 * 64 * 4 + 17])
+
+        reopened = self._store()
+        self.assertEqual(len(reopened), 3)
+        self.assertEqual(vectors.stat().st_size, 3 * 64 * 4)
+        self.assertEqual(len(reopened.search("solar", k=5, session_id="s2", min_score=0.1)), 1)
+
+    def test_split_into_chunks(self):
+        text = "First paragraph.\n\nSecond paragraph.\n\n" + "word " * 300
+        chunks = split_into_chunks(text, max_chars=200)
+        self.assertEqual(chunks[0], "First paragraph.\n\nSecond paragraph.")
+        self.assertTrue(all(len(chunk) <= 200 for chunk in chunks))
+        self.assertEqual(" ".join(chunks[1:]).split(), ["word"] * 300)
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
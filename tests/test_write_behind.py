@@ -0,0 +1,142 @@
+"""Write-behind batching and UTC timestamp storage."""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from core.database import ConnectionPool, DatabaseManager, WriteBehindQueue, utc_timestamp
+from core.migrations import apply_migrations
+
+_INSERT = "INSERT INTO items (value) VALUES (?)"
+
+class WriteBehindQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.pool = ConnectionPool(str(self.tmp / "queue.db"), reader_connections=1)
+        with self.pool.writer() as conn:
+            conn.execute("CREATE TABLE items (value INTEGER NOT NULL)")
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _values(self):
+        with self.pool.reader() as conn:
+            return [row[0] for row in conn.execute("SELECT value FROM items ORDER BY rowid")]
+
+    def test_flush_writes_in_batches(self):
+        writes = WriteBehindQueue(self.pool, batch_size=3, flush_interval=30)
+        self.addCleanup(writes.close)
+        for i in range(7):
+            writes.submit(_INSERT, (i,))
+        self.assertTrue(writes.flush(5))
+
+        self.assertEqual(self._values(), list(range(7)))
+        stats = writes.get_stats()
+        self.assertEqual(stats["written"], 7)
+        self.assertEqual(stats["largest_batch"], 3)
+        self.assertGreaterEqual(stats["batches"], 3)
+
+    def test_interval_commits_without_flush(self):
+        writes = WriteBehindQueue(self.pool, batch_size=100, flush_interval=0.05)
+        self.addCleanup(writes.close)
+        writes.submit(_INSERT, (1,))
+        deadline = time.monotonic() + 5
+        while not self._values() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self._values(), [1])
+
+    def test_bad_row_does_not_drop_its_batch(self):
+        writes = WriteBehindQueue(self.pool, batch_size=10, flush_interval=30)
+        self.addCleanup(writes.close)
+        writes.submit(_INSERT, (1,))
+        writes.submit(_INSERT, (None,))
+        writes.submit(_INSERT, (3,))
+        writes.flush(5)
+
+        self.assertEqual(self._values(), [1, 3])
+        self.assertEqual(writes.get_stats()["failed"], 1)
+
+    def test_close_writes_pending_rows(self):
+        writes = WriteBehindQueue(self.pool, batch_size=100, flush_interval=30)
+        for i in range(5):
+            writes.submit(_INSERT, (i,))
+        writes.close(5)
+
+        self.assertEqual(self._values(), list(range(5)))
+        with self.assertRaises(RuntimeError):
+            writes.submit(_INSERT, (9,))
+
+class UtcTimestampTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.db = DatabaseManager(str(self.tmp / "test.db"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_aware_and_naive_datetimes(self):
+        moment = datetime(2024, 6, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+        self.assertEqual(utc_timestamp(moment), "2024-06-01 10:00:00.000000")
+        self.assertEqual(utc_timestamp(datetime(2024, 6, 1, 12, 0)), "2024-06-01 12:00:00.000000")
+
+    def test_saved_rows_are_stamped_in_utc(self):
+        moment = datetime(2024, 6, 1, 12, 0, tzinfo=timezone(timedelta(hours=2)))
+
+        async def save():
+            await self.db.save_crew_execution("s1", "topic", "result", 1.0, moment)
+            await self.db.save_qa_interaction("s1", "question", "answer")
+        before = datetime.now(timezone.utc).replace(tzinfo=None)
+        asyncio.run(save())
+        self.db.flush(5)
+
+        history = self.db.get_session_history("s1")
+        self.assertEqual(history["executions"][0]["timestamp"], "2024-06-01 10:00:00.000000")
+        qa_time = datetime.fromisoformat(history["qa_interactions"][0]["timestamp"])
+        self.assertLess(abs(qa_time - before), timedelta(minutes=1))
+
+@unittest.skipUnless(hasattr(time, "tzset"), "needs time.tzset")
+class LocalTimestampMigrationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.old_tz = os.environ.get("TZ")
+
+    def tearDown(self):
+        if self.old_tz is None:
+            os.environ.pop("TZ", None)
+        else:
+            os.environ["TZ"] = self.old_tz
+        time.tzset()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_local_rows_are_shifted_by_the_migrating_zone(self):
+        pool = ConnectionPool(str(self.tmp / "old.db"), reader_connections=1)
+        self.addCleanup(pool.close)
+        apply_migrations(pool)
+        with pool.writer() as conn:
+            conn.execute(
+                "INSERT INTO crew_executions (session_id, topic, result, timestamp) "
+                "VALUES ('s1', 'topic', 'result', '2024-01-15 12:00:00')"
+            )
+            conn.execute("PRAGMA user_version = 10")
+
+        # POSIX sign is inverted: this zone is UTC+3 all year
+        os.environ["TZ"] = "XYZ-3"
+        time.tzset()
+        self.assertEqual(apply_migrations(pool), [11])
+
+        with pool.reader() as conn:
+            stamp = conn.execute("SELECT timestamp FROM crew_executions").fetchone()[0]
+        self.assertEqual(stamp, "2024-01-15 09:00:00.000")
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file